@@ -173,6 +173,10 @@ def confirmation_agent(state: Dict[str, Any]) -> Dict[str, Any]:
                     "passenger_name": passenger_name,
                     "original_flight": original_flight,
                     "rebooked_flight": rebooked_flight,
+                    # Disambiguates flight numbers that repeat across dates when seats are moved
+                    "new_departure_time": None if rebooked_flight.startswith("UNASSIGNED") else matching_message["proposal"].get("new_departure_time"),
+                    # Later legs of a connection, whose seats are taken along with rebooked_flight
+                    "connecting_flights": [] if rebooked_flight.startswith("UNASSIGNED") else matching_message["proposal"].get("connecting_flights", []),
                     "response": response,
                     "response_time": response_time,
                     "communication_method": "MCP",
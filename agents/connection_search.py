@@ -0,0 +1,243 @@
+"""
+Connection search for passenger rebooking.
+
+find_alternative_flights only offers nonstop flights on the cancelled route.
+When those run out of seats, a passenger can still travel via one or two
+connecting airports. ConnectionGraph keeps the flights table in memory as a
+time-expanded graph. Departures are grouped by airport and sorted by
+departure time. A connection from an arriving flight is then a binary search
+for the departures between the minimum and maximum connection time.
+
+ConnectionGraph.search runs a best-first search keyed on arrival time, so
+itineraries come out earliest arrival first. Each itinerary reserves its
+seats on every leg as it is emitted. The itineraries returned by one search
+never oversell a leg between them, and each one can be handed to the
+assignment engine as if it were a single flight.
+"""
+
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from agents.faa_legality import parse_times
+
+# Connection rules
+MIN_CONNECTION_MINUTES = 45
+MAX_CONNECTION_MINUTES = 6 * 60
+MAX_STOPS = 2
+
+# Search bounds: how long after the cancelled departure the first leg may leave, and how many itineraries to return
+SEARCH_WINDOW_HOURS = 24
+MAX_ITINERARIES = 50
+
+# Columns the graph needs from the flights table
+FLIGHT_FIELDS = ["flight_number", "departure_location", "arrival_location", "departure_time", "arrival_time",
+                 "gate", "status", "available_seats"]
+
+# Flight fields copied onto each itinerary leg
+_LEG_FIELDS = ["flight_number", "departure_location", "arrival_location", "departure_time", "arrival_time", "gate"]
+
+@dataclass
+class Itinerary:
+    """One to three flights from origin to destination with the seats reserved on all of them."""
+    legs: List[Dict[str, Any]]
+    seats: int
+
+    @property
+    def stops(self) -> int:
+        return len(self.legs) - 1
+
+    @property
+    def flight_numbers(self) -> List[str]:
+        return [leg["flight_number"] for leg in self.legs]
+
+    @property
+    def connection_airports(self) -> List[str]:
+        return [leg["arrival_location"] for leg in self.legs[:-1]]
+
+    def to_flight(self) -> Dict[str, Any]:
+        """
+        The itinerary as a flight dict for assign_passengers. flight_number joins
+        the legs with '+' so every itinerary has its own key. The first leg's
+        departure and gate are used, with the last leg's arrival.
+        """
+        first, last = self.legs[0], self.legs[-1]
+        return {
+            "flight_number": "+".join(self.flight_numbers),
+            "departure_location": first["departure_location"],
+            "arrival_location": last["arrival_location"],
+            "departure_time": first["departure_time"],
+            "arrival_time": last["arrival_time"],
+            "gate": first.get("gate"),
+            "available_seats": self.seats,
+            "stops": self.stops,
+            "legs": self.legs
+        }
+
+def connection_proposal_fields(flight: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Proposal fields for a passenger assigned to an itinerary (a to_flight dict).
+
+    The passenger record holds a single flight, so rebooked_flight is the first
+    leg. The later legs are listed in connecting_flights, and
+    bulk_reassign_passengers takes their seats in the same transaction.
+    """
+    first = flight["legs"][0]
+    return {
+        "rebooked_flight": first["flight_number"],
+        "new_departure_time": first["departure_time"],
+        "new_arrival_time": flight["arrival_time"],
+        "new_gate": first.get("gate"),
+        "remaining_seats": flight["available_seats"],
+        "stops": flight["stops"],
+        "connection_airports": [leg["arrival_location"] for leg in flight["legs"][:-1]],
+        "connecting_flights": [{"flight_number": leg["flight_number"], "departure_time": leg["departure_time"]}
+                               for leg in flight["legs"][1:]]
+    }
+
+def _minutes(values: pd.Series) -> np.ndarray:
+    """Timestamps as whole minutes since the epoch (NaT becomes the int64 minimum)."""
+    return parse_times(values).to_numpy(dtype="datetime64[ns]").astype("datetime64[m]").astype(np.int64)
+
+_NAT_MINUTES = np.iinfo(np.int64).min
+
+class ConnectionGraph:
+    """
+    Flights indexed by departure airport and departure time.
+
+    Only flights that can take passengers are kept: not cancelled, with open
+    seats and a parseable departure before their arrival.
+    """
+
+    def __init__(self, flights: Union[pd.DataFrame, List[Dict[str, Any]]]):
+        df = flights if isinstance(flights, pd.DataFrame) else pd.DataFrame(list(flights))
+        if df.empty:
+            df = pd.DataFrame(columns=FLIGHT_FIELDS)
+        departure = _minutes(df["departure_time"])
+        arrival = _minutes(df["arrival_time"])
+        seats = pd.to_numeric(df["available_seats"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+        status = df["status"].astype(str).str.lower().to_numpy() if "status" in df.columns else np.full(len(df), "")
+        usable = ((status != "cancelled") & (seats > 0) & (departure != _NAT_MINUTES) & (arrival != _NAT_MINUTES)
+                  & (arrival > departure))
+
+        df = df.loc[usable].reset_index(drop=True)
+        self.airports = sorted(set(df["departure_location"]) | set(df["arrival_location"]))
+        self._airport_index = {code: index for index, code in enumerate(self.airports)}
+        origin = df["departure_location"].map(self._airport_index).to_numpy(dtype=np.int64)
+        destination = df["arrival_location"].map(self._airport_index).to_numpy(dtype=np.int64)
+
+        # Sort by (origin airport, departure time); each airport's departures are one contiguous slice
+        order = np.lexsort((departure[usable], origin))
+        self._origin = origin[order]
+        self._destination = destination[order]
+        self._departure = departure[usable][order]
+        self._arrival = arrival[usable][order]
+        self._seats = seats[usable][order]
+        self._offsets = np.searchsorted(self._origin, np.arange(len(self.airports) + 1))
+        for field in _LEG_FIELDS:
+            if field not in df.columns:
+                df[field] = None
+        legs = df[_LEG_FIELDS].iloc[order].astype(object)
+        self._legs = legs.where(legs.notna(), None).to_dict("records")
+
+        # Which airport pairs have any flight, for pruning legs that cannot reach the destination
+        self._routes = np.zeros((len(self.airports), len(self.airports)), dtype=bool)
+        self._routes[self._origin, self._destination] = True
+
+    @classmethod
+    def from_flights(cls, flights: Iterable[Dict[str, Any]]) -> "ConnectionGraph":
+        """Build from flight rows, e.g. the flights table streamed through the database client."""
+        return cls(list(flights))
+
+    def __len__(self) -> int:
+        return len(self._departure)
+
+    def _departures(self, airport: int, earliest: int, latest: int) -> np.ndarray:
+        """Indices of flights leaving airport with earliest <= departure <= latest."""
+        start, end = self._offsets[airport], self._offsets[airport + 1]
+        times = self._departure[start:end]
+        return np.arange(start + np.searchsorted(times, earliest, side="left"),
+                         start + np.searchsorted(times, latest, side="right"))
+
+    def _reach(self, destination: int, max_legs: int) -> List[np.ndarray]:
+        """reach[k][a]: airport a is the destination or has a route to it within k legs."""
+        reach = [np.zeros(len(self.airports), dtype=bool)]
+        reach[0][destination] = True
+        for _ in range(max_legs):
+            reach.append(reach[-1] | self._routes[:, reach[-1]].any(axis=1))
+        return reach
+
+    def search(self, origin: str, destination: str, departure_after: Any, passenger_count: Optional[int] = None,
+               min_stops: int = 0, max_stops: int = MAX_STOPS,
+               min_connection_minutes: int = MIN_CONNECTION_MINUTES, max_connection_minutes: int = MAX_CONNECTION_MINUTES,
+               window_hours: float = SEARCH_WINDOW_HOURS, max_itineraries: int = MAX_ITINERARIES) -> List[Itinerary]:
+        """
+        Itineraries from origin to destination, earliest arrival first.
+
+        Args:
+            origin: Origin airport code
+            destination: Destination airport code
+            departure_after: The first leg departs strictly after this time and
+                at most window_hours later
+            passenger_count: Stop once the itineraries' seats cover this many
+                passengers (default: up to max_itineraries)
+            min_stops: 1 leaves out nonstop flights (e.g. when they are already
+                assigned); max_stops is at most 2
+            min_connection_minutes: Minimum time between arrival and the next departure
+            max_connection_minutes: Maximum time between arrival and the next departure
+
+        Returns:
+            Itineraries with seats reserved on every leg. A leg never appears in
+            the returned itineraries more times than it has open seats, and no
+            itinerary visits an airport twice.
+        """
+        if origin not in self._airport_index or destination not in self._airport_index or origin == destination:
+            return []
+        max_stops = min(max_stops, MAX_STOPS)
+        source, target = self._airport_index[origin], self._airport_index[destination]
+        after = int(_minutes(pd.Series([departure_after]))[0])
+        if after == _NAT_MINUTES:
+            raise ValueError(f"Unparseable departure_after: {departure_after!r}")
+        reach = self._reach(target, max_stops)
+        remaining = self._seats.copy()
+
+        heap = []
+        counter = itertools.count()
+
+        def push(flights: np.ndarray, path: tuple, visited: frozenset):
+            # After these flights, len(path) legs are flown; the rest must fit in the remaining stops
+            legs_left = max_stops - len(path)
+            arrives = self._destination[flights]
+            keep = remaining[flights] > 0
+            keep &= reach[legs_left][arrives]
+            if len(path) < min_stops:
+                keep &= arrives != target
+            for flight in flights[keep]:
+                airport = int(self._destination[flight])
+                if airport not in visited:
+                    heapq.heappush(heap, (int(self._arrival[flight]), next(counter), path + (int(flight),), visited | {airport}))
+
+        push(self._departures(source, after + 1, after + int(window_hours * 60)), (), frozenset([source]))
+
+        itineraries = []
+        seats_found = 0
+        while heap and len(itineraries) < max_itineraries:
+            if passenger_count is not None and seats_found >= passenger_count:
+                break
+            arrival, _, path, visited = heapq.heappop(heap)
+            airport = int(self._destination[path[-1]])
+            if airport == target:
+                seats = int(remaining[list(path)].min())
+                if seats <= 0:
+                    continue
+                remaining[list(path)] -= seats
+                itineraries.append(Itinerary(legs=[dict(self._legs[flight]) for flight in path], seats=seats))
+                seats_found += seats
+                continue
+            push(self._departures(airport, arrival + min_connection_minutes, arrival + max_connection_minutes), path, visited)
+
+        return itineraries
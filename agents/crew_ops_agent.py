@@ -8,6 +8,9 @@ from langchain.prompts import ChatPromptTemplate
 import os
 from dotenv import load_dotenv
 from services.database_mcp_client import get_database_client
+from agents.faa_legality import find_violating_flights
+from agents.crew_substitution import propose_substitutes
+from agents.llm_cache import chat_model_options
 
 # Load environment variables
 load_dotenv()
@@ -27,6 +30,10 @@ MAX_DUTY_HOURS = 10
 MIN_REST_HOURS = 10
 MAX_FATIGUE_SCORE = 1.0
 
+# Columns the substitution logic needs from unassigned crew
+UNASSIGNED_CREW_FIELDS = ["crew_id", "name", "role", "base", "rest_hours_prior", "fatigue_score",
+                          "last_flight_end", "duty_start", "duty_end"]
+
 @tool
 def log_message_tool(agent_name: str, message: str, run_id: str = "default", context: Dict[str, Any] = None) -> str:
     """
@@ -76,34 +83,7 @@ def check_legality_tool(crew_schedule: List[Dict[str, Any]]) -> List[str]:
     - fatigue_score
     If input is nested, it will be flattened.
     """
-    # Handle case where input is a dictionary with crew_schedule key
-    if isinstance(crew_schedule, dict) and "crew_schedule" in crew_schedule:
-        crew_schedule = crew_schedule["crew_schedule"]
-    
-    # Handle nested input
-    if all("crew" in item and "flight_id" in item for item in crew_schedule):
-        flat_crew = []
-        for flight in crew_schedule:
-            for crew in flight["crew"]:
-                crew["assigned_flight"] = flight["flight_id"]
-                flat_crew.append(crew)
-        crew_schedule = flat_crew
-
-    df = pd.DataFrame(crew_schedule)
-
-    required_cols = ["assigned_flight", "duty_start", "duty_end", "rest_hours_prior", "fatigue_score"]
-    missing_cols = [col for col in required_cols if col not in df.columns]
-    if missing_cols:
-        raise ValueError(f"Missing required fields: {missing_cols}")
-
-    violations = []
-    for flight_id, group in df.groupby("assigned_flight"):
-        for _, row in group.iterrows():
-            duty_hours = (pd.to_datetime(row["duty_end"]) - pd.to_datetime(row["duty_start"])) / pd.Timedelta(hours=1)
-            if duty_hours > MAX_DUTY_HOURS or row["rest_hours_prior"] < MIN_REST_HOURS or row["fatigue_score"] > MAX_FATIGUE_SCORE:
-                violations.append(flight_id)
-                break
-    return list(set(violations))
+    return find_violating_flights(crew_schedule, MAX_DUTY_HOURS, MIN_REST_HOURS, MAX_FATIGUE_SCORE)
 
 @tool
 def get_unassigned_crew_from_db(input: Dict[str, Any] = None) -> List[Dict[str, Any]]:
@@ -124,7 +104,8 @@ def get_unassigned_crew_from_db(input: Dict[str, Any] = None) -> List[Dict[str,
             crew_data = db_client.query_crew(
                 assigned_flight=None,  # This will now look for NULL or "UNASSIGNED"
                 min_rest_hours=MIN_REST_HOURS,
-                max_fatigue_score=MAX_FATIGUE_SCORE
+                max_fatigue_score=MAX_FATIGUE_SCORE,
+                fields=UNASSIGNED_CREW_FIELDS
             )
             print(f"📋 Found {len(crew_data)} unassigned crew members via MCP")
             return crew_data
@@ -135,7 +116,7 @@ def get_unassigned_crew_from_db(input: Dict[str, Any] = None) -> List[Dict[str,
             print("🔄 Database MCP not available - Falling back to direct SQLite connection...")
             conn = sqlite3.connect("../database/united_ops.db")
             query = """
-                SELECT crew_id, name, base, rest_hours_prior, fatigue_score, role
+                SELECT crew_id, name, base, rest_hours_prior, fatigue_score, role, last_flight_end, duty_start, duty_end
                 FROM crew
                 WHERE (assigned_flight IS NULL OR assigned_flight = 'UNASSIGNED')
                   AND rest_hours_prior >= ?
@@ -189,8 +170,8 @@ def propose_substitutes_tool(violations: List[str], crew_schedule: List[Dict[str
 
     Usage:
     1. Always call `get_unassigned_crew_from_db` before using this tool.
-    2. Ensure the unassigned crew have matching `role` and `base` to the affected crew in violations.
-    3. The tool will match substitutes by lowest fatigue and highest availability.
+    2. Substitutes always match the `role` of the crew they replace; a different `base` is allowed but costs a deadhead.
+    3. The tool picks the combination of substitutes across all violated flights with the lowest total fatigue, deadhead and thin-rest cost.
 
     Output:
     - Returns a dictionary mapping `flight_id` to a list of proposed new crew assignments.
@@ -203,19 +184,7 @@ def propose_substitutes_tool(violations: List[str], crew_schedule: List[Dict[str
     if isinstance(unassigned_crew, dict):
         unassigned_crew = unassigned_crew.get("unassigned_crew", [])
     
-    df = pd.DataFrame(crew_schedule)
-    unassigned = pd.DataFrame(unassigned_crew)
-    substitutions = {}
-    for flight_id in violations:
-        needed_roles = df[df["assigned_flight"] == flight_id]["role"].value_counts()
-        crew_ids = []
-        for role, count in needed_roles.items():
-            eligible = unassigned[unassigned["role"] == role]
-            selected = eligible.head(count)
-            crew_ids.extend(selected["crew_id"].tolist())
-            unassigned = unassigned[~unassigned["crew_id"].isin(selected["crew_id"])]
-        substitutions[flight_id] = crew_ids
-    return substitutions
+    return propose_substitutes(violations, crew_schedule, unassigned_crew, MIN_REST_HOURS, MAX_FATIGUE_SCORE)
 
 @tool
 def get_full_schedule_from_db(input: Dict[str, Any] = None) -> List[Dict[str, Any]]:
@@ -228,7 +197,8 @@ def get_full_schedule_from_db(input: Dict[str, Any] = None) -> List[Dict[str, An
         
         # Try to use the MCP client first
         try:
-            crew_data = db_client.query_crew()
+            # Stream the crew table page by page instead of one large response
+            crew_data = list(db_client.stream_tool("query_crew"))
             print(f"📋 Retrieved {len(crew_data)} crew members from database via MCP")
             return crew_data
             
@@ -272,7 +242,8 @@ def crew_ops_agent(state: Dict[str, Any]) -> Dict[str, Any]:
         model_name="claude-3-5-sonnet-latest", 
         temperature=0.1, 
         timeout=60, 
-        stop=None
+        stop=None,
+        **chat_model_options()
     )
     
     tools = [check_legality_tool, get_unassigned_crew_from_db, propose_substitutes_tool, log_message_tool, get_full_schedule_from_db]
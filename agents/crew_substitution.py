@@ -0,0 +1,234 @@
+"""
+Min-cost crew substitution shared by the crew ops and dispatch ops agents.
+
+Every crew slot on a violated flight needs a substitute of the same role.
+Filling the slots is an assignment problem: each (slot, candidate) pair has
+a cost built from the candidate's fatigue, a deadhead penalty when their base
+differs from the flight's, and a penalty for a thin rest margin before the
+slot's duty start. Candidates who are over the fatigue limit, short of the
+minimum rest or already on duty during the slot cannot be assigned at all.
+Each role is solved on its own with the Hungarian algorithm, so the total
+cost over all violated flights is minimal and no one is used twice.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+from agents.faa_legality import MIN_REST_HOURS, MAX_FATIGUE_SCORE, flatten_crew_schedule, parse_times
+
+# Cost weights (fatigue_score is on a 0-1 scale)
+FATIGUE_WEIGHT = 1.0
+DEADHEAD_COST = 0.5
+REST_MARGIN_WEIGHT = 0.25
+REST_MARGIN_TARGET_HOURS = 4.0
+
+# Cost of leaving a slot empty, and of a pair that is not allowed (both far above any real cost)
+UNFILLED_COST = 1e4
+INFEASIBLE_COST = 1e6
+
+# Reduced costs this close to zero count as tight in the assignment warm start
+_TIGHT_TOLERANCE = 1e-9
+
+@dataclass
+class SubstitutionPlan:
+    """Result of a substitution run."""
+    substitutions: Dict[str, List[str]]
+    assignments: pd.DataFrame
+    unfilled: Dict[str, int]
+
+    @property
+    def total_cost(self) -> float:
+        return float(self.assignments["cost"].sum()) if len(self.assignments) else 0.0
+
+def solve_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Minimum-cost assignment of rows to distinct columns (Hungarian algorithm in
+    its shortest-augmenting-path form; the column scans are numpy).
+
+    Args:
+        cost: n x m matrix with n <= m and finite entries
+
+    Returns:
+        Array of length n with the column assigned to each row
+    """
+    n, m = cost.shape
+    if n > m:
+        raise ValueError(f"Need at least as many columns as rows, got {n}x{m}")
+
+    u = np.zeros(n)
+    v = np.zeros(m)
+    col_of_row = np.full(n, -1, dtype=np.int64)
+    row_of_col = np.full(m, -1, dtype=np.int64)
+    path = np.full(m, -1, dtype=np.int64)
+
+    # Warm start: u = row minima keeps every reduced cost >= 0 (v stays 0, as
+    # unassigned columns require); each row takes a free column it ties for its
+    # minimum on, and only the rows left over need augmenting paths
+    u[:] = cost.min(axis=1)
+    for row in range(n):
+        tight = np.flatnonzero((cost[row] - u[row] <= _TIGHT_TOLERANCE) & (row_of_col < 0))
+        if len(tight):
+            col_of_row[row] = tight[0]
+            row_of_col[tight[0]] = row
+
+    for start_row in np.flatnonzero(col_of_row < 0):
+        # Dijkstra over columns from start_row until it reaches a free column
+        shortest = np.full(m, np.inf)
+        scanned = np.zeros(m, dtype=bool)
+        distances = np.empty(m)
+        scanned_rows = []
+        min_val = 0.0
+        row = start_row
+        while True:
+            scanned_rows.append(row)
+            reduced = cost[row] - v
+            reduced += min_val - u[row]
+            improved = reduced < shortest
+            improved &= ~scanned
+            path[improved] = row
+            np.copyto(shortest, reduced, where=improved)
+
+            np.copyto(distances, shortest)
+            distances[scanned] = np.inf
+            col = int(distances.argmin())
+            min_val = distances[col]
+            if row_of_col[col] >= 0:
+                # Among equally short columns prefer a free one: it ends the search now
+                ties = np.flatnonzero(distances == min_val)
+                free = ties[row_of_col[ties] < 0]
+                if len(free):
+                    col = int(free[0])
+            scanned[col] = True
+            if row_of_col[col] < 0:
+                break
+            row = row_of_col[col]
+
+        # Update the potentials of everything the search touched
+        scanned_rows = np.array(scanned_rows[1:], dtype=np.int64)
+        u[start_row] += min_val
+        u[scanned_rows] += min_val - shortest[col_of_row[scanned_rows]]
+        v[scanned] -= min_val - shortest[scanned]
+
+        # Flip the augmenting path back to start_row
+        while True:
+            row = path[col]
+            row_of_col[col] = row
+            col_of_row[row], col = col, col_of_row[row]
+            if row == start_row:
+                break
+
+    return col_of_row
+
+def _numeric(df: pd.DataFrame, column: str, default: float) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=float)
+    return pd.to_numeric(df[column], errors="coerce").fillna(default).to_numpy(dtype=float)
+
+def _times(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]")
+    return parse_times(df[column]).to_numpy(dtype="datetime64[ns]")
+
+def _cost_matrix(slots: pd.DataFrame, candidates: pd.DataFrame, min_rest_hours: float, max_fatigue_score: float) -> np.ndarray:
+    """Slot x candidate cost for one role (missing fatigue/rest count as at the limit)."""
+    fatigue = _numeric(candidates, "fatigue_score", max_fatigue_score)
+    rest_prior = _numeric(candidates, "rest_hours_prior", min_rest_hours)
+    last_flight_end = _times(candidates, "last_flight_end")
+    busy_start = _times(candidates, "duty_start")
+    busy_end = _times(candidates, "duty_end")
+    slot_start = _times(slots, "duty_start")
+    slot_end = _times(slots, "duty_end")
+
+    # Rest before the slot: from the candidate's last flight when both times are known
+    rest_since_last = (slot_start[:, None] - last_flight_end[None, :]) / np.timedelta64(1, "h")
+    rest = np.where(np.isnan(rest_since_last), rest_prior[None, :], rest_since_last)
+    margin = rest - min_rest_hours
+
+    cost = (
+        FATIGUE_WEIGHT * fatigue[None, :]
+        + DEADHEAD_COST * (slots["base"].to_numpy()[:, None] != candidates["base"].to_numpy()[None, :])
+        + REST_MARGIN_WEIGHT * np.clip(REST_MARGIN_TARGET_HOURS - margin, 0, REST_MARGIN_TARGET_HOURS) / REST_MARGIN_TARGET_HOURS
+    )
+
+    # Comparisons against NaT are False, so unknown duty windows never overlap
+    overlaps = (busy_start[None, :] < slot_end[:, None]) & (slot_start[:, None] < busy_end[None, :])
+    infeasible = (fatigue[None, :] > max_fatigue_score) | (margin < 0) | overlaps
+    return np.where(infeasible, INFEASIBLE_COST, cost)
+
+def plan_substitutions(violations: List[str], crew_schedule: Union[pd.DataFrame, List[Dict[str, Any]], Dict[str, Any]],
+                       unassigned_crew: Union[pd.DataFrame, List[Dict[str, Any]]],
+                       min_rest_hours: float = MIN_REST_HOURS, max_fatigue_score: float = MAX_FATIGUE_SCORE) -> SubstitutionPlan:
+    """
+    Choose substitutes for every crew slot on the violated flights.
+
+    Args:
+        violations: Flight IDs whose crew must be replaced
+        crew_schedule: Current schedule (crew_id, assigned_flight, role, base, duty_start, duty_end)
+        unassigned_crew: Candidates (crew_id, role, base, fatigue_score, rest_hours_prior,
+            optionally last_flight_end and duty_start/duty_end)
+
+    Returns:
+        SubstitutionPlan with flight_id -> substitute crew IDs for every violation,
+        one row per filled slot, and the number of slots left empty per flight
+    """
+    schedule = flatten_crew_schedule(crew_schedule)
+    schedule = schedule if isinstance(schedule, pd.DataFrame) else pd.DataFrame(schedule)
+    pool = unassigned_crew if isinstance(unassigned_crew, pd.DataFrame) else pd.DataFrame(unassigned_crew)
+
+    substitutions: Dict[str, List[str]] = {flight_id: [] for flight_id in violations}
+    unfilled: Dict[str, int] = {}
+    rows = []
+
+    if len(schedule) and "assigned_flight" in schedule.columns:
+        slots = schedule[schedule["assigned_flight"].isin(list(substitutions))].reset_index(drop=True)
+    else:
+        slots = schedule.iloc[0:0]
+    if "base" not in slots.columns:
+        slots = slots.assign(base=None)
+    if len(pool) and "base" not in pool.columns:
+        pool = pool.assign(base=None)
+
+    for role, role_slots in (slots.groupby("role", sort=True) if len(slots) else []):
+        role_slots = role_slots.reset_index(drop=True)
+        candidates = pool[pool["role"] == role].reset_index(drop=True) if len(pool) else pool
+        n = len(role_slots)
+
+        # Dummy "unfilled" columns when there are fewer candidates than slots; a
+        # forced infeasible pair costs more than any filled slot, so it is left empty too
+        cost = np.full((n, max(len(candidates), n)), UNFILLED_COST)
+        if len(candidates):
+            cost[:, :len(candidates)] = _cost_matrix(role_slots, candidates, min_rest_hours, max_fatigue_score)
+        assignment = solve_assignment(cost)
+
+        filled = assignment < len(candidates)
+        filled[filled] = cost[np.flatnonzero(filled), assignment[filled]] < INFEASIBLE_COST
+        for flight_id, count in role_slots.loc[~filled, "assigned_flight"].value_counts().items():
+            unfilled[flight_id] = unfilled.get(flight_id, 0) + int(count)
+        if not filled.any():
+            continue
+
+        chosen = candidates.iloc[assignment[filled]]
+        role_rows = pd.DataFrame({
+            "flight_id": role_slots.loc[filled, "assigned_flight"].to_numpy(),
+            "role": role,
+            "replaces": role_slots.loc[filled, "crew_id"].to_numpy() if "crew_id" in role_slots.columns else None,
+            "crew_id": chosen["crew_id"].to_numpy(),
+            "deadhead": chosen["base"].to_numpy() != role_slots.loc[filled, "base"].to_numpy(),
+            "cost": cost[np.flatnonzero(filled), assignment[filled]]
+        })
+        for flight_id, crew_id in zip(role_rows["flight_id"], role_rows["crew_id"]):
+            substitutions[flight_id].append(crew_id)
+        rows.append(role_rows)
+
+    columns = ["flight_id", "role", "replaces", "crew_id", "deadhead", "cost"]
+    assignments = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(columns=columns)
+    return SubstitutionPlan(substitutions=substitutions, assignments=assignments, unfilled=unfilled)
+
+def propose_substitutes(violations: List[str], crew_schedule: Union[pd.DataFrame, List[Dict[str, Any]], Dict[str, Any]],
+                        unassigned_crew: Union[pd.DataFrame, List[Dict[str, Any]]],
+                        min_rest_hours: float = MIN_REST_HOURS, max_fatigue_score: float = MAX_FATIGUE_SCORE) -> Dict[str, List[str]]:
+    """flight_id -> substitute crew IDs (see plan_substitutions)."""
+    return plan_substitutions(violations, crew_schedule, unassigned_crew, min_rest_hours, max_fatigue_score).substitutions
@@ -1,6 +1,8 @@
 import pandas as pd
 from typing import Dict, Any, List
 from services.database_mcp_client import get_database_client
+from agents.faa_legality import find_violating_flights
+from agents.crew_substitution import propose_substitutes
 
 # Global database client instance
 _database_client = None
@@ -17,33 +19,16 @@ MAX_DUTY_HOURS = 10
 MIN_REST_HOURS = 10
 MAX_FATIGUE_SCORE = 1.0
 
+# Columns the substitution logic needs from unassigned crew
+UNASSIGNED_CREW_FIELDS = ["crew_id", "name", "role", "base", "rest_hours_prior", "fatigue_score",
+                          "last_flight_end", "duty_start", "duty_end"]
+
 # FAA legality checker
 def check_legality_tool(crew_schedule: List[Dict[str, Any]]) -> List[str]:
     """
     Check FAA legality for crew assignments.
     """
-    if all("crew" in item and "flight_id" in item for item in crew_schedule):
-        flat_crew = []
-        for flight in crew_schedule:
-            for crew in flight["crew"]:
-                crew["assigned_flight"] = flight["flight_id"]
-                flat_crew.append(crew)
-        crew_schedule = flat_crew
-
-    df = pd.DataFrame(crew_schedule)
-    required_cols = ["assigned_flight", "duty_start", "duty_end", "rest_hours_prior", "fatigue_score"]
-    missing_cols = [col for col in required_cols if col not in df.columns]
-    if missing_cols:
-        raise ValueError(f"Missing required fields: {missing_cols}")
-
-    violations = []
-    for flight_id, group in df.groupby("assigned_flight"):
-        for _, row in group.iterrows():
-            duty_hours = (pd.to_datetime(row["duty_end"]) - pd.to_datetime(row["duty_start"])) / pd.Timedelta(hours=1)
-            if duty_hours > MAX_DUTY_HOURS or row["rest_hours_prior"] < MIN_REST_HOURS or row["fatigue_score"] > MAX_FATIGUE_SCORE:
-                violations.append(flight_id)
-                break
-    return list(set(violations))
+    return find_violating_flights(crew_schedule, MAX_DUTY_HOURS, MIN_REST_HOURS, MAX_FATIGUE_SCORE)
 
 # Pull unassigned crew from the database
 def get_unassigned_crew_from_db() -> List[Dict[str, Any]]:
@@ -58,7 +43,8 @@ def get_unassigned_crew_from_db() -> List[Dict[str, Any]]:
             crew_data = db_client.query_crew(
                 assigned_flight=None,  # This will now look for NULL or "UNASSIGNED"
                 min_rest_hours=MIN_REST_HOURS,
-                max_fatigue_score=MAX_FATIGUE_SCORE
+                max_fatigue_score=MAX_FATIGUE_SCORE,
+                fields=UNASSIGNED_CREW_FIELDS
             )
             return crew_data
         except AttributeError:
@@ -67,7 +53,7 @@ def get_unassigned_crew_from_db() -> List[Dict[str, Any]]:
             print("🔄 Database MCP not avilable - Falling back to direct SQLite connection...")
             conn = sqlite3.connect("../database/united_ops.db")
             query = """
-                SELECT crew_id, name, base, rest_hours_prior, fatigue_score, role
+                SELECT crew_id, name, base, rest_hours_prior, fatigue_score, role, last_flight_end, duty_start, duty_end
                 FROM crew
                 WHERE (assigned_flight IS NULL OR assigned_flight = 'UNASSIGNED')
                   AND rest_hours_prior >= ?
@@ -106,19 +92,7 @@ def propose_substitutes_tool(violations: List[str], crew_schedule: List[Dict[str
     """
     Propose substitute crew members for flights with violations.
     """
-    df = pd.DataFrame(crew_schedule)
-    unassigned = pd.DataFrame(unassigned_crew)
-    substitutions = {}
-    for flight_id in violations:
-        needed_roles = df[df["assigned_flight"] == flight_id]["role"].value_counts()
-        crew_ids = []
-        for role, count in needed_roles.items():
-            eligible = unassigned[unassigned["role"] == role]
-            selected = eligible.head(count)
-            crew_ids.extend(selected["crew_id"].tolist())
-            unassigned = unassigned[~unassigned["crew_id"].isin(selected["crew_id"])]
-        substitutions[flight_id] = crew_ids
-    return substitutions
+    return propose_substitutes(violations, crew_schedule, unassigned_crew, MIN_REST_HOURS, MAX_FATIGUE_SCORE)
 
 # FAA legality compliance check with auto-substitution
 def check_faa_legality_compliance(state: Dict[str, Any]) -> bool:
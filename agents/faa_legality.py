@@ -0,0 +1,120 @@
+"""
+Columnar FAA legality engine shared by the crew ops and dispatch ops agents.
+
+The whole roster is checked at once: duty_start/duty_end are parsed in one
+vectorised pass, the duty, rest and fatigue thresholds become boolean masks,
+and flagged flights come from a single groupby-any. Each violating crew
+member also gets the list of rules they break.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+# FAA rule thresholds (the agents' defaults)
+MAX_DUTY_HOURS = 10
+MIN_REST_HOURS = 10
+MAX_FATIGUE_SCORE = 1.0
+
+REQUIRED_COLUMNS = ["assigned_flight", "duty_start", "duty_end", "rest_hours_prior", "fatigue_score"]
+
+# Violation reasons, in bit order of the per-crew violation code
+REASON_DUTY = "duty_hours_exceeded"
+REASON_REST = "insufficient_rest"
+REASON_FATIGUE = "fatigue_above_limit"
+_REASONS = (REASON_DUTY, REASON_REST, REASON_FATIGUE)
+
+# Violation code (bit 0 duty, bit 1 rest, bit 2 fatigue) -> reasons
+_REASONS_BY_CODE = [tuple(reason for bit, reason in enumerate(_REASONS) if code & (1 << bit)) for code in range(8)]
+
+@dataclass
+class LegalityReport:
+    """Result of a legality check."""
+    flights: List[str]
+    crew_violations: pd.DataFrame
+
+    def violations_by_crew(self) -> List[Dict[str, Any]]:
+        """Per-crew violations as plain dicts (crew_id, assigned_flight, reasons and the offending values)."""
+        return self.crew_violations.to_dict(orient="records")
+
+def flatten_crew_schedule(crew_schedule: Any) -> Any:
+    """
+    Accept the schedule shapes the agents pass around: {"crew_schedule": [...]},
+    a flat list of crew dicts, a list of {"flight_id", "crew": [...]} flights,
+    or a DataFrame (returned unchanged).
+    """
+    if isinstance(crew_schedule, pd.DataFrame):
+        return crew_schedule
+    if isinstance(crew_schedule, dict) and "crew_schedule" in crew_schedule:
+        crew_schedule = crew_schedule["crew_schedule"]
+    if crew_schedule and all("crew" in item and "flight_id" in item for item in crew_schedule):
+        return [
+            {**crew, "assigned_flight": flight["flight_id"]}
+            for flight in crew_schedule
+            for crew in flight["crew"]
+        ]
+    return crew_schedule
+
+def parse_times(values: pd.Series) -> pd.Series:
+    """Parse a column of timestamps in one call (unparseable values become NaT)."""
+    try:
+        return pd.to_datetime(values)
+    except (ValueError, TypeError):
+        # Inconsistent string formats: let pandas infer each value (slower, still one call)
+        return pd.to_datetime(values, format="mixed", errors="coerce")
+
+def check_legality(crew_schedule: Union[pd.DataFrame, List[Dict[str, Any]], Dict[str, Any]],
+                   max_duty_hours: float = MAX_DUTY_HOURS, min_rest_hours: float = MIN_REST_HOURS,
+                   max_fatigue_score: float = MAX_FATIGUE_SCORE) -> LegalityReport:
+    """
+    Check a crew roster against the duty, rest and fatigue limits.
+
+    A crew member is in violation when duty hours exceed max_duty_hours, rest
+    before duty is below min_rest_hours, or fatigue exceeds max_fatigue_score.
+    Missing or unparseable values never count as a violation.
+
+    Returns:
+        LegalityReport with the sorted flights that have at least one
+        violating crew member and one row per violating crew member
+
+    Raises:
+        ValueError: If a required column is missing
+    """
+    crew_schedule = flatten_crew_schedule(crew_schedule)
+    df = crew_schedule if isinstance(crew_schedule, pd.DataFrame) else pd.DataFrame(crew_schedule)
+
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing required fields: {missing_cols}")
+
+    duty_hours = (parse_times(df["duty_end"]) - parse_times(df["duty_start"])).dt.total_seconds().to_numpy() / 3600.0
+    rest_hours = pd.to_numeric(df["rest_hours_prior"], errors="coerce").to_numpy(dtype=float)
+    fatigue = pd.to_numeric(df["fatigue_score"], errors="coerce").to_numpy(dtype=float)
+
+    # NaN compares False, so missing values are never violations
+    duty_mask = duty_hours > max_duty_hours
+    rest_mask = rest_hours < min_rest_hours
+    fatigue_mask = fatigue > max_fatigue_score
+    codes = duty_mask.astype(np.int8) | (rest_mask.astype(np.int8) << 1) | (fatigue_mask.astype(np.int8) << 2)
+    violating = codes > 0
+
+    flagged = pd.Series(violating, index=df.index).groupby(df["assigned_flight"]).any()
+    flights = sorted(str(flight) for flight in flagged.index[flagged.to_numpy()])
+
+    columns = {"crew_id": df["crew_id"].to_numpy()[violating]} if "crew_id" in df.columns else {}
+    columns.update({
+        "assigned_flight": df["assigned_flight"].to_numpy()[violating],
+        "reasons": [_REASONS_BY_CODE[code] for code in codes[violating]],
+        "duty_hours": duty_hours[violating],
+        "rest_hours_prior": rest_hours[violating],
+        "fatigue_score": fatigue[violating]
+    })
+    return LegalityReport(flights=flights, crew_violations=pd.DataFrame(columns))
+
+def find_violating_flights(crew_schedule: Union[pd.DataFrame, List[Dict[str, Any]], Dict[str, Any]],
+                           max_duty_hours: float = MAX_DUTY_HOURS, min_rest_hours: float = MIN_REST_HOURS,
+                           max_fatigue_score: float = MAX_FATIGUE_SCORE) -> List[str]:
+    """Flights with at least one crew member in violation (see check_legality)."""
+    return check_legality(crew_schedule, max_duty_hours, min_rest_hours, max_fatigue_score).flights
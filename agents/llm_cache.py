@@ -0,0 +1,210 @@
+"""
+On-disk LLM response cache shared by the agents.
+
+The crew ops, passenger rebooking and planner agents re-send the same
+prompts whenever a scenario is replayed. SQLiteLLMCache is a LangChain
+BaseCache, so it plugs into every ChatAnthropic the agents build and sits
+under their AgentExecutors unchanged. LangChain hands the cache two strings:
+
+- the serialized model, which carries the model name and temperature, plus
+  the call's tool schema
+- the full message list, which carries the system prompt, the input and
+  every earlier tool call and tool result
+
+The cache key is a SHA-256 of both strings, so a response is only reused for
+exactly the same conversation with the same tools. Message ids, usage and
+response metadata are left out of the key: LangChain stamps them on replayed
+responses, and they would otherwise make every later turn of a replayed
+agent run miss. Entries expire after
+LLM_CACHE_TTL_SECONDS. Once the stored responses pass LLM_CACHE_MAX_BYTES,
+the least recently used ones are evicted. LLM_CACHE_BYPASS=1 turns the cache
+off.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(PROJECT_ROOT, "outputs", "llm_cache.db"))
+DEFAULT_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+DEFAULT_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+BYPASS_ENV = "LLM_CACHE_BYPASS"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+
+# Per-response message fields that say nothing about the conversation itself
+_VOLATILE_MESSAGE_FIELDS = ("id", "usage_metadata", "response_metadata")
+
+def _strip_volatile_fields(node: Any) -> Any:
+    if isinstance(node, list):
+        return [_strip_volatile_fields(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    if node.get("type") == "constructor" and isinstance(node.get("kwargs"), dict):
+        kwargs = {key: value for key, value in node["kwargs"].items() if key not in _VOLATILE_MESSAGE_FIELDS}
+        return {**node, "kwargs": _strip_volatile_fields(kwargs)}
+    return {key: _strip_volatile_fields(value) for key, value in node.items()}
+
+def normalize_prompt(prompt: str) -> str:
+    """The serialized messages without their volatile fields (left unchanged when not JSON)."""
+    try:
+        return json.dumps(_strip_volatile_fields(json.loads(prompt)), sort_keys=True)
+    except ValueError:
+        return prompt
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """SHA-256 over the model/tool description and the normalized messages."""
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+class SQLiteLLMCache(BaseCache):
+    """
+    LangChain cache stored in a SQLite file, with a TTL and a size cap.
+
+    The database is opened on first use, so building a model with this cache
+    never touches the disk by itself. One connection is shared behind a lock.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        return self._conn
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT payload, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                generations = loads(row[0], allowed_objects="core")
+            except Exception:
+                # Written by an incompatible LangChain version: drop it and call the model
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        payload = dumps(return_val)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, payload, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (cache_key(prompt, llm_string), payload, len(payload.encode("utf-8")), now, now)
+            )
+            self.writes += 1
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then the least recently used until the total size fits max_bytes."""
+        self.evictions += conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # An entry goes when the entries used after it already fill the budget
+        self.evictions += conn.execute(
+            """DELETE FROM llm_cache WHERE key IN (
+                   SELECT key FROM (
+                       SELECT key, SUM(size) OVER (ORDER BY last_access DESC, key DESC) AS kept FROM llm_cache
+                   ) WHERE kept > ?
+               )""", (self.max_bytes,)
+        ).rowcount
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the entries and bytes on disk."""
+        with self._lock:
+            entries, size = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size
+        }
+
+# Shared instance used by every agent (None when bypassed)
+_llm_cache: Optional[BaseCache] = None
+
+def cache_bypassed() -> bool:
+    return os.getenv(BYPASS_ENV, "0").strip().lower() in ("1", "true", "yes", "on")
+
+def get_llm_cache() -> Optional[BaseCache]:
+    """The agents' shared cache, created on first use; None when LLM_CACHE_BYPASS is set."""
+    global _llm_cache
+    if cache_bypassed():
+        return None
+    if _llm_cache is None:
+        _llm_cache = SQLiteLLMCache()
+    return _llm_cache
+
+def set_shared_llm_cache(cache: Optional[BaseCache]) -> None:
+    """Swap in another BaseCache for every agent (None goes back to the default SQLite cache)."""
+    global _llm_cache
+    _llm_cache = cache
+
+def chat_model_options(bypass: bool = False) -> Dict[str, Any]:
+    """
+    Extra ChatAnthropic arguments that route its calls through the shared cache.
+
+    LangChain only consults the cache on non-streaming calls, and
+    AgentExecutor streams by default, so streaming is turned off whenever the
+    cache is on.
+    """
+    cache = None if bypass else get_llm_cache()
+    if cache is None:
+        return {}
+    return {"cache": cache, "disable_streaming": True}
@@ -0,0 +1,180 @@
+"""
+Passenger-to-flight assignment engine for the passenger rebooking agent.
+
+Passengers are ranked by loyalty tier in one vectorised sort. Flights are
+sorted by departure time (or arrival time) and their seat counts kept in a
+plain list, and a heap of flight positions always holds the earliest flight
+that still has open seats. Each passenger
+takes the flight on top of the heap, and a flight leaves the heap when it
+fills. The result has the same shape assign_passengers_to_flights has always
+returned.
+"""
+
+import heapq
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Loyalty tier priority (higher number = higher priority); unknown tiers rank last
+LOYALTY_PRIORITY = {
+    '1K': 5,
+    'Platinum': 4,
+    'Gold': 3,
+    'Silver': 2,
+    'Basic': 1
+}
+
+class SeatQueue:
+    """
+    Open seats per flight, served earliest departure first.
+
+    Flights are the positions of `available_seats`, which must be in departure
+    order; a flight leaves the heap as soon as its last seat is taken.
+    """
+
+    def __init__(self, available_seats: List[int]):
+        self.available_seats = list(available_seats)
+        self._heap = [index for index, seats in enumerate(self.available_seats) if seats > 0]
+        heapq.heapify(self._heap)
+
+    def take(self) -> Optional[int]:
+        """Take one seat on the earliest flight with seats left; None when every flight is full."""
+        if not self._heap:
+            return None
+        index = self._heap[0]
+        self.available_seats[index] -= 1
+        if self.available_seats[index] <= 0:
+            heapq.heappop(self._heap)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+def _empty_result(alternative_flights: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        'passengers': [],
+        'flights': alternative_flights,
+        'summary': {
+            'total_passengers': 0,
+            'passengers_assigned': 0,
+            'passengers_not_assigned': 0,
+            'assignment_rate': 0.0,
+            'flights_used': 0,
+            'total_seats_used': 0,
+            'assignment_details': []
+        }
+    }
+
+def assign_passengers(impacted_passengers: List[Dict[str, Any]], alternative_flights: List[Dict[str, Any]],
+                      order_by: str = 'departure_time') -> Dict[str, Any]:
+    """
+    Assign passengers, highest loyalty tier first (then passenger_id), each to
+    the earliest flight (by order_by) that still has open seats.
+
+    Args:
+        order_by: 'departure_time', or 'arrival_time' to serve the earliest
+            arrival first (connecting itineraries)
+
+    Returns:
+        Dictionary with 'passengers' (tier order, with priority_score,
+        new_flight ('' when no seat was left) and flight_index, the position
+        of the assigned row in 'flights' or None), 'flights' (order_by order,
+        available_seats after assignment) and 'summary'
+    """
+    if not impacted_passengers:
+        return _empty_result(alternative_flights)
+
+    passengers_df = pd.DataFrame(impacted_passengers)
+    passengers_df['new_flight'] = ''
+    passengers_df['priority_score'] = passengers_df['loyalty_tier'].map(LOYALTY_PRIORITY).fillna(0).astype(int)
+    passengers_df = passengers_df.sort_values(['priority_score', 'passenger_id'], ascending=[False, True])
+
+    flights_df = pd.DataFrame(alternative_flights)
+    if flights_df.empty:
+        flights_df = pd.DataFrame(columns=['flight_number', 'departure_time', 'arrival_time', 'available_seats'])
+    flights_df['departure_time'] = pd.to_datetime(flights_df['departure_time'])
+    flights_df['arrival_time'] = pd.to_datetime(flights_df['arrival_time'])
+    flights_df = flights_df.sort_values(order_by, kind='stable')
+
+    flight_numbers = flights_df['flight_number'].to_numpy()
+    departure_labels = flights_df['departure_time'].astype(str).to_numpy()
+    original_seats = flights_df['available_seats'].to_numpy()
+    queue = SeatQueue(original_seats.tolist())
+
+    passenger_ids = passengers_df['passenger_id'].to_numpy()
+    loyalty_tiers = passengers_df['loyalty_tier'].to_numpy()
+    new_flights = np.full(len(passengers_df), '', dtype=object)
+    flight_indexes = np.full(len(passengers_df), None, dtype=object)
+    assignment_details = []
+
+    for position in range(len(passengers_df)):
+        index = queue.take()
+        if index is None:
+            break
+        new_flights[position] = flight_numbers[index]
+        flight_indexes[position] = index
+        assignment_details.append({
+            'passenger_id': passenger_ids[position],
+            'loyalty_tier': loyalty_tiers[position],
+            'assigned_flight': flight_numbers[index],
+            'departure_time': departure_labels[index],
+            'remaining_seats': queue.available_seats[index]
+        })
+
+    passengers_df['new_flight'] = new_flights
+    passengers_df['flight_index'] = flight_indexes
+    flights_df['available_seats'] = queue.available_seats
+
+    assignments_made = len(assignment_details)
+    seats_used = original_seats - np.asarray(queue.available_seats, dtype=original_seats.dtype)
+
+    assignment_summary = {
+        'total_passengers': len(passengers_df),
+        'passengers_assigned': assignments_made,
+        'passengers_not_assigned': len(passengers_df) - assignments_made,
+        'assignment_rate': assignments_made / len(passengers_df) * 100,
+        'flights_used': int((seats_used > 0).sum()),
+        'total_seats_used': int(seats_used[seats_used > 0].sum()),
+        'assignment_details': assignment_details
+    }
+
+    return {
+        'passengers': passengers_df.to_dict('records'),
+        'flights': flights_df.to_dict('records'),
+        'summary': assignment_summary
+    }
+
+def merge_assignments(first_pass: Dict[str, Any], second_pass: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combine a second assign_passengers run (over the passengers the first run
+    left without a seat, on different flights) with the first one. Passengers
+    keep the first run's order, flights are the first run's followed by the
+    second's (second-run flight_index values are shifted to match), and the
+    summary counts both.
+    """
+    offset = len(first_pass['flights'])
+    second_by_id = {
+        passenger['passenger_id']: {**passenger, 'flight_index': passenger['flight_index'] + offset
+                                    if passenger['flight_index'] is not None else None}
+        for passenger in second_pass['passengers']
+    }
+    passengers = [second_by_id.get(passenger['passenger_id'], passenger) if not passenger['new_flight'] else passenger
+                  for passenger in first_pass['passengers']]
+
+    first, second = first_pass['summary'], second_pass['summary']
+    assignments_made = first['passengers_assigned'] + second['passengers_assigned']
+    total = first['total_passengers']
+    return {
+        'passengers': passengers,
+        'flights': first_pass['flights'] + second_pass['flights'],
+        'summary': {
+            'total_passengers': total,
+            'passengers_assigned': assignments_made,
+            'passengers_not_assigned': total - assignments_made,
+            'assignment_rate': assignments_made / total * 100 if total else 0.0,
+            'flights_used': first['flights_used'] + second['flights_used'],
+            'total_seats_used': first['total_seats_used'] + second['total_seats_used'],
+            'assignment_details': first['assignment_details'] + second['assignment_details']
+        }
+    }
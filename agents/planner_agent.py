@@ -8,6 +8,7 @@ from langchain.prompts import ChatPromptTemplate
 import os
 from dotenv import load_dotenv
 from services.database_mcp_client import get_database_client
+from agents.llm_cache import chat_model_options
 
 # Load environment variables
 load_dotenv()
@@ -444,7 +445,8 @@ def generate_executive_summary(state: Dict[str, Any], run_id: str) -> Dict[str,
         model_name="claude-3-5-sonnet-latest", 
         temperature=0.3, 
         timeout=60, 
-        stop=None
+        stop=None,
+        **chat_model_options()
     )
     
     tools = [read_messages_tool]
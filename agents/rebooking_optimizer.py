@@ -0,0 +1,329 @@
+"""
+Global rebooking optimiser for several simultaneous cancellations.
+
+When many flights cancel at once their passengers compete for the same
+seats, and rebooking one cancellation at a time hands the earliest seats to
+whichever flight is processed first. Here all affected passengers and all
+candidate flights form one seat-allocation problem, solved as a min-cost flow:
+
+    source -> (cancelled flight, loyalty tier) group -> candidate flight -> sink
+
+A group's supply is its passenger count. A group-to-flight edge costs the
+delay (minutes of later arrival) times the tier's weight, and a flight's
+edge to the sink is capped at its open seats. Each group also has a direct
+edge to the sink that stands for "no seat". That edge costs more than any
+real delay, so every seat that can be used is used. Candidate flights only
+serve their own route, so each route is solved separately by successive
+shortest paths. If the solve overruns the time budget, the plan falls back
+to the per-cancellation greedy (loyalty order, earliest departure).
+"""
+
+import heapq
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from agents.passenger_assignment import LOYALTY_PRIORITY
+
+# Weight of one minute of delay per loyalty tier (unknown tiers weigh like Basic)
+TIER_DELAY_WEIGHT = {tier: max(priority, 1) for tier, priority in LOYALTY_PRIORITY.items()}
+DEFAULT_DELAY_WEIGHT = 1
+
+# "No seat" costs this many minutes more than the longest delay on offer
+UNSERVED_PENALTY_MINUTES = 24 * 60
+
+DEFAULT_TIME_BUDGET_SECONDS = float(os.getenv("REBOOKING_OPTIMIZER_TIME_BUDGET", "2.0"))
+
+METHOD_MIN_COST_FLOW = "min_cost_flow"
+METHOD_GREEDY = "greedy"
+
+class OptimizerTimeout(Exception):
+    """The min-cost flow solve ran past its deadline."""
+
+class MinCostFlow:
+    """Successive-shortest-path min-cost flow (Dijkstra with potentials, non-negative integer costs)."""
+
+    def __init__(self, nodes: int):
+        # Edge: [to, remaining capacity, cost, index of reverse edge in graph[to]]
+        self.graph: List[List[List[int]]] = [[] for _ in range(nodes)]
+        self._capacity: Dict[Tuple[int, int], int] = {}
+
+    def add_edge(self, source: int, target: int, capacity: int, cost: int) -> Tuple[int, int]:
+        """Add an edge and return a handle for flow_on()."""
+        self.graph[source].append([target, capacity, cost, len(self.graph[target])])
+        self.graph[target].append([source, 0, -cost, len(self.graph[source]) - 1])
+        handle = (source, len(self.graph[source]) - 1)
+        self._capacity[handle] = capacity
+        return handle
+
+    def flow_on(self, handle: Tuple[int, int]) -> int:
+        """Flow currently sent along an edge returned by add_edge()."""
+        source, index = handle
+        return self._capacity[handle] - self.graph[source][index][1]
+
+    def solve(self, source: int, sink: int, deadline: Optional[float] = None) -> int:
+        """
+        Send as much flow as possible from source to sink at minimum cost.
+
+        Raises:
+            OptimizerTimeout: If time.monotonic() passes deadline between augmentations
+
+        Returns:
+            Total flow sent
+        """
+        nodes = len(self.graph)
+        potential = [0] * nodes
+        total_flow = 0
+
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                raise OptimizerTimeout()
+
+            distance = [math.inf] * nodes
+            previous: List[Optional[Tuple[int, int]]] = [None] * nodes
+            distance[source] = 0
+            heap = [(0, source)]
+            while heap:
+                dist, node = heapq.heappop(heap)
+                if dist > distance[node]:
+                    continue
+                if node == sink:
+                    # Nodes not settled yet are at least this far; capping them here keeps the potentials valid
+                    break
+                for index, (target, capacity, cost, _) in enumerate(self.graph[node]):
+                    if capacity <= 0:
+                        continue
+                    candidate = dist + cost + potential[node] - potential[target]
+                    if candidate < distance[target]:
+                        distance[target] = candidate
+                        previous[target] = (node, index)
+                        heapq.heappush(heap, (candidate, target))
+
+            sink_distance = distance[sink]
+            if sink_distance == math.inf:
+                return total_flow
+            for node in range(nodes):
+                potential[node] += min(distance[node], sink_distance)
+
+            # Push the bottleneck capacity along the shortest path
+            push = math.inf
+            node = sink
+            while node != source:
+                parent, index = previous[node]
+                push = min(push, self.graph[parent][index][1])
+                node = parent
+            node = sink
+            while node != source:
+                parent, index = previous[node]
+                edge = self.graph[parent][index]
+                edge[1] -= push
+                self.graph[node][edge[3]][1] += push
+                node = parent
+            total_flow += push
+
+@dataclass
+class RebookingPlan:
+    """Result of a multi-cancellation rebooking run."""
+    assignments: List[Dict[str, Any]]
+    flights: List[Dict[str, Any]]
+    summary: Dict[str, Any]
+
+def delay_weight(loyalty_tier: Any) -> int:
+    return TIER_DELAY_WEIGHT.get(loyalty_tier, DEFAULT_DELAY_WEIGHT)
+
+def _timestamp(value: Any) -> Optional[pd.Timestamp]:
+    if value is None or value == "":
+        return None
+    timestamp = pd.Timestamp(value)
+    return None if pd.isna(timestamp) else timestamp
+
+def _eligible_flights(cancellations: List[Dict[str, Any]], candidate_flights: List[Dict[str, Any]]) -> List[List[Tuple[int, int]]]:
+    """
+    Per cancellation, the (candidate index, delay minutes) pairs it may use: same
+    route, departing after the cancelled flight, not cancelled itself and with
+    open seats; sorted by departure time.
+    """
+    cancelled_numbers = {cancellation["flight_number"] for cancellation in cancellations}
+    flights = []
+    for index, flight in enumerate(candidate_flights):
+        if (flight["flight_number"] in cancelled_numbers or str(flight.get("status", "")).lower() == "cancelled"
+                or not flight.get("available_seats") or flight["available_seats"] <= 0):
+            continue
+        flights.append((index, flight, _timestamp(flight.get("departure_time")), _timestamp(flight.get("arrival_time"))))
+    flights.sort(key=lambda item: (item[2] is None, item[2] or pd.Timestamp.min, item[1]["flight_number"]))
+
+    eligible = []
+    for cancellation in cancellations:
+        departure = _timestamp(cancellation.get("departure_time"))
+        arrival = _timestamp(cancellation.get("arrival_time"))
+        options = []
+        for index, flight, flight_departure, flight_arrival in flights:
+            if (flight.get("departure_location") != cancellation.get("departure_location")
+                    or flight.get("arrival_location") != cancellation.get("arrival_location")):
+                continue
+            if departure is not None and (flight_departure is None or flight_departure <= departure):
+                continue
+            if arrival is not None and flight_arrival is not None:
+                delay = flight_arrival - arrival
+            elif departure is not None and flight_departure is not None:
+                delay = flight_departure - departure
+            else:
+                delay = pd.Timedelta(0)
+            options.append((index, max(0, math.ceil(delay.total_seconds() / 60))))
+        eligible.append(options)
+    return eligible
+
+def _sorted_passengers(passengers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Highest loyalty tier first, then passenger_id (the greedy assignment order)."""
+    return sorted(passengers, key=lambda p: (-LOYALTY_PRIORITY.get(p.get("loyalty_tier"), 0), str(p.get("passenger_id"))))
+
+def _solve_min_cost_flow(cancellations, candidate_flights, eligible, deadline) -> List[List[Optional[Tuple[int, int]]]]:
+    """Per cancellation, per passenger (greedy order): (candidate index, delay) or None."""
+    result = [[None] * len(cancellation["ordered_passengers"]) for cancellation in cancellations]
+
+    # Candidates only serve their own route, so each route is an independent (smaller) flow problem
+    routes: Dict[Tuple[Any, Any], List[int]] = {}
+    for c, cancellation in enumerate(cancellations):
+        routes.setdefault((cancellation.get("departure_location"), cancellation.get("arrival_location")), []).append(c)
+    for route_cancellations in routes.values():
+        _solve_route(route_cancellations, cancellations, candidate_flights, eligible, deadline, result)
+    return result
+
+def _solve_route(route_cancellations, cancellations, candidate_flights, eligible, deadline, result):
+    groups = []
+    for c in route_cancellations:
+        by_tier: Dict[Any, List[int]] = {}
+        for position, passenger in enumerate(cancellations[c]["ordered_passengers"]):
+            by_tier.setdefault(passenger.get("loyalty_tier"), []).append(position)
+        groups.extend((c, tier, positions) for tier, positions in by_tier.items())
+
+    route_options = [option for c in route_cancellations for option in eligible[c]]
+    max_delay = max((delay for _, delay in route_options), default=0)
+    flight_node = {index: 2 + len(groups) + offset for offset, index in enumerate(sorted({index for index, _ in route_options}))}
+    network = MinCostFlow(2 + len(groups) + len(flight_node))
+    source, sink = 0, 1
+
+    edges = []
+    for g, (c, tier, positions) in enumerate(groups):
+        node = 2 + g
+        weight = delay_weight(tier)
+        network.add_edge(source, node, len(positions), 0)
+        network.add_edge(node, sink, len(positions), weight * (max_delay + UNSERVED_PENALTY_MINUTES))
+        edges.append([(index, delay, network.add_edge(node, flight_node[index], len(positions), weight * delay))
+                      for index, delay in eligible[c]])
+    for index, node in flight_node.items():
+        network.add_edge(node, sink, int(candidate_flights[index]["available_seats"]), 0)
+
+    network.solve(source, sink, deadline)
+
+    # Passengers within a group are interchangeable; hand out its seats earliest departure first
+    for (c, _, positions), group_edges in zip(groups, edges):
+        seats = [(index, delay) for index, delay, handle in group_edges for _ in range(network.flow_on(handle))]
+        for position, seat in zip(positions, seats):
+            result[c][position] = seat
+
+def _solve_greedy(cancellations, candidate_flights, eligible) -> List[List[Optional[Tuple[int, int]]]]:
+    """Cancellations in departure order, each passenger to the earliest eligible flight with a seat left."""
+    seats = {index: int(flight.get("available_seats") or 0) for index, flight in enumerate(candidate_flights)}
+    order = sorted(range(len(cancellations)), key=lambda c: str(cancellations[c].get("departure_time") or ""))
+    result = [[None] * len(cancellation["ordered_passengers"]) for cancellation in cancellations]
+    for c in order:
+        options = iter(eligible[c])
+        current = next(options, None)
+        for position in range(len(cancellations[c]["ordered_passengers"])):
+            while current is not None and seats[current[0]] <= 0:
+                current = next(options, None)
+            if current is None:
+                break
+            seats[current[0]] -= 1
+            result[c][position] = current
+    return result
+
+def optimize_rebooking(cancellations: List[Dict[str, Any]], candidate_flights: List[Dict[str, Any]],
+                       time_budget_seconds: Optional[float] = None, method: str = METHOD_MIN_COST_FLOW) -> RebookingPlan:
+    """
+    Rebook the passengers of several cancelled flights onto shared candidate flights.
+
+    Args:
+        cancellations: One dict per cancelled flight with flight_number,
+            departure_location, arrival_location, departure_time, arrival_time
+            and passengers (passenger_id, name, loyalty_tier)
+        candidate_flights: Flights that may take passengers (flight_number,
+            departure_location, arrival_location, departure_time, arrival_time,
+            available_seats, optionally status and gate)
+        time_budget_seconds: Wall-clock budget for the min-cost flow solve
+            (default REBOOKING_OPTIMIZER_TIME_BUDGET, 2s); past it, greedy is used
+        method: METHOD_MIN_COST_FLOW, or METHOD_GREEDY to skip the optimiser
+
+    Returns:
+        RebookingPlan with one assignment per passenger (new_flight '' when no
+        seat was found), the candidate flights with seats left, and a summary
+        including the method actually used. Flight numbers repeat across
+        dates, so each assignment also carries the chosen departure as
+        new_departure_time and flight_index (its position in plan.flights)
+    """
+    started = time.monotonic()
+    budget = DEFAULT_TIME_BUDGET_SECONDS if time_budget_seconds is None else time_budget_seconds
+    cancellations = [dict(cancellation, ordered_passengers=_sorted_passengers(cancellation.get("passengers") or []))
+                     for cancellation in cancellations]
+    eligible = _eligible_flights(cancellations, candidate_flights)
+
+    used_method = method
+    fallback_reason = None
+    if method == METHOD_MIN_COST_FLOW:
+        try:
+            seats = _solve_min_cost_flow(cancellations, candidate_flights, eligible, started + budget)
+        except OptimizerTimeout:
+            used_method = METHOD_GREEDY
+            fallback_reason = f"min-cost flow exceeded the {budget:g}s time budget"
+    if used_method == METHOD_GREEDY:
+        seats = _solve_greedy(cancellations, candidate_flights, eligible)
+    elif used_method != METHOD_MIN_COST_FLOW:
+        raise ValueError(f"Unknown rebooking method: {method}")
+
+    remaining = [int(flight.get("available_seats") or 0) for flight in candidate_flights]
+    assignments = []
+    weighted_delay = 0
+    for cancellation, cancellation_seats in zip(cancellations, seats):
+        for passenger, seat in zip(cancellation["ordered_passengers"], cancellation_seats):
+            assignment = {
+                "passenger_id": passenger.get("passenger_id"),
+                "name": passenger.get("name"),
+                "loyalty_tier": passenger.get("loyalty_tier"),
+                "original_flight": cancellation["flight_number"],
+                "new_flight": "",
+                "new_departure_time": None,
+                "flight_index": None,
+                "delay_minutes": None
+            }
+            if seat is not None:
+                index, delay = seat
+                remaining[index] -= 1
+                weighted_delay += delay_weight(passenger.get("loyalty_tier")) * delay
+                assignment.update(new_flight=candidate_flights[index]["flight_number"],
+                                  new_departure_time=candidate_flights[index].get("departure_time"),
+                                  flight_index=index, delay_minutes=delay)
+            assignments.append(assignment)
+
+    flights = [dict(flight, available_seats=seats_left) for flight, seats_left in zip(candidate_flights, remaining)]
+    seats_used = [int(flight.get("available_seats") or 0) - seats_left for flight, seats_left in zip(candidate_flights, remaining)]
+    assigned = sum(1 for assignment in assignments if assignment["new_flight"])
+
+    summary = {
+        'cancelled_flights': len(cancellations),
+        'total_passengers': len(assignments),
+        'passengers_assigned': assigned,
+        'passengers_not_assigned': len(assignments) - assigned,
+        'assignment_rate': assigned / len(assignments) * 100 if assignments else 0.0,
+        'flights_used': sum(1 for used in seats_used if used > 0),
+        'total_seats_used': sum(used for used in seats_used if used > 0),
+        'weighted_delay_minutes': weighted_delay,
+        'method': used_method,
+        'fallback_reason': fallback_reason,
+        'solve_seconds': round(time.monotonic() - started, 4)
+    }
+    return RebookingPlan(assignments=assignments, flights=flights, summary=summary)
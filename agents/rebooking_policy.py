@@ -0,0 +1,97 @@
+"""
+Routine-vs-complex policy for the passenger rebooking agent.
+
+Most cancellations need nothing the LLM agent adds. It would make the same
+tool calls hardcoded_rebooking_workflow makes, and then assign passengers with
+the same engine. Once the passengers, the cancelled flight and its nonstop
+alternatives are loaded, classify_cancellation decides whether the case is
+routine: a manageable number of passengers, enough nonstop seats for all of
+them, nobody with special needs and the flight details on hand. Routine cases
+go straight through the algorithmic pipeline. Anything else is kept for the
+LLM agent.
+"""
+
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+# Cancellations with more passengers than this go to the LLM agent
+ROUTINE_MAX_PASSENGERS = int(os.getenv("REBOOKING_ROUTINE_MAX_PASSENGERS", "200"))
+
+# Set REBOOKING_FAST_PATH=0 to send every cancellation to the LLM agent
+FAST_PATH_ENV = "REBOOKING_FAST_PATH"
+
+# Model requests one agent run makes: a turn per tool call in its five-step workflow, plus the final answer
+LLM_CALLS_PER_AGENT_RUN = 6
+
+ROUTINE = "routine"
+COMPLEX = "complex"
+
+# Reasons a cancellation is complex
+REASON_TOO_MANY_PASSENGERS = "passenger_count_above_limit"
+REASON_INSUFFICIENT_CAPACITY = "insufficient_nonstop_capacity"
+REASON_SPECIAL_NEEDS = "special_needs_passengers"
+REASON_MISSING_FLIGHT_DETAILS = "missing_flight_details"
+
+# special_needs values that mean "none"
+_NO_SPECIAL_NEEDS = {"", "none", "null", "n/a", "no", "false", "0"}
+
+@dataclass
+class RebookingDecision:
+    """Routine/complex classification of one cancellation and what it was based on."""
+    classification: str
+    passenger_count: int
+    seats_available: int
+    special_needs_count: int
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def routine(self) -> bool:
+        return self.classification == ROUTINE
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def fast_path_enabled() -> bool:
+    return os.getenv(FAST_PATH_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+def has_special_needs(passenger: Dict[str, Any]) -> bool:
+    value = passenger.get("special_needs")
+    return value is not None and str(value).strip().lower() not in _NO_SPECIAL_NEEDS
+
+def classify_cancellation(impacted_passengers: List[Dict[str, Any]], cancelled_flight_info: List[Dict[str, Any]],
+                          alternative_flights: List[Dict[str, Any]],
+                          max_passengers: int = ROUTINE_MAX_PASSENGERS) -> RebookingDecision:
+    """
+    Classify a cancellation from the data the algorithmic workflow gathers.
+
+    Args:
+        impacted_passengers: Passengers on the cancelled flight (get_impacted_passengers)
+        cancelled_flight_info: get_cancelled_flight_details result ([] when not found)
+        alternative_flights: Nonstop alternatives (find_alternative_flights)
+        max_passengers: Largest passenger count still handled as routine
+
+    Returns:
+        RebookingDecision, routine only when none of the REASON_* checks fire
+    """
+    passenger_count = len(impacted_passengers)
+    seats_available = sum(int(flight.get("available_seats") or 0) for flight in alternative_flights)
+    special_needs_count = sum(1 for passenger in impacted_passengers if has_special_needs(passenger))
+
+    reasons = []
+    if passenger_count > max_passengers:
+        reasons.append(REASON_TOO_MANY_PASSENGERS)
+    if seats_available < passenger_count:
+        reasons.append(REASON_INSUFFICIENT_CAPACITY)
+    if special_needs_count:
+        reasons.append(REASON_SPECIAL_NEEDS)
+    if not cancelled_flight_info or not cancelled_flight_info[0].get("departure_time"):
+        reasons.append(REASON_MISSING_FLIGHT_DETAILS)
+
+    return RebookingDecision(
+        classification=COMPLEX if reasons else ROUTINE,
+        passenger_count=passenger_count,
+        seats_available=seats_available,
+        special_needs_count=special_needs_count,
+        reasons=reasons
+    )
@@ -164,7 +164,9 @@ def create_llm_failure_test():
         
         # Simulate LLM failure by temporarily removing API key
         original_api_key = os.getenv("ANTHROPIC_API_KEY")
+        original_fast_path = os.getenv("REBOOKING_FAST_PATH")
         os.environ["ANTHROPIC_API_KEY"] = ""  # Clear the API key to force fallback
+        os.environ["REBOOKING_FAST_PATH"] = "0"  # Routine cases would otherwise never reach the LLM
         
         try:
             result = llm_passenger_rebooking_agent(state)
@@ -174,6 +176,10 @@ def create_llm_failure_test():
                 os.environ["ANTHROPIC_API_KEY"] = original_api_key
             else:
                 os.environ.pop("ANTHROPIC_API_KEY", None)
+            if original_fast_path is not None:
+                os.environ["REBOOKING_FAST_PATH"] = original_fast_path
+            else:
+                os.environ.pop("REBOOKING_FAST_PATH", None)
         
         result["current_step"] = result.get("current_step", 0) + 1
         return result
@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import shutil
+import sqlite3
+
+from agents import llm_passenger_rebooking_agent as rebooking
+from agents.connection_search import ConnectionGraph, Itinerary, connection_proposal_fields
+from agents.passenger_assignment import assign_passengers, merge_assignments
+from services.database_mcp_client import DatabaseMCPClient
+from services.database_mcp_server import UnitedAirlinesDatabaseMCPServer
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "database", "united_ops.db")
+
+def _flight(flight_number, origin, destination, departure, arrival, seats, status="scheduled"):
+    return {"flight_number": flight_number, "departure_location": origin, "arrival_location": destination,
+            "departure_time": f"2025-06-25 {departure}:00", "arrival_time": f"2025-06-25 {arrival}:00",
+            "available_seats": seats, "status": status, "gate": "B1"}
+
+def _network():
+    return [
+        _flight("UA100", "DEN", "SEA", "12:00", "14:00", 0),              # full nonstop
+        _flight("UA101", "DEN", "SEA", "12:30", "14:30", 9, "cancelled"),
+        _flight("UA200", "DEN", "ORD", "09:00", "12:00", 3),
+        _flight("UA201", "ORD", "SEA", "12:30", "15:00", 5),              # 30 min after UA200: too tight
+        _flight("UA202", "ORD", "SEA", "13:00", "15:30", 5),
+        _flight("UA300", "DEN", "SFO", "09:30", "11:00", 4),
+        _flight("UA301", "SFO", "SEA", "12:00", "14:10", 2),
+        _flight("UA302", "SFO", "ORD", "11:50", "13:00", 9),
+        _flight("UA303", "ORD", "SEA", "14:00", "16:30", 9),
+        _flight("UA304", "ORD", "DEN", "13:50", "16:00", 9)                # back to the origin: never used
+    ]
+
+def test_search_orders_by_arrival_and_reserves_leg_seats():
+    itineraries = ConnectionGraph(_network()).search("DEN", "SEA", "2025-06-25 08:00:00")
+
+    assert [itinerary.flight_numbers for itinerary in itineraries] == [
+        ["UA300", "UA301"], ["UA200", "UA202"], ["UA300", "UA302", "UA303"]
+    ]
+    # UA300 has 4 seats: 2 go with UA301 and the other 2 with the two-stop itinerary
+    assert [itinerary.seats for itinerary in itineraries] == [2, 3, 2]
+    assert itineraries[2].stops == 2
+    assert itineraries[2].connection_airports == ["SFO", "ORD"]
+
+def test_search_stops_once_passengers_are_covered():
+    graph = ConnectionGraph(_network())
+
+    assert len(graph.search("DEN", "SEA", "2025-06-25 08:00:00", passenger_count=4)) == 2
+    assert graph.search("DEN", "SEA", "2025-06-25 08:00:00", max_stops=1)[-1].flight_numbers == ["UA200", "UA202"]
+    # The first legs must leave after departure_after
+    assert graph.search("DEN", "SEA", "2025-06-25 09:15:00")[0].flight_numbers == ["UA300", "UA301"]
+    assert graph.search("DEN", "SEA", "2025-06-25 09:45:00") == []
+
+def test_min_stops_leaves_out_nonstops():
+    network = _network() + [_flight("UA102", "DEN", "SEA", "10:00", "12:00", 5)]
+    graph = ConnectionGraph(network)
+
+    assert graph.search("DEN", "SEA", "2025-06-25 08:00:00")[0].flight_numbers == ["UA102"]
+    assert all(itinerary.stops >= 1 for itinerary in graph.search("DEN", "SEA", "2025-06-25 08:00:00", min_stops=1))
+
+def test_itineraries_feed_the_assignment_engine():
+    itineraries = ConnectionGraph(_network()).search("DEN", "SEA", "2025-06-25 08:00:00", passenger_count=3)
+    passengers = [{"passenger_id": f"P{i}", "name": f"Passenger {i}", "loyalty_tier": tier}
+                  for i, tier in enumerate(["Basic", "1K", "Gold"])]
+
+    nonstop = assign_passengers(passengers, [_network()[0]])
+    merged = merge_assignments(nonstop, assign_passengers(passengers, [itinerary.to_flight() for itinerary in itineraries],
+                                                                  order_by='arrival_time'))
+
+    assert merged['summary']['passengers_assigned'] == 3
+    assert [p['new_flight'] for p in merged['passengers']] == ["UA300+UA301", "UA300+UA301", "UA200+UA202"]
+    assert [p['loyalty_tier'] for p in merged['passengers']] == ["1K", "Gold", "Basic"]
+    # Second-pass indexes point past the first pass's flights
+    assert [merged['flights'][p['flight_index']]['flight_number'] for p in merged['passengers']] == [p['new_flight'] for p in merged['passengers']]
+
+    flight = next(f for f in merged['flights'] if f['flight_number'] == "UA200+UA202")
+    fields = connection_proposal_fields(flight)
+    assert fields['rebooked_flight'] == "UA200"
+    assert fields['new_departure_time'] == "2025-06-25 09:00:00"
+    assert fields['connecting_flights'] == [{"flight_number": "UA202", "departure_time": "2025-06-25 13:00:00"}]
+
+def test_confirmed_connection_takes_a_seat_on_every_leg(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "united_ops.db")
+    shutil.copy(SOURCE_DB, db_path)
+
+    def seats():
+        with sqlite3.connect(db_path) as conn:
+            return dict(conn.execute("SELECT flight_number, available_seats FROM flights WHERE flight_number IN ('UA70161', 'UA1018')"))
+
+    server = UnitedAirlinesDatabaseMCPServer(db_path=db_path, pool_size=2)
+    monkeypatch.setattr(rebooking, "_database_client", DatabaseMCPClient(server=server))
+    try:
+        legs = [server.execute_tool("get_flight_details", {"flight_number": number})["result"]["details"] for number in ("UA70161", "UA1018")]
+        passenger = server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": 1})["result"][0]
+        before = seats()
+
+        proposal = connection_proposal_fields(Itinerary(legs=legs, seats=1).to_flight())
+        updated = rebooking.update_passenger_records.invoke({"confirmations": [
+            {"passenger_id": passenger["passenger_id"], "rebooked_flight": proposal["rebooked_flight"],
+             "new_departure_time": proposal["new_departure_time"], "connecting_flights": proposal["connecting_flights"]}
+        ]})
+
+        assert updated == 1
+        # The next search sees the seat gone from the second leg too
+        assert seats() == {"UA70161": before["UA70161"] - 1, "UA1018": before["UA1018"] - 1}
+    finally:
+        server.close()
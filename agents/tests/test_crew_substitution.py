@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import itertools
+import shutil
+import sqlite3
+import numpy as np
+import pytest
+
+from agents import crew_ops_agent
+from agents.crew_substitution import solve_assignment, plan_substitutions
+from agents.crew_ops_agent import propose_substitutes_tool as crew_ops_propose_substitutes
+from services.database_mcp_client import DatabaseMCPClient
+from services.database_mcp_server import UnitedAirlinesDatabaseMCPServer
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "database", "united_ops.db")
+
+def test_solve_assignment_matches_brute_force():
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        n = int(rng.integers(1, 6))
+        m = int(rng.integers(n, 7))
+        # Coarse values so ties are common
+        cost = rng.integers(0, 4, (n, m)) * 0.1 + rng.integers(0, 3, m) * 0.3
+        assignment = solve_assignment(cost)
+
+        assert len(set(assignment.tolist())) == n
+        best = min(sum(cost[i, cols[i]] for i in range(n)) for cols in itertools.permutations(range(m), n))
+        assert cost[np.arange(n), assignment].sum() == pytest.approx(best, abs=1e-9)
+
+def _schedule():
+    return [
+        {"crew_id": "P1", "assigned_flight": "UA100", "role": "Pilot", "base": "ORD",
+         "duty_start": "2025-06-25 08:00:00", "duty_end": "2025-06-25 12:00:00"},
+        {"crew_id": "A1", "assigned_flight": "UA100", "role": "Attendant", "base": "ORD",
+         "duty_start": "2025-06-25 08:00:00", "duty_end": "2025-06-25 12:00:00"},
+        {"crew_id": "P2", "assigned_flight": "UA200", "role": "Pilot", "base": "DEN",
+         "duty_start": "2025-06-25 09:00:00", "duty_end": "2025-06-25 13:00:00"},
+        {"crew_id": "P3", "assigned_flight": "UA300", "role": "Pilot", "base": "ORD",
+         "duty_start": "2025-06-25 10:00:00", "duty_end": "2025-06-25 14:00:00"}
+    ]
+
+def test_plan_prefers_local_rested_crew_across_flights():
+    unassigned = [
+        # Lowest fatigue, but based in DEN: best used on UA200 rather than deadheading to ORD
+        {"crew_id": "R1", "role": "Pilot", "base": "DEN", "fatigue_score": 0.1, "rest_hours_prior": 14},
+        {"crew_id": "R2", "role": "Pilot", "base": "ORD", "fatigue_score": 0.3, "rest_hours_prior": 14},
+        {"crew_id": "R3", "role": "Pilot", "base": "ORD", "fatigue_score": 0.5, "rest_hours_prior": 14},
+        # Over the fatigue limit, and already on duty during UA100: never chosen
+        {"crew_id": "R4", "role": "Pilot", "base": "ORD", "fatigue_score": 1.2, "rest_hours_prior": 14},
+        {"crew_id": "R5", "role": "Pilot", "base": "ORD", "fatigue_score": 0.0, "rest_hours_prior": 14,
+         "duty_start": "2025-06-25 07:00:00", "duty_end": "2025-06-25 15:00:00"},
+        {"crew_id": "R6", "role": "Attendant", "base": "ORD", "fatigue_score": 0.2, "rest_hours_prior": 14}
+    ]
+
+    plan = plan_substitutions(["UA100", "UA200", "UA300"], _schedule(), unassigned)
+
+    assert plan.substitutions["UA200"] == ["R1"]
+    assert sorted(plan.substitutions["UA100"] + plan.substitutions["UA300"]) == ["R2", "R3", "R6"]
+    assert not plan.assignments["deadhead"].any()
+    assert plan.unfilled == {}
+    assert set(plan.assignments["replaces"]) == {"P1", "A1", "P2", "P3"}
+
+def test_plan_leaves_slots_empty_without_legal_candidates():
+    unassigned = [
+        {"crew_id": "R1", "role": "Pilot", "base": "ORD", "fatigue_score": 0.2, "rest_hours_prior": 8},
+        {"crew_id": "R2", "role": "Pilot", "base": "DEN", "fatigue_score": 0.4, "rest_hours_prior": 12}
+    ]
+
+    plan = plan_substitutions(["UA100", "UA200"], _schedule(), unassigned)
+
+    # R1 is short of rest; R2 covers one pilot slot (its own base) and nothing covers the rest
+    assert plan.substitutions == {"UA100": [], "UA200": ["R2"]}
+    assert plan.unfilled == {"UA100": 2}
+
+def test_agent_tool_uses_min_cost_plan():
+    unassigned = [
+        {"crew_id": "R1", "role": "Pilot", "base": "DEN", "fatigue_score": 0.1, "rest_hours_prior": 14},
+        {"crew_id": "R2", "role": "Pilot", "base": "ORD", "fatigue_score": 0.5, "rest_hours_prior": 14}
+    ]
+    substitutions = crew_ops_propose_substitutes.invoke({
+        "violations": ["UA300"], "crew_schedule": _schedule(), "unassigned_crew": unassigned
+    })
+    # First-N would have taken R1 and deadheaded them to ORD
+    assert substitutions == {"UA300": ["R2"]}
+
+def test_unassigned_crew_from_db_carries_duty_and_rest_times(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "united_ops.db")
+    shutil.copy(SOURCE_DB, db_path)
+    with sqlite3.connect(db_path) as conn:
+        # Every unassigned pilot is tired, except three that each look fine on fatigue and rest_hours_prior alone
+        conn.execute("UPDATE crew SET fatigue_score = 0.9 WHERE assigned_flight = 'UNASSIGNED' AND role = 'Pilot'")
+        pilots = [row[0] for row in conn.execute("SELECT crew_id FROM crew WHERE assigned_flight = 'UNASSIGNED' AND role = 'Pilot' LIMIT 3")]
+        conn.executemany("UPDATE crew SET crew_id = ? WHERE crew_id = ?", zip(["BUSY", "SHORT", "READY"], pilots))
+        conn.executemany("UPDATE crew SET fatigue_score = ?, rest_hours_prior = 20, last_flight_end = ?, duty_start = ?, duty_end = ? "
+                         "WHERE crew_id = ?", [
+                             # Already on duty across UA300's 10:00-14:00 slot
+                             (0.0, "2025-06-24 12:00:00", "2025-06-25 07:00:00", "2025-06-25 15:00:00", "BUSY"),
+                             # Landed seven hours before the slot
+                             (0.05, "2025-06-25 03:00:00", None, None, "SHORT"),
+                             (0.3, "2025-06-24 12:00:00", None, None, "READY")
+                         ])
+
+    server = UnitedAirlinesDatabaseMCPServer(db_path=db_path, pool_size=2)
+    monkeypatch.setattr(crew_ops_agent, "_database_client", DatabaseMCPClient(server=server))
+    try:
+        unassigned = crew_ops_agent.get_unassigned_crew_from_db.invoke({})
+        assert {"last_flight_end", "duty_start", "duty_end"} <= set(unassigned[0])
+
+        substitutions = crew_ops_propose_substitutes.invoke({
+            "violations": ["UA300"], "crew_schedule": _schedule(), "unassigned_crew": unassigned
+        })
+        assert substitutions == {"UA300": ["READY"]}
+    finally:
+        server.close()
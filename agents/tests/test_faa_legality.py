@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import sqlite3
+import pandas as pd
+import pytest
+
+from agents.faa_legality import (
+    check_legality, find_violating_flights,
+    MAX_DUTY_HOURS, MIN_REST_HOURS, MAX_FATIGUE_SCORE,
+    REASON_DUTY, REASON_REST, REASON_FATIGUE
+)
+from agents.crew_ops_agent import check_legality_tool as crew_ops_check_legality
+from agents.dispatch_ops_agent import check_legality_tool as dispatch_check_legality
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "database", "united_ops.db")
+
+def _row_by_row_violations(crew_schedule):
+    """The per-row groupby/iterrows check the agents used before the columnar engine."""
+    df = pd.DataFrame(crew_schedule)
+    violations = []
+    for flight_id, group in df.groupby("assigned_flight"):
+        for _, row in group.iterrows():
+            duty_hours = (pd.to_datetime(row["duty_end"]) - pd.to_datetime(row["duty_start"])) / pd.Timedelta(hours=1)
+            if duty_hours > MAX_DUTY_HOURS or row["rest_hours_prior"] < MIN_REST_HOURS or row["fatigue_score"] > MAX_FATIGUE_SCORE:
+                violations.append(flight_id)
+                break
+    return sorted(set(violations))
+
+@pytest.fixture(scope="module")
+def crew_rows():
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    try:
+        df = pd.read_sql_query("SELECT * FROM crew WHERE assigned_flight IS NOT NULL AND assigned_flight != ''", conn)
+    finally:
+        conn.close()
+    return df.to_dict(orient="records")
+
+def test_matches_row_by_row_check_on_database_roster(crew_rows):
+    expected = _row_by_row_violations(crew_rows)
+    assert expected
+    assert find_violating_flights(crew_rows) == expected
+    assert sorted(crew_ops_check_legality.invoke({"crew_schedule": crew_rows})) == expected
+    assert sorted(dispatch_check_legality(crew_rows)) == expected
+
+def test_reports_reasons_per_crew_member():
+    crew_schedule = [
+        {"flight_id": "UA100", "crew": [
+            {"crew_id": "C1", "duty_start": "2025-06-25 06:00:00", "duty_end": "2025-06-25 18:00:00",
+             "rest_hours_prior": 12, "fatigue_score": 0.4},
+            {"crew_id": "C2", "duty_start": "2025-06-25 06:00:00", "duty_end": "2025-06-25 10:00:00",
+             "rest_hours_prior": 8, "fatigue_score": 1.3}
+        ]},
+        {"flight_id": "UA200", "crew": [
+            {"crew_id": "C3", "duty_start": "2025-06-25 06:00:00", "duty_end": "2025-06-25 12:00:00",
+             "rest_hours_prior": 11, "fatigue_score": 0.5},
+            # Missing values are never violations
+            {"crew_id": "C4", "duty_start": None, "duty_end": "2025-06-25 12:00:00",
+             "rest_hours_prior": None, "fatigue_score": 0.2}
+        ]}
+    ]
+
+    report = check_legality(crew_schedule)
+
+    assert report.flights == ["UA100"]
+    assert report.violations_by_crew() == [
+        {"crew_id": "C1", "assigned_flight": "UA100", "reasons": (REASON_DUTY,),
+         "duty_hours": 12.0, "rest_hours_prior": 12.0, "fatigue_score": 0.4},
+        {"crew_id": "C2", "assigned_flight": "UA100", "reasons": (REASON_REST, REASON_FATIGUE),
+         "duty_hours": 4.0, "rest_hours_prior": 8.0, "fatigue_score": 1.3}
+    ]
+    # Flattening must not mutate the caller's crew dicts
+    assert "assigned_flight" not in crew_schedule[0]["crew"][0]
+
+    # Thresholds are parameters
+    assert find_violating_flights(crew_schedule, max_duty_hours=13, min_rest_hours=8, max_fatigue_score=1.5) == []
+
+def test_missing_columns_raise():
+    with pytest.raises(ValueError, match="Missing required fields"):
+        check_legality([{"assigned_flight": "UA100", "duty_start": "2025-06-25 06:00:00"}])
@@ -0,0 +1,132 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from typing import Any, Dict, List
+
+from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain.prompts import ChatPromptTemplate
+from langchain.tools import tool
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_anthropic import ChatAnthropic
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+from agents import llm_cache
+from agents.llm_cache import SQLiteLLMCache, cache_key, chat_model_options
+
+def _generations(text: str) -> List[ChatGeneration]:
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+def test_lookup_and_update(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "cache.db"))
+
+    assert cache.lookup("prompt", "model-a") is None
+    cache.update("prompt", "model-a", _generations("answer"))
+
+    assert cache.lookup("prompt", "model-a")[0].message.content == "answer"
+    assert cache.lookup("prompt", "model-b") is None
+    assert cache.lookup("other prompt", "model-a") is None
+    assert SQLiteLLMCache(str(tmp_path / "cache.db")).lookup("prompt", "model-a")[0].text == "answer"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["entries"]) == (1, 3, 1, 1)
+    assert stats["hit_rate"] == 0.25
+
+def test_ttl_and_size_eviction(tmp_path):
+    expired = SQLiteLLMCache(str(tmp_path / "expired.db"), ttl_seconds=-1)
+    expired.update("prompt", "model", _generations("answer"))
+    assert expired.lookup("prompt", "model") is None
+
+    cache = SQLiteLLMCache(str(tmp_path / "cache.db"))
+    for prompt in ("a", "b", "c"):
+        cache.update(prompt, "model", _generations(prompt * 10))
+    entry_size = cache.stats()["bytes"] // 3
+    assert cache.lookup("a", "model") is not None
+
+    # Room for two entries: "b" is the least recently used once "a" has been read
+    cache.max_bytes = entry_size * 2 + entry_size // 2
+    cache.update("d", "model", _generations("d" * 10))
+    assert [prompt for prompt in "abcd" if cache.lookup(prompt, "model") is not None] == ["a", "d"]
+    assert cache.stats()["evictions"] == 2
+
+class ToolCallingFakeChatModel(FakeMessagesListChatModel):
+    """Fake chat model that can sit under a tool-calling AgentExecutor."""
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        # Like a real model's name and temperature; the scripted responses stay out of the cache key
+        return {"model": "fake-tool-calling"}
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(self, *args: Any, **kwargs: Any):
+        self._calls += 1
+        return super()._generate(*args, **kwargs)
+
+@tool
+def lookup_gate(flight_number: str) -> str:
+    """Gate for a flight."""
+    return "B12"
+
+def _run_agent(model, flight_number: str) -> str:
+    prompt = ChatPromptTemplate.from_messages([("system", "You are a gate agent."), ("user", "{input}"),
+                                               ("placeholder", "{agent_scratchpad}")])
+    agent = create_tool_calling_agent(llm=model, tools=[lookup_gate], prompt=prompt)
+    return AgentExecutor(agent=agent, tools=[lookup_gate]).invoke({"input": f"Gate for {flight_number}?"})["output"]
+
+def test_agent_executor_replays_from_cache(tmp_path, monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_BYPASS", raising=False)
+    monkeypatch.setattr(llm_cache, "_llm_cache", SQLiteLLMCache(str(tmp_path / "cache.db")))
+    responses = [
+        AIMessage(content="", tool_calls=[{"name": "lookup_gate", "args": {"flight_number": "UA100"}, "id": "call_1"}]),
+        AIMessage(content="Gate B12")
+    ]
+    model = ToolCallingFakeChatModel(responses=responses, **chat_model_options())
+
+    assert _run_agent(model, "UA100") == "Gate B12"
+    assert model.calls == 2
+    # Same conversation, tool results included: both model turns come from the cache
+    assert _run_agent(model, "UA100") == "Gate B12"
+    assert model.calls == 2
+    assert llm_cache.get_llm_cache().stats()["hits"] == 2
+
+    # A different input is a different conversation
+    _run_agent(model, "UA200")
+    assert model.calls == 4
+
+def test_bypass(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_BYPASS", "1")
+    assert llm_cache.get_llm_cache() is None
+    assert chat_model_options() == {}
+
+    monkeypatch.setenv("LLM_CACHE_BYPASS", "0")
+    monkeypatch.setattr(llm_cache, "_llm_cache", None)
+    assert chat_model_options(bypass=True) == {}
+    options = chat_model_options()
+    assert isinstance(options["cache"], SQLiteLLMCache) and options["disable_streaming"] is True
+
+def test_key_covers_model_settings_tools_and_tool_results():
+    llm = ChatAnthropic(model_name="claude-3-5-sonnet-latest", temperature=0.1, api_key="test-key")
+    warmer = ChatAnthropic(model_name="claude-3-5-sonnet-latest", temperature=0.7, api_key="test-key")
+    tools = llm.bind_tools([lookup_gate]).kwargs["tools"]
+    assert len({llm._get_llm_string(), warmer._get_llm_string(), llm._get_llm_string(tools=tools)}) == 3
+    assert "test-key" not in llm._get_llm_string()
+
+    call = AIMessage(content="", tool_calls=[{"name": "lookup_gate", "args": {"flight_number": "UA100"}, "id": "call_1"}])
+    conversation = [HumanMessage(content="Gate for UA100?"), call]
+    b12 = dumps(conversation + [ToolMessage(content="B12", tool_call_id="call_1")])
+    c4 = dumps(conversation + [ToolMessage(content="C4", tool_call_id="call_1")])
+    assert cache_key(b12, "model") != cache_key(c4, "model")
+
+    # A replayed response carries a new id and usage, but continues the same conversation
+    replayed = call.model_copy(update={"id": "run-2", "usage_metadata": {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}})
+    assert cache_key(dumps([conversation[0], replayed]), "model") == cache_key(dumps(conversation), "model")
@@ -0,0 +1,128 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import random
+import pandas as pd
+
+from agents.passenger_assignment import assign_passengers, SeatQueue
+from agents.llm_passenger_rebooking_agent import assign_passengers_to_flights, hardcoded_rebooking_workflow
+
+TIERS = ['1K', 'Platinum', 'Gold', 'Silver', 'Basic', 'Premier']
+
+def _nested_loop_assignment(impacted_passengers_data, alternative_flights_data):
+    """The iterrows-within-iterrows assignment the rebooking agent used before the engine."""
+    passengers_df = pd.DataFrame(impacted_passengers_data)
+    flights_df = pd.DataFrame(alternative_flights_data)
+    passengers_df['new_flight'] = ''
+    passengers_df['flight_index'] = None
+    flights_df['departure_time'] = pd.to_datetime(flights_df['departure_time'])
+    flights_df['arrival_time'] = pd.to_datetime(flights_df['arrival_time'])
+    loyalty_priority = {'1K': 5, 'Platinum': 4, 'Gold': 3, 'Silver': 2, 'Basic': 1}
+    passengers_df['priority_score'] = passengers_df['loyalty_tier'].apply(lambda tier: loyalty_priority.get(tier, 0))
+    passengers_df = passengers_df.sort_values(['priority_score', 'passenger_id'], ascending=[False, True])
+    flights_df = flights_df.sort_values('departure_time')
+
+    assignment_details = []
+    for idx, passenger in passengers_df.iterrows():
+        for position, (flight_idx, flight) in enumerate(flights_df.iterrows()):
+            if flight['available_seats'] > 0:
+                passengers_df.loc[idx, 'new_flight'] = flight['flight_number']
+                passengers_df.loc[idx, 'flight_index'] = position
+                flights_df.loc[flight_idx, 'available_seats'] -= 1
+                assignment_details.append({
+                    'passenger_id': passenger['passenger_id'],
+                    'loyalty_tier': passenger['loyalty_tier'],
+                    'assigned_flight': flight['flight_number'],
+                    'departure_time': str(flight['departure_time']),
+                    'remaining_seats': flight['available_seats'] - 1
+                })
+                break
+
+    original_flights_df = pd.DataFrame(alternative_flights_data)
+    flights_used = 0
+    total_seats_used = 0
+    for idx, flight in flights_df.iterrows():
+        original_seats = original_flights_df.loc[original_flights_df['flight_number'] == flight['flight_number'], 'available_seats'].iloc[0]
+        seats_used = original_seats - flight['available_seats']
+        if seats_used > 0:
+            flights_used += 1
+            total_seats_used += seats_used
+
+    return {
+        'passengers': passengers_df.to_dict('records'),
+        'flights': flights_df.to_dict('records'),
+        'summary': {
+            'total_passengers': len(passengers_df),
+            'passengers_assigned': len(assignment_details),
+            'passengers_not_assigned': len(passengers_df) - len(assignment_details),
+            'assignment_rate': len(assignment_details) / len(passengers_df) * 100,
+            'flights_used': flights_used,
+            'total_seats_used': total_seats_used,
+            'assignment_details': assignment_details
+        }
+    }
+
+def test_engine_matches_nested_loop_assignment():
+    rng = random.Random(11)
+    for _ in range(25):
+        passengers = [
+            {"passenger_id": f"P{i:04d}", "name": f"Passenger {i}", "loyalty_tier": rng.choice(TIERS)}
+            for i in rng.sample(range(1000), rng.randint(1, 60))
+        ]
+        flights = [
+            {"flight_number": f"UA{i}", "departure_time": f"2025-06-25 {i:02d}:00:00",
+             "arrival_time": f"2025-06-25 {i + 1:02d}:30:00", "available_seats": rng.randint(0, 8)}
+            for i in rng.sample(range(20), rng.randint(1, 10))
+        ]
+        assert assign_passengers(passengers, flights) == _nested_loop_assignment(passengers, flights)
+
+def test_agent_tool_reports_unassigned_passengers():
+    passengers = [
+        {"passenger_id": "P1", "name": "A", "loyalty_tier": "Basic"},
+        {"passenger_id": "P2", "name": "B", "loyalty_tier": "1K"},
+        {"passenger_id": "P3", "name": "C", "loyalty_tier": "Gold"}
+    ]
+    flights = [
+        {"flight_number": "UA2", "departure_time": "2025-06-25 12:00:00", "arrival_time": "2025-06-25 14:00:00", "available_seats": 1},
+        {"flight_number": "UA1", "departure_time": "2025-06-25 11:00:00", "arrival_time": "2025-06-25 13:00:00", "available_seats": 1},
+        {"flight_number": "UA3", "departure_time": "2025-06-25 10:00:00", "arrival_time": "2025-06-25 12:00:00", "available_seats": 0}
+    ]
+
+    result = assign_passengers_to_flights.invoke({"impacted_passengers_data": passengers, "alternative_flights_data": flights})
+
+    assert [(p['passenger_id'], p['new_flight']) for p in result['passengers']] == [("P2", "UA1"), ("P3", "UA2"), ("P1", "")]
+    assert [f['available_seats'] for f in result['flights']] == [0, 0, 0]
+    assert result['summary']['passengers_not_assigned'] == 1
+    assert result['summary']['flights_used'] == 2
+
+def test_seat_queue_serves_earliest_open_flight():
+    queue = SeatQueue([0, 2, 1])
+    assert [queue.take() for _ in range(4)] == [1, 1, 2, None]
+    assert queue.available_seats == [0, 0, 0]
+
+def test_proposals_use_the_assigned_departure_of_a_repeated_flight_number():
+    passengers = [
+        {"passenger_id": "P1", "name": "A", "loyalty_tier": "1K"},
+        {"passenger_id": "P2", "name": "B", "loyalty_tier": "Gold"}
+    ]
+    # Same flight number on two days, one seat each
+    flights = [
+        {"flight_number": "UA1853", "departure_time": "2025-07-01 08:00:00", "arrival_time": "2025-07-01 11:00:00",
+         "available_seats": 1, "gate": "C2"},
+        {"flight_number": "UA1853", "departure_time": "2025-06-20 08:00:00", "arrival_time": "2025-06-20 11:00:00",
+         "available_seats": 1, "gate": "B7"}
+    ]
+    state = {
+        "messages": [],
+        "flight_cancellation_notification": {"flight_number": "UA999", "arrival_location": "ORD"},
+        "impacted_passengers_data": passengers,
+        "cancelled_flight_info": [{"departure_time": "2025-06-20 07:00:00", "departure_location": "JFK"}],
+        "alternative_flights_data": flights
+    }
+
+    proposals = hardcoded_rebooking_workflow(state, inputs_gathered=True)["rebooking_proposals"]
+
+    assert [(p["passenger_id"], p["rebooked_flight"], str(p["new_departure_time"]), p["new_gate"]) for p in proposals] == [
+        ("P1", "UA1853", "2025-06-20 08:00:00", "B7"),
+        ("P2", "UA1853", "2025-07-01 08:00:00", "C2")
+    ]
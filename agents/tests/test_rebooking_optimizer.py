@@ -0,0 +1,135 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import random
+import pytest
+
+from agents import llm_passenger_rebooking_agent as rebooking
+from agents.rebooking_optimizer import optimize_rebooking, METHOD_GREEDY, METHOD_MIN_COST_FLOW
+
+def _flight(flight_number, departure, arrival, seats, route=("ORD", "DEN")):
+    return {"flight_number": flight_number, "departure_location": route[0], "arrival_location": route[1],
+            "departure_time": departure, "arrival_time": arrival, "available_seats": seats}
+
+def _cancellation(flight_number, departure, arrival, passengers, route=("ORD", "DEN")):
+    return dict(_flight(flight_number, departure, arrival, 0, route), passengers=passengers)
+
+def test_early_seat_goes_to_higher_tier_across_cancellations():
+    # UA100 departs first, so greedy gives its Basic passenger the only early seat
+    cancellations = [
+        _cancellation("UA100", "2025-06-25 08:00:00", "2025-06-25 10:00:00",
+                      [{"passenger_id": "P1", "name": "Basic Flyer", "loyalty_tier": "Basic"}]),
+        _cancellation("UA200", "2025-06-25 09:00:00", "2025-06-25 11:00:00",
+                      [{"passenger_id": "P2", "name": "Top Flyer", "loyalty_tier": "1K"}])
+    ]
+    candidates = [
+        _flight("UA300", "2025-06-25 12:00:00", "2025-06-25 14:00:00", 1),
+        _flight("UA400", "2025-06-25 20:00:00", "2025-06-25 22:00:00", 1)
+    ]
+
+    greedy = optimize_rebooking(cancellations, candidates, method=METHOD_GREEDY)
+    plan = optimize_rebooking(cancellations, candidates, time_budget_seconds=10)
+
+    assert {a["passenger_id"]: a["new_flight"] for a in greedy.assignments} == {"P1": "UA300", "P2": "UA400"}
+    assert {a["passenger_id"]: a["new_flight"] for a in plan.assignments} == {"P1": "UA400", "P2": "UA300"}
+    assert plan.summary["method"] == METHOD_MIN_COST_FLOW
+    assert plan.summary["weighted_delay_minutes"] < greedy.summary["weighted_delay_minutes"]
+    assert [f["available_seats"] for f in plan.flights] == [0, 0]
+
+def _repeated_flight_number():
+    cancellations = [_cancellation("UA100", "2025-06-25 08:00:00", "2025-06-25 10:00:00",
+                                   [{"passenger_id": "P1", "name": "Top Flyer", "loyalty_tier": "1K"}])]
+    # Same flight number on two dates; only the next day's departure has a seat
+    candidates = [
+        dict(_flight("UA300", "2025-06-26 12:00:00", "2025-06-26 14:00:00", 4), gate="C7"),
+        dict(_flight("UA300", "2025-06-25 12:00:00", "2025-06-25 14:00:00", 0), gate="B1")
+    ]
+    return cancellations, candidates
+
+def test_assignments_identify_the_departure_not_just_the_flight_number():
+    cancellations, candidates = _repeated_flight_number()
+    plan = optimize_rebooking(cancellations, candidates)
+
+    assignment = plan.assignments[0]
+    assert (assignment["new_flight"], assignment["flight_index"]) == ("UA300", 0)
+    assert assignment["new_departure_time"] == "2025-06-26 12:00:00"
+
+def test_global_workflow_proposes_the_chosen_departure(monkeypatch):
+    cancellations, candidates = _repeated_flight_number()
+    monkeypatch.setattr(rebooking, "load_cancellations",
+                        lambda numbers: {"cancellations": cancellations, "candidate_flights": candidates})
+
+    state = rebooking.llm_passenger_rebooking_agent({
+        "messages": [], "flight_cancellation_notifications": [{"flight_number": "UA100"}]
+    })
+
+    proposal = state["rebooking_proposals"][0]
+    assert state["workflow_type"] == "global_optimizer"
+    assert (proposal["new_departure_time"], proposal["new_gate"], proposal["remaining_seats"]) == ("2025-06-26 12:00:00", "C7", 3)
+
+def _random_disruption(seed, ample_seats=False):
+    rng = random.Random(seed)
+    routes = [("ORD", "DEN"), ("ORD", "SFO")]
+    tiers = ["1K", "Platinum", "Gold", "Silver", "Basic"]
+    cancellations, candidates = [], []
+    for i in range(6):
+        route = rng.choice(routes)
+        hour = rng.randint(6, 12)
+        passengers = [{"passenger_id": f"C{i}P{j}", "name": f"Passenger {j}", "loyalty_tier": rng.choice(tiers)}
+                      for j in range(rng.randint(5, 30))]
+        cancellations.append(_cancellation(f"C{i}", f"2025-06-25 {hour:02d}:00:00", f"2025-06-25 {hour + 3:02d}:00:00",
+                                           passengers, route))
+    for i in range(12):
+        # With ample seats every flight departs after every cancellation and each route has room for all
+        route = routes[i % 2] if ample_seats else rng.choice(routes)
+        hour = rng.randint(13, 20) if ample_seats else rng.randint(7, 20)
+        seats = rng.randint(30, 40) if ample_seats else rng.randint(0, 15)
+        candidates.append(_flight(f"F{i}", f"2025-06-25 {hour:02d}:30:00", f"2025-06-25 {hour + 3:02d}:30:00",
+                                  seats, route))
+    return cancellations, candidates
+
+@pytest.mark.parametrize("seed", range(5))
+def test_min_cost_flow_respects_constraints(seed):
+    cancellations, candidates = _random_disruption(seed)
+    greedy = optimize_rebooking(cancellations, candidates, method=METHOD_GREEDY)
+    plan = optimize_rebooking(cancellations, candidates, time_budget_seconds=10)
+
+    assert plan.summary["passengers_assigned"] >= greedy.summary["passengers_assigned"]
+
+    # Seat capacity, route and departure order are respected
+    seats = {f["flight_number"]: f for f in candidates}
+    used = {}
+    originals = {c["flight_number"]: c for c in cancellations}
+    for assignment in plan.assignments:
+        if not assignment["new_flight"]:
+            continue
+        flight, original = seats[assignment["new_flight"]], originals[assignment["original_flight"]]
+        assert flight["arrival_location"] == original["arrival_location"]
+        assert flight["departure_time"] > original["departure_time"]
+        used[flight["flight_number"]] = used.get(flight["flight_number"], 0) + 1
+    assert all(count <= seats[number]["available_seats"] for number, count in used.items())
+    assert {f["flight_number"]: f["available_seats"] for f in plan.flights} == \
+        {number: f["available_seats"] - used.get(number, 0) for number, f in seats.items()}
+
+@pytest.mark.parametrize("seed", range(5))
+def test_min_cost_flow_never_worse_than_greedy(seed):
+    # When everyone gets a seat, weighted delay is the whole objective
+    cancellations, candidates = _random_disruption(seed, ample_seats=True)
+    greedy = optimize_rebooking(cancellations, candidates, method=METHOD_GREEDY)
+    plan = optimize_rebooking(cancellations, candidates, time_budget_seconds=10)
+
+    assert plan.summary["passengers_not_assigned"] == greedy.summary["passengers_not_assigned"] == 0
+    assert plan.summary["weighted_delay_minutes"] <= greedy.summary["weighted_delay_minutes"]
+
+def test_falls_back_to_greedy_past_time_budget():
+    cancellations, candidates = _random_disruption(1)
+    greedy = optimize_rebooking(cancellations, candidates, method=METHOD_GREEDY)
+    plan = optimize_rebooking(cancellations, candidates, time_budget_seconds=0)
+
+    assert plan.summary["method"] == METHOD_GREEDY
+    assert "time budget" in plan.summary["fallback_reason"]
+    assert plan.assignments == greedy.assignments
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        optimize_rebooking([], [], method="simplex")
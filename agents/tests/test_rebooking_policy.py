@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agents import llm_passenger_rebooking_agent as rebooking
+from agents.rebooking_policy import (
+    classify_cancellation, ROUTINE, COMPLEX, REASON_TOO_MANY_PASSENGERS, REASON_INSUFFICIENT_CAPACITY,
+    REASON_SPECIAL_NEEDS, REASON_MISSING_FLIGHT_DETAILS, LLM_CALLS_PER_AGENT_RUN
+)
+
+FLIGHT_INFO = [{"departure_time": "2025-06-25 08:00:00", "departure_location": "DEN"}]
+
+def _passengers(count, special_needs=None):
+    return [{"passenger_id": f"P{i}", "name": f"Passenger {i}", "loyalty_tier": "Gold",
+             "special_needs": special_needs if i == 0 else None} for i in range(count)]
+
+def _alternatives(*seats):
+    return [{"flight_number": f"UA{300 + i}", "departure_time": f"2025-06-25 1{i}:00:00",
+             "arrival_time": f"2025-06-25 1{i}:59:00", "gate": "B1", "available_seats": count}
+            for i, count in enumerate(seats)]
+
+def test_classify_cancellation():
+    routine = classify_cancellation(_passengers(5), FLIGHT_INFO, _alternatives(3, 2))
+    assert routine.classification == ROUTINE and routine.reasons == []
+    assert routine.seats_available == 5
+
+    # "None" as text is how missing special needs often arrive
+    assert classify_cancellation(_passengers(5, "None"), FLIGHT_INFO, _alternatives(5)).routine
+
+    assert classify_cancellation(_passengers(5), FLIGHT_INFO, _alternatives(4)).reasons == [REASON_INSUFFICIENT_CAPACITY]
+    assert classify_cancellation(_passengers(5, "wheelchair"), FLIGHT_INFO, _alternatives(5)).reasons == [REASON_SPECIAL_NEEDS]
+    assert classify_cancellation(_passengers(5), [], _alternatives(5)).reasons == [REASON_MISSING_FLIGHT_DETAILS]
+
+    decision = classify_cancellation(_passengers(5), FLIGHT_INFO, _alternatives(5), max_passengers=4)
+    assert decision.classification == COMPLEX and decision.reasons == [REASON_TOO_MANY_PASSENGERS]
+
+def _run_agent(monkeypatch, seats, fast_path="1"):
+    llm_builds = []
+    gathers = []
+
+    def gather(state, cancelled_flight_number, arrival_location):
+        gathers.append(cancelled_flight_number)
+        state.update({"impacted_passengers_data": _passengers(3), "cancelled_flight_info": FLIGHT_INFO,
+                      "alternative_flights_data": _alternatives(seats)})
+
+    def chat_anthropic(**kwargs):
+        llm_builds.append(kwargs)
+        raise RuntimeError("no LLM in tests")
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setenv("REBOOKING_FAST_PATH", fast_path)
+    monkeypatch.setattr(rebooking, "gather_rebooking_inputs", gather)
+    monkeypatch.setattr(rebooking, "ChatAnthropic", chat_anthropic)
+    monkeypatch.setattr(rebooking, "rebook_onto_connections", lambda results, *args: results)
+
+    state = rebooking.llm_passenger_rebooking_agent({
+        "messages": [], "flight_cancellation_notification": {"flight_number": "UA100", "arrival_location": "SEA"}
+    })
+    return state, llm_builds, gathers
+
+def test_routine_cancellation_skips_the_llm(monkeypatch):
+    state, llm_builds, gathers = _run_agent(monkeypatch, seats=3)
+
+    assert llm_builds == [] and gathers == ["UA100"]
+    assert state["workflow_type"] == "algorithmic_fast_path"
+    assert state["rebooking_policy"]["classification"] == ROUTINE
+    assert state["rebooking_policy"]["llm_calls_saved"] == LLM_CALLS_PER_AGENT_RUN
+    assert state["rebooking_policy"]["end_to_end_seconds"] >= 0
+    assert all(proposal["assignment_successful"] for proposal in state["rebooking_proposals"])
+
+def test_complex_cancellation_goes_to_the_llm(monkeypatch):
+    state, llm_builds, gathers = _run_agent(monkeypatch, seats=2)
+
+    assert len(llm_builds) == 1
+    assert state["rebooking_policy"]["reasons"] == [REASON_INSUFFICIENT_CAPACITY]
+    assert state["rebooking_policy"]["llm_calls_saved"] == 0
+    # The LLM could not start here, so the algorithmic fallback finished the job with the inputs already loaded
+    assert state["workflow_type"] == "algorithmic_fallback"
+    assert gathers == ["UA100"]
+    assert state["rebooking_policy"]["workflow_type"] == "algorithmic_fallback"
+    assert state["rebooking_policy"]["end_to_end_seconds"] >= 0
+
+def test_latency_recorded_with_fast_path_off(monkeypatch):
+    state, llm_builds, gathers = _run_agent(monkeypatch, seats=3, fast_path="0")
+
+    assert len(llm_builds) == 1 and gathers == ["UA100"]
+    assert state["rebooking_policy"]["llm_calls_saved"] == 0
+    assert state["rebooking_policy"]["end_to_end_seconds"] >= 0
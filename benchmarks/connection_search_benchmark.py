@@ -0,0 +1,93 @@
+"""
+Connection search benchmark: graph build time and per-query latency.
+
+Builds a synthetic network (hub-and-spoke plus point-to-point routes, 100k
+flights over two weeks by default) as flight rows like the ones streamed from
+the flights table. It times ConnectionGraph construction and then runs random
+origin/destination searches for a cancelled flight's worth of passengers,
+with and without nonstops (min_stops=1 is what the rebooking agent uses).
+
+Usage:
+    python benchmarks/connection_search_benchmark.py [--flights 100000] [--airports 60] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.connection_search import ConnectionGraph
+
+HUBS = 4
+DAYS = 14
+
+def make_flights(flights: int, airports: int, seed: int = 11):
+    """Flight rows: every spoke flies to the hubs, plus a few random point-to-point routes per airport."""
+    rng = random.Random(seed)
+    codes = [f"A{i:02d}" for i in range(airports)]
+    hubs, spokes = codes[:HUBS], codes[HUBS:]
+    routes = [(hub, other) for hub in hubs for other in codes if other != hub]
+    routes += [(spoke, hub) for spoke in spokes for hub in hubs]
+    for spoke in spokes:
+        routes += [(spoke, other) for other in rng.sample([code for code in spokes if code != spoke], 3)]
+
+    start = pd.Timestamp("2025-06-18 05:00:00")
+    rows = []
+    for i in range(flights):
+        origin, destination = rng.choice(routes)
+        departure = start + pd.Timedelta(minutes=rng.randint(0, DAYS * 24 * 60))
+        arrival = departure + pd.Timedelta(minutes=rng.randint(60, 300))
+        rows.append({
+            "flight_number": f"UA{i:06d}", "departure_location": origin, "arrival_location": destination,
+            "departure_time": departure.strftime("%Y-%m-%d %H:%M:%S"), "arrival_time": arrival.strftime("%Y-%m-%d %H:%M:%S"),
+            "gate": f"B{rng.randint(1, 40)}", "status": "cancelled" if rng.random() < 0.03 else "scheduled",
+            "available_seats": rng.randint(0, 12)
+        })
+    return codes, rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Time connection graph build and search")
+    parser.add_argument("--flights", type=int, default=100_000, help="Flights in the network")
+    parser.add_argument("--airports", type=int, default=60, help="Airports in the network")
+    parser.add_argument("--queries", type=int, default=200, help="Searches per mode")
+    parser.add_argument("--passengers", type=int, default=150, help="Seats each search must cover")
+    args = parser.parse_args()
+
+    print("🧪 Connection search benchmark")
+    print("=" * 60)
+
+    codes, rows = make_flights(args.flights, args.airports)
+    started = time.perf_counter()
+    graph = ConnectionGraph.from_flights(rows)
+    print(f"\nGraph build: {len(graph):,} usable of {len(rows):,} flights, {len(graph.airports)} airports "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    rng = random.Random(5)
+    queries = []
+    for _ in range(args.queries):
+        origin, destination = rng.sample(codes, 2)
+        after = pd.Timestamp("2025-06-20 05:00:00") + pd.Timedelta(minutes=rng.randint(0, 7 * 24 * 60))
+        queries.append((origin, destination, after.strftime("%Y-%m-%d %H:%M:%S")))
+
+    print(f"\n{'mode':<12} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'itineraries':>12} {'seats':>7} {'covered':>8}")
+    for label, min_stops in (("all", 0), ("connections", 1)):
+        latencies, itinerary_counts, seat_counts = [], [], []
+        for origin, destination, after in queries:
+            started = time.perf_counter()
+            itineraries = graph.search(origin, destination, after, passenger_count=args.passengers, min_stops=min_stops)
+            latencies.append((time.perf_counter() - started) * 1000)
+            itinerary_counts.append(len(itineraries))
+            seat_counts.append(sum(itinerary.seats for itinerary in itineraries))
+        latencies = np.array(latencies)
+        covered = sum(seats >= args.passengers for seats in seat_counts) / len(queries) * 100
+        print(f"{label:<12} {np.percentile(latencies, 50):>8.1f} {np.percentile(latencies, 95):>8.1f} {latencies.max():>8.1f} "
+              f"{np.mean(itinerary_counts):>12.1f} {np.mean(seat_counts):>7.1f} {covered:>7.0f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Crew substitution benchmark: first-N greedy vs. min-cost assignment.
+
+Builds synthetic disruptions with hundreds of violated flights at once (four
+crew per flight across several bases, a pool of unassigned crew about 1.5x
+the slots) and compares the old per-flight `eligible.head(count)` selection
+with agents.crew_substitution.plan_substitutions: run time, total cost under
+the same cost model, deadheads and slots left empty.
+
+Usage:
+    python benchmarks/crew_substitution_benchmark.py [--flights 100 300 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import crew_substitution
+from agents.crew_substitution import plan_substitutions, MIN_REST_HOURS, MAX_FATIGUE_SCORE
+
+BASES = ["ORD", "DEN", "EWR", "IAH", "SFO"]
+ROLES = ["Pilot", "Pilot", "Attendant", "Attendant"]
+
+def make_disruption(flights: int, seed: int = 7):
+    """Violated flights, their crew schedule and an unassigned crew pool."""
+    rng = np.random.default_rng(seed)
+    flight_ids = [f"UA{i:05d}" for i in range(flights)]
+    duty_start = pd.Timestamp("2025-06-25 05:00:00") + pd.to_timedelta(rng.integers(0, 16 * 60, flights), unit="min")
+    duty_end = duty_start + pd.to_timedelta(rng.uniform(2, 8, flights), unit="h")
+    flight_base = rng.choice(BASES, flights)
+
+    schedule = pd.DataFrame({
+        "crew_id": [f"C{i:06d}" for i in range(flights * len(ROLES))],
+        "assigned_flight": np.repeat(flight_ids, len(ROLES)),
+        "role": ROLES * flights,
+        "base": np.repeat(flight_base, len(ROLES)),
+        "duty_start": np.repeat(duty_start.strftime("%Y-%m-%d %H:%M:%S"), len(ROLES)),
+        "duty_end": np.repeat(duty_end.strftime("%Y-%m-%d %H:%M:%S"), len(ROLES))
+    })
+
+    pool_size = int(len(schedule) * 1.5)
+    last_flight_end = duty_start.min() - pd.to_timedelta(rng.uniform(6, 20, pool_size), unit="h")
+    pool = pd.DataFrame({
+        "crew_id": [f"R{i:06d}" for i in range(pool_size)],
+        "role": rng.choice(["Pilot", "Attendant"], pool_size),
+        "base": rng.choice(BASES, pool_size),
+        "fatigue_score": rng.uniform(0, 1, pool_size).round(2),
+        "rest_hours_prior": rng.uniform(MIN_REST_HOURS, 16, pool_size).round(1),
+        "last_flight_end": last_flight_end.strftime("%Y-%m-%d %H:%M:%S")
+    })
+    return flight_ids, schedule, pool
+
+def first_n(violations, crew_schedule, unassigned_crew):
+    """The per-flight head(count) selection the agents used before."""
+    df = pd.DataFrame(crew_schedule)
+    unassigned = pd.DataFrame(unassigned_crew)
+    substitutions = {}
+    for flight_id in violations:
+        needed_roles = df[df["assigned_flight"] == flight_id]["role"].value_counts()
+        crew_ids = []
+        for role, count in needed_roles.items():
+            eligible = unassigned[unassigned["role"] == role]
+            selected = eligible.head(count)
+            crew_ids.extend(selected["crew_id"].tolist())
+            unassigned = unassigned[~unassigned["crew_id"].isin(selected["crew_id"])]
+        substitutions[flight_id] = crew_ids
+    return substitutions
+
+def score(substitutions, schedule: pd.DataFrame, pool: pd.DataFrame):
+    """Total cost, deadheads and illegal picks of a flight -> crew IDs mapping under the engine's cost model."""
+    pool_index = pool.set_index("crew_id")
+    first_slot = schedule.drop_duplicates(["assigned_flight", "role"]).set_index(["assigned_flight", "role"])
+    total, deadheads, illegal = 0.0, 0, 0
+    for flight_id, crew_ids in substitutions.items():
+        for crew_id in crew_ids:
+            candidate = pool_index.loc[[crew_id]].reset_index()
+            slot = first_slot.loc[[(flight_id, candidate["role"].iloc[0])]].reset_index()
+            cost = crew_substitution._cost_matrix(slot, candidate, MIN_REST_HOURS, MAX_FATIGUE_SCORE)[0, 0]
+            if cost >= crew_substitution.INFEASIBLE_COST:
+                illegal += 1
+                continue
+            total += cost
+            deadheads += candidate["base"].iloc[0] != slot["base"].iloc[0]
+    return total, deadheads, illegal
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare first-N and min-cost crew substitution")
+    parser.add_argument("--flights", type=int, nargs="+", default=[100, 300, 1000], help="Violated flights per run")
+    args = parser.parse_args()
+
+    print("🧪 Crew substitution benchmark")
+    print("=" * 60)
+    print(f"\n{'flights':>8} {'method':<10} {'seconds':>8} {'cost':>9} {'deadheads':>10} {'illegal':>8} {'unfilled':>9}")
+
+    for flights in args.flights:
+        flight_ids, schedule, pool = make_disruption(flights)
+        slots = len(schedule)
+
+        greedy, greedy_s = timed(first_n, flight_ids, schedule, pool)
+        cost, deadheads, illegal = score(greedy, schedule, pool)
+        filled = sum(len(crew_ids) for crew_ids in greedy.values())
+        print(f"{flights:>8} {'first-N':<10} {greedy_s:>8.3f} {cost:>9.1f} {deadheads:>10} {illegal:>8} {slots - filled:>9}")
+
+        plan, plan_s = timed(plan_substitutions, flight_ids, schedule, pool)
+        print(f"{flights:>8} {'min-cost':<10} {plan_s:>8.3f} {plan.total_cost:>9.1f} {int(plan.assignments['deadhead'].sum()):>10} "
+              f"{0:>8} {sum(plan.unfilled.values()):>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+HTTP load test for the database MCP server.
+
+Drives a read-only tool mix (get_flight_details, get_available_seats,
+get_passenger_count, query_passengers) at one or more running servers from
+concurrent client threads and reports throughput and latency percentiles, so
+the Flask server and the ASGI server (single or multi-worker) can be compared
+under the same load.
+
+Usage:
+    python services/database_http_server.py                              # Flask, port 8001
+    python services/database_asgi_server.py --workers 4 --port 8002      # ASGI, 4 workers
+    python benchmarks/database_http_load_test.py --url http://localhost:8001 --url http://localhost:8002
+"""
+
+import argparse
+import random
+import threading
+import time
+from typing import Any, Dict, List
+
+import requests
+
+def _pick_call(rng: random.Random, flights: List[str]) -> Dict[str, Any]:
+    flight_number = rng.choice(flights)
+    roll = rng.random()
+    if roll < 0.4:
+        return {"tool": "get_flight_details", "parameters": {"flight_number": flight_number}}
+    if roll < 0.7:
+        return {"tool": "get_available_seats", "parameters": {"flight_number": flight_number}}
+    if roll < 0.85:
+        return {"tool": "get_passenger_count", "parameters": {"flight_number": flight_number}}
+    return {"tool": "query_passengers", "parameters": {"flight_number": flight_number, "limit": 50}}
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def run_load(url: str, concurrency: int, seconds: float) -> Dict[str, Any]:
+    """Run the read-only mix against one server URL."""
+    url = url.rstrip("/")
+    response = requests.post(f"{url}/execute/query_flights", json={"limit": 200}, timeout=30)
+    response.raise_for_status()
+    flights = [row["flight_number"] for row in response.json()["result"]]
+
+    latencies: List[float] = []
+    counters = {"requests": 0, "errors": 0}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def client():
+        rng = random.Random()
+        session = requests.Session()
+        local_latencies = []
+        local_errors = 0
+        while time.perf_counter() < stop_at:
+            call = _pick_call(rng, flights)
+            started = time.perf_counter()
+            try:
+                result = session.post(f"{url}/execute/{call['tool']}", json=call["parameters"], timeout=30)
+                ok = result.status_code == 200 and result.json().get("success")
+            except requests.RequestException:
+                ok = False
+            local_latencies.append((time.perf_counter() - started) * 1000)
+            if not ok:
+                local_errors += 1
+        session.close()
+        with lock:
+            latencies.extend(local_latencies)
+            counters["requests"] += len(local_latencies)
+            counters["errors"] += local_errors
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests_per_sec": counters["requests"] / elapsed,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p99_ms": _percentile(latencies, 0.99),
+        "errors": counters["errors"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only HTTP load test for the database MCP server")
+    parser.add_argument("--url", action="append", help="Server base URL (repeat to compare servers)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Number of concurrent client threads")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each run")
+    args = parser.parse_args()
+    urls = args.url or ["http://localhost:8001"]
+
+    print("🧪 Database HTTP load test")
+    print("=" * 60)
+    print(f"Workload: {args.concurrency} clients, {args.seconds:.0f}s per server, read-only tool mix")
+
+    results = {url: run_load(url, args.concurrency, args.seconds) for url in urls}
+
+    print(f"\n{'server':<30} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8}")
+    for url, result in results.items():
+        print(f"{url:<30} {result['requests_per_sec']:>10.1f} {result['p50_ms']:>10.2f} "
+              f"{result['p99_ms']:>10.2f} {result['errors']:>8}")
+
+if __name__ == "__main__":
+    main()
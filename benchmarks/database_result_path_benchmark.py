@@ -0,0 +1,114 @@
+"""
+Per-call latency and allocation micro-benchmark for the database server's result path.
+
+Compares the previous pandas path (pd.read_sql_query + to_dict) with the
+cursor-to-dict path the database MCP server now uses, for the query shapes the
+tools actually issue: single-row flight lookups, scalar seat/count lookups and
+small filtered row sets.
+
+Usage:
+    python benchmarks/database_result_path_benchmark.py [--iterations 2000]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import logging
+from typing import Callable, Dict, Any
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "services"))
+
+from database_mcp_server import UnitedAirlinesDatabaseMCPServer, _fetch_all, _fetch_one
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "united_ops.db")
+
+FLIGHT = "UA70161"
+CANCELLED_FLIGHT_PASSENGERS = "UA111"
+
+def pandas_flight_details(conn):
+    df = pd.read_sql_query("SELECT * FROM flights WHERE flight_number = ?", conn, params=[FLIGHT])
+    return df.iloc[0].to_dict()
+
+def cursor_flight_details(conn):
+    return _fetch_one(conn, "SELECT * FROM flights WHERE flight_number = ?", (FLIGHT,))
+
+def pandas_available_seats(conn):
+    df = pd.read_sql_query("SELECT available_seats FROM flights WHERE flight_number = ?", conn, params=[FLIGHT])
+    return int(df.iloc[0]['available_seats'])
+
+def cursor_available_seats(conn):
+    return conn.execute("SELECT available_seats FROM flights WHERE flight_number = ?", (FLIGHT,)).fetchone()[0]
+
+def pandas_passengers(conn):
+    df = pd.read_sql_query("SELECT * FROM passengers WHERE flight_number = ?", conn, params=[CANCELLED_FLIGHT_PASSENGERS])
+    return df.to_dict('records')
+
+def cursor_passengers(conn):
+    return _fetch_all(conn, "SELECT * FROM passengers WHERE flight_number = ?", (CANCELLED_FLIGHT_PASSENGERS,))
+
+def pandas_unassigned_crew(conn):
+    df = pd.read_sql_query("SELECT * FROM crew WHERE (assigned_flight IS NULL OR assigned_flight = 'UNASSIGNED')", conn)
+    return df.to_dict('records')
+
+def cursor_unassigned_crew(conn):
+    return _fetch_all(conn, "SELECT * FROM crew WHERE (assigned_flight IS NULL OR assigned_flight = 'UNASSIGNED')")
+
+CASES = [
+    ("get_flight_details", pandas_flight_details, cursor_flight_details),
+    ("get_available_seats", pandas_available_seats, cursor_available_seats),
+    ("query_passengers(flight)", pandas_passengers, cursor_passengers),
+    ("query_crew(unassigned)", pandas_unassigned_crew, cursor_unassigned_crew)
+]
+
+def measure(fn: Callable, conn: sqlite3.Connection, iterations: int) -> Dict[str, Any]:
+    """Median latency over `iterations` calls plus bytes allocated by a single call."""
+    fn(conn)  # warm up statement cache and imports
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(conn)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(conn)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"median_us": statistics.median(timings) * 1e6, "peak_kib": peak / 1024}
+
+def main():
+    parser = argparse.ArgumentParser(description="pandas vs cursor result path micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per case and path")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "united_ops.db")
+        shutil.copy(SOURCE_DB, db_path)
+        # Let the server migrate the copy so both paths run against the indexed schema
+        UnitedAirlinesDatabaseMCPServer(db_path=db_path).close()
+        conn = sqlite3.connect(db_path)
+
+        print("🧪 Database result path micro-benchmark")
+        print("=" * 78)
+        print(f"{'tool':<26} {'pandas µs':>10} {'cursor µs':>10} {'speedup':>8} {'pandas KiB':>11} {'cursor KiB':>11}")
+        for name, pandas_fn, cursor_fn in CASES:
+            before = measure(pandas_fn, conn, args.iterations)
+            after = measure(cursor_fn, conn, args.iterations)
+            print(f"{name:<26} {before['median_us']:>10.1f} {after['median_us']:>10.1f} "
+                  f"{before['median_us'] / after['median_us']:>7.1f}x {before['peak_kib']:>11.1f} {after['peak_kib']:>11.1f}")
+
+        conn.close()
+
+if __name__ == "__main__":
+    main()
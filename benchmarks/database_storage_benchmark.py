@@ -0,0 +1,135 @@
+"""
+Mixed read/write throughput benchmark for the database MCP server storage settings.
+
+Runs the same workload against two private copies of united_ops.db: one with
+SQLite's default rollback journal (StorageConfig.legacy()) and one with the
+tuned WAL configuration (StorageConfig()). Reader threads issue
+query_passengers/get_flight_details calls while writer threads issue
+update_passenger_flight/log_message calls.
+
+Usage:
+    python benchmarks/database_storage_benchmark.py [--seconds 5] [--readers 8] [--writers 2]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import logging
+from typing import Dict, Any
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "services"))
+
+from database_mcp_server import UnitedAirlinesDatabaseMCPServer
+from database_storage_config import StorageConfig
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "united_ops.db")
+
+def run_workload(config: StorageConfig, seconds: float, readers: int, writers: int) -> Dict[str, Any]:
+    """Run the mixed workload against a fresh copy of the database."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "united_ops.db")
+        shutil.copy(SOURCE_DB, db_path)
+
+        # Query cache and call coalescing off so every read reaches SQLite and measures the storage settings
+        server = UnitedAirlinesDatabaseMCPServer(db_path=db_path, pool_size=readers + writers, storage_config=config, cache_size=0,
+                                                  single_flight=False)
+        flights = [row["flight_number"] for row in server.execute_tool("query_flights", {"limit": 200})["result"]]
+        passengers = [row["passenger_id"] for row in server.execute_tool("query_passengers", {"limit": 2000})["result"]]
+
+        counters = {"reads": 0, "writes": 0, "errors": 0}
+        counter_lock = threading.Lock()
+        stop_at = time.perf_counter() + seconds
+
+        def reader():
+            rng = random.Random()
+            local_reads = local_errors = 0
+            while time.perf_counter() < stop_at:
+                flight_number = rng.choice(flights)
+                if rng.random() < 0.5:
+                    result = server.execute_tool("query_passengers", {"flight_number": flight_number})
+                else:
+                    result = server.execute_tool("get_flight_details", {"flight_number": flight_number})
+                if result["success"]:
+                    local_reads += 1
+                else:
+                    local_errors += 1
+            with counter_lock:
+                counters["reads"] += local_reads
+                counters["errors"] += local_errors
+
+        def writer():
+            rng = random.Random()
+            local_writes = local_errors = 0
+            while time.perf_counter() < stop_at:
+                if rng.random() < 0.5:
+                    result = server.execute_tool("update_passenger_flight", {
+                        "passenger_id": rng.choice(passengers),
+                        "new_flight": rng.choice(flights),
+                        "reason": "storage benchmark"
+                    })
+                    ok = result["success"] and result["result"].get("success")
+                else:
+                    result = server.execute_tool("log_message", {
+                        "run_id": "storage-benchmark",
+                        "agent_name": "Benchmark",
+                        "message": "mixed workload write"
+                    })
+                    ok = result["success"] and result["result"].get("success")
+                if ok:
+                    local_writes += 1
+                else:
+                    local_errors += 1
+            with counter_lock:
+                counters["writes"] += local_writes
+                counters["errors"] += local_errors
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        storage = server.execute_tool("get_server_status", {})["result"]["storage"]
+        server.close()
+
+    return {
+        "journal_mode": storage["journal_mode"],
+        "reads_per_sec": counters["reads"] / elapsed,
+        "writes_per_sec": counters["writes"] / elapsed,
+        "errors": counters["errors"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed read/write benchmark for StorageConfig")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    parser.add_argument("--readers", type=int, default=8, help="Number of reader threads")
+    parser.add_argument("--writers", type=int, default=2, help="Number of writer threads")
+    args = parser.parse_args()
+
+    # Keep per-call INFO logging out of the measurement
+    logging.disable(logging.INFO)
+
+    print("🧪 Database storage benchmark")
+    print("=" * 60)
+    print(f"Workload: {args.readers} readers, {args.writers} writers, {args.seconds:.0f}s per configuration")
+
+    results = {
+        "before (rollback journal)": run_workload(StorageConfig.legacy(), args.seconds, args.readers, args.writers),
+        "after (WAL + tuned PRAGMAs)": run_workload(StorageConfig(), args.seconds, args.readers, args.writers)
+    }
+
+    print(f"\n{'configuration':<30} {'journal':>8} {'reads/s':>10} {'writes/s':>10} {'errors':>8}")
+    for name, result in results.items():
+        print(f"{name:<30} {result['journal_mode']:>8} {result['reads_per_sec']:>10.1f} "
+              f"{result['writes_per_sec']:>10.1f} {result['errors']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+FAA legality check benchmark: row-by-row vs. columnar engine.
+
+Builds synthetic crew rosters (about 4 crew per flight, roughly 10% of crew
+over a limit) and times agents.faa_legality.check_legality against the
+groupby/iterrows loop the agents used before. The row-by-row loop is only
+run up to --loop-max-rows since it takes about 2 minutes per 100k rows.
+
+Usage:
+    python benchmarks/faa_legality_benchmark.py [--rows 10000 100000 1000000] [--loop-max-rows 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.faa_legality import check_legality, MAX_DUTY_HOURS, MIN_REST_HOURS, MAX_FATIGUE_SCORE
+
+def make_roster(rows: int, seed: int = 7) -> pd.DataFrame:
+    """Synthetic crew roster with string timestamps, like rows read from the crew table."""
+    rng = np.random.default_rng(seed)
+    duty_start = pd.Timestamp("2025-06-25 00:00:00") + pd.to_timedelta(rng.integers(0, 24 * 60, rows), unit="min")
+    duty_end = duty_start + pd.to_timedelta(rng.uniform(2, 10.5, rows), unit="h")
+    return pd.DataFrame({
+        "crew_id": [f"C{i:07d}" for i in range(rows)],
+        "assigned_flight": [f"UA{i:06d}" for i in rng.integers(0, max(1, rows // 4), rows)],
+        "duty_start": duty_start.strftime("%Y-%m-%d %H:%M:%S"),
+        "duty_end": duty_end.strftime("%Y-%m-%d %H:%M:%S"),
+        "rest_hours_prior": rng.uniform(9.8, 16, rows).round(1),
+        "fatigue_score": rng.uniform(0, 1.05, rows).round(2)
+    })
+
+def row_by_row(df: pd.DataFrame):
+    """The groupby/iterrows check the crew and dispatch agents used before the columnar engine."""
+    violations = []
+    for flight_id, group in df.groupby("assigned_flight"):
+        for _, row in group.iterrows():
+            duty_hours = (pd.to_datetime(row["duty_end"]) - pd.to_datetime(row["duty_start"])) / pd.Timedelta(hours=1)
+            if duty_hours > MAX_DUTY_HOURS or row["rest_hours_prior"] < MIN_REST_HOURS or row["fatigue_score"] > MAX_FATIGUE_SCORE:
+                violations.append(flight_id)
+                break
+    return sorted(set(violations))
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the row-by-row and columnar FAA legality checks")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Roster sizes")
+    parser.add_argument("--loop-max-rows", type=int, default=10_000, help="Largest roster to run the row-by-row loop on")
+    args = parser.parse_args()
+
+    print("🧪 FAA legality benchmark")
+    print("=" * 60)
+    print(f"\n{'rows':>10} {'flagged':>9} {'columnar s':>11} {'row-by-row s':>13} {'speedup':>9}")
+
+    for rows in args.rows:
+        df = make_roster(rows)
+        report, columnar_s = timed(check_legality, df)
+
+        if rows <= args.loop_max_rows:
+            flights, loop_s = timed(row_by_row, df)
+            assert flights == report.flights, "columnar engine disagrees with the row-by-row check"
+            loop_col, speedup_col = f"{loop_s:>13.3f}", f"{loop_s / columnar_s:>8.0f}x"
+        else:
+            loop_col, speedup_col = f"{'skipped':>13}", f"{'-':>9}"
+
+        print(f"{rows:>10} {len(report.flights):>9} {columnar_s:>11.3f} {loop_col} {speedup_col}")
+
+if __name__ == "__main__":
+    main()
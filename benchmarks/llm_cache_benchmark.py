@@ -0,0 +1,108 @@
+"""
+LLM cache benchmark: hit rate and wall time when agent runs are replayed.
+
+Runs a tool-calling AgentExecutor over a set of flight scenarios three times
+against a stand-in chat model that sleeps like an API call: cold, replayed
+unchanged, and replayed with a share of tool results changed. Each run makes
+two model calls, one for the tool call and one for the answer. The cache is
+a private SQLiteLLMCache in a temp directory.
+
+Usage:
+    python benchmarks/llm_cache_benchmark.py [--scenarios 40] [--latency 0.25] [--changed 0.25]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain.prompts import ChatPromptTemplate
+from langchain.tools import tool
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.llm_cache import SQLiteLLMCache
+
+# Flights whose gate changes before the third pass
+CHANGED_GATES = set()
+
+class SimulatedChatModel(BaseChatModel):
+    """Looks up the flight's gate, then answers with it, after `latency` seconds per call."""
+    latency: float = 0.25
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "simulated"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": "simulated", "latency": self.latency}
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        self.calls += 1
+        results = [message for message in messages if isinstance(message, ToolMessage)]
+        if results:
+            message = AIMessage(content=f"Gate {results[-1].content}")
+        else:
+            flight_number = [message for message in messages if isinstance(message, HumanMessage)][-1].content.split()[-1]
+            message = AIMessage(content="", tool_calls=[{"name": "lookup_gate", "args": {"flight_number": flight_number},
+                                                         "id": f"call_{flight_number}"}])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+@tool
+def lookup_gate(flight_number: str) -> str:
+    """Gate for a flight."""
+    return ("C" if flight_number in CHANGED_GATES else "B") + flight_number[-2:]
+
+def run_pass(executor, flights, model, cache):
+    calls, hits = model.calls, cache.hits
+    started = time.perf_counter()
+    for flight_number in flights:
+        executor.invoke({"input": f"Which gate does {flight_number}"})
+    return time.perf_counter() - started, model.calls - calls, cache.hits - hits
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the LLM response cache on replayed agent runs")
+    parser.add_argument("--scenarios", type=int, default=40, help="Agent runs per pass")
+    parser.add_argument("--latency", type=float, default=0.25, help="Simulated seconds per model call")
+    parser.add_argument("--changed", type=float, default=0.25, help="Share of tool results changed before the last pass")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="llm_cache_bench_")
+    cache = SQLiteLLMCache(os.path.join(workdir, "llm_cache.db"))
+    model = SimulatedChatModel(latency=args.latency, cache=cache, disable_streaming=True)
+    prompt = ChatPromptTemplate.from_messages([("system", "You are a gate agent."), ("user", "{input}"),
+                                               ("placeholder", "{agent_scratchpad}")])
+    executor = AgentExecutor(agent=create_tool_calling_agent(llm=model, tools=[lookup_gate], prompt=prompt),
+                             tools=[lookup_gate])
+    flights = [f"UA{1000 + i}" for i in range(args.scenarios)]
+
+    print("🧪 LLM cache benchmark")
+    print("=" * 60)
+    print(f"\n{'pass':<22} {'seconds':>8} {'model calls':>12} {'cache hits':>11}")
+    try:
+        for name in ("cold", "replay", "replay, results changed"):
+            if name == "replay, results changed":
+                CHANGED_GATES.update(flights[:int(len(flights) * args.changed)])
+            seconds, calls, hits = run_pass(executor, flights, model, cache)
+            print(f"{name:<22} {seconds:>8.2f} {calls:>12} {hits:>11}")
+        stats = cache.stats()
+        print(f"\nOverall hit rate: {stats['hit_rate']:.0%} ({stats['entries']} entries, {stats['bytes'] / 1024:.0f} KB on disk)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
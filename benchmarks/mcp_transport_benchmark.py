@@ -0,0 +1,100 @@
+"""
+HTTP vs. in-process transport benchmark for DatabaseMCPClient.
+
+Serves one UnitedAirlinesDatabaseMCPServer (on a private copy of
+united_ops.db) through the Flask HTTP wrapper on a loopback port, then runs
+the same call mix through DatabaseMCPClient(transport="http") and
+DatabaseMCPClient(server=...) (in-process) and reports per-call latency.
+
+Usage:
+    python benchmarks/mcp_transport_benchmark.py [--calls 2000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import logging
+from typing import Dict, Any, List
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "services"))
+
+from werkzeug.serving import make_server
+
+import database_http_server
+from database_mcp_server import UnitedAirlinesDatabaseMCPServer
+from database_mcp_client import DatabaseMCPClient
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "united_ops.db")
+
+def run_calls(client: DatabaseMCPClient, flights: List[str], calls: int) -> Dict[str, Any]:
+    """Run the lookup mix and return latency statistics in microseconds."""
+    rng = random.Random(7)
+    latencies = []
+    for _ in range(calls):
+        flight_number = rng.choice(flights)
+        roll = rng.random()
+        started = time.perf_counter()
+        if roll < 0.4:
+            client.get_flight_details(flight_number)
+        elif roll < 0.7:
+            client.get_available_seats(flight_number)
+        else:
+            client.query_passengers(flight_number=flight_number, limit=50)
+        latencies.append((time.perf_counter() - started) * 1e6)
+
+    latencies.sort()
+    return {
+        "calls_per_sec": calls / (sum(latencies) / 1e6),
+        "p50_us": statistics.median(latencies),
+        "p99_us": latencies[int(0.99 * (len(latencies) - 1))]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the HTTP and in-process DatabaseMCPClient transports")
+    parser.add_argument("--calls", type=int, default=2000, help="Calls per transport")
+    args = parser.parse_args()
+
+    # Keep per-call INFO logging out of the measurement
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "united_ops.db")
+        shutil.copy(SOURCE_DB, db_path)
+        server = UnitedAirlinesDatabaseMCPServer(db_path=db_path)
+        flights = [row["flight_number"] for row in server.execute_tool("query_flights", {"limit": 200})["result"]]
+
+        database_http_server.mcp_server = server
+        http_server = make_server("127.0.0.1", 0, database_http_server.app, threaded=True)
+        threading.Thread(target=http_server.serve_forever, daemon=True).start()
+
+        clients = {
+            "http (Flask, loopback)": DatabaseMCPClient(server_url=f"http://127.0.0.1:{http_server.server_port}", transport="http"),
+            "inprocess": DatabaseMCPClient(server=server)
+        }
+
+        print("🧪 Database MCP transport benchmark")
+        print("=" * 60)
+        print(f"Workload: {args.calls} calls per transport (get_flight_details / get_available_seats / query_passengers)")
+
+        results = {}
+        for name, client in clients.items():
+            client.suppress_logging(True)
+            run_calls(client, flights, min(200, args.calls))  # warm up connections and the query cache
+            results[name] = run_calls(client, flights, args.calls)
+
+        http_server.shutdown()
+        database_http_server.mcp_server = None
+        server.close()
+
+    print(f"\n{'transport':<26} {'calls/s':>10} {'p50 us':>10} {'p99 us':>10}")
+    for name, result in results.items():
+        print(f"{name:<26} {result['calls_per_sec']:>10.1f} {result['p50_us']:>10.1f} {result['p99_us']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
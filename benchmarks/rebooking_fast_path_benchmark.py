@@ -0,0 +1,83 @@
+"""
+Rebooking fast path benchmark: how many cancellations skip the LLM, and how fast they finish.
+
+Treats a sample of flights that carry passengers as cancelled and runs
+llm_passenger_rebooking_agent on each, against a private copy of
+united_ops.db through the in-process database transport. ANTHROPIC_API_KEY
+is cleared, so complex cases fall through to the algorithmic fallback
+instead of calling the model. For each run it reports the policy
+classification, end-to-end latency and the LLM calls saved.
+
+Usage:
+    python benchmarks/rebooking_fast_path_benchmark.py [--cancellations 50]
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "united_ops.db")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the routine-cancellation fast path")
+    parser.add_argument("--cancellations", type=int, default=50, help="Flights to treat as cancelled")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fast_path_bench_")
+    db_path = os.path.join(workdir, "united_ops.db")
+    shutil.copyfile(SOURCE_DB, db_path)
+    os.environ["DATABASE_PATH"] = db_path
+    os.environ["MCP_TRANSPORT"] = "inprocess"
+    os.environ["ANTHROPIC_API_KEY"] = ""
+    logging.disable(logging.INFO)
+
+    from agents.llm_passenger_rebooking_agent import llm_passenger_rebooking_agent
+
+    with sqlite3.connect(db_path) as conn:
+        flights = conn.execute(
+            """SELECT f.flight_number, f.arrival_location FROM flights f JOIN passengers p USING (flight_number)
+               GROUP BY f.flight_number ORDER BY f.flight_number LIMIT ?""", (args.cancellations,)
+        ).fetchall()
+
+    print("🧪 Rebooking fast path benchmark")
+    print("=" * 60)
+
+    latencies = {"routine": [], "complex": []}
+    reasons = Counter()
+    llm_calls_saved = 0
+    try:
+        for flight_number, arrival_location in flights:
+            state = {"messages": [], "proposals": [],
+                     "flight_cancellation_notification": {"flight_number": flight_number, "arrival_location": arrival_location}}
+            with contextlib.redirect_stdout(io.StringIO()):
+                state = llm_passenger_rebooking_agent(state)
+
+            policy = state["rebooking_policy"]
+            latencies[policy.get("classification", "complex")].append(policy["end_to_end_seconds"])
+            reasons.update(policy.get("reasons", []))
+            llm_calls_saved += policy.get("llm_calls_saved", 0)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'path':<10} {'runs':>5} {'p50 s':>7} {'p95 s':>7}")
+    for path, values in latencies.items():
+        if values:
+            values.sort()
+            print(f"{path:<10} {len(values):>5} {statistics.median(values):>7.3f} {values[int(0.95 * (len(values) - 1))]:>7.3f}")
+    print(f"\nLLM agent runs skipped: {len(latencies['routine'])} of {len(flights)}")
+    print(f"LLM calls saved: {llm_calls_saved}")
+    print("Complex reasons: " + (", ".join(f"{reason} x{count}" for reason, count in reasons.most_common()) or "none"))
+    print("(complex runs here use the algorithmic fallback; with a key they wait on the LLM agent, up to its 90s budget)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Versioned schema migrations for united_ops.db.
+
+Each migration runs exactly once, in order, inside its own transaction. The
+version of the last applied migration is stored in SQLite's PRAGMA user_version,
+so applying migrations to an up-to-date database is a no-op.
+
+Usage:
+    python database/migrations.py                 # migrate database/united_ops.db
+    python database/migrations.py path/to/db      # migrate another database file
+"""
+
+import sqlite3
+import sys
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+# --- Canonical table schemas (inferred from CSVs and agent logic) ---
+# Flight numbers repeat across dates, so a flight is identified by number + departure time.
+TABLE_SCHEMAS = {
+    "flights": """
+    CREATE TABLE flights (
+        flight_number TEXT NOT NULL,
+        departure_location TEXT,
+        arrival_location TEXT,
+        departure_time TEXT NOT NULL,
+        arrival_time TEXT,
+        gate TEXT,
+        status TEXT,
+        crew_required INTEGER,
+        flight_duration_minutes REAL,
+        is_international INTEGER,
+        available_seats INTEGER,
+        PRIMARY KEY (flight_number, departure_time)
+    )
+    """,
+    "passengers": """
+    CREATE TABLE passengers (
+        passenger_id TEXT PRIMARY KEY,
+        name TEXT,
+        flight_number TEXT,
+        seat_number TEXT,
+        loyalty_tier TEXT,
+        has_precheck INTEGER,
+        special_needs TEXT
+    )
+    """,
+    "crew": """
+    CREATE TABLE crew (
+        crew_id TEXT PRIMARY KEY,
+        name TEXT,
+        assigned_flight TEXT,
+        base TEXT,
+        duty_start TEXT,
+        duty_end TEXT,
+        rest_hours_prior REAL,
+        last_flight_end TEXT,
+        fatigue_score REAL,
+        role TEXT
+    )
+    """,
+    "agent_logs": """
+    CREATE TABLE agent_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT DEFAULT (DATETIME('now')),
+        run_id TEXT,
+        agent_name TEXT,
+        message TEXT,
+        context TEXT
+    )
+    """
+}
+
+# Secondary indexes backing the database MCP server's lookups
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_passengers_flight_tier ON passengers (flight_number, loyalty_tier)",
+    "CREATE INDEX IF NOT EXISTS idx_flights_route_departure ON flights (departure_location, arrival_location, departure_time)",
+    "CREATE INDEX IF NOT EXISTS idx_crew_assigned_flight ON crew (assigned_flight)",
+    "CREATE INDEX IF NOT EXISTS idx_crew_role_base ON crew (role, base)",
+    "CREATE INDEX IF NOT EXISTS idx_agent_logs_run_timestamp ON agent_logs (run_id, timestamp)"
+]
+
+@dataclass
+class Migration:
+    """A single schema change, identified by a monotonically increasing version."""
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+def _has_primary_key(conn: sqlite3.Connection, table: str) -> bool:
+    return any(row[5] > 0 for row in conn.execute(f"PRAGMA table_info({table})"))
+
+def _ensure_table_with_primary_key(conn: sqlite3.Connection, table: str):
+    """
+    Create `table` from its canonical schema, or rebuild an existing copy that
+    lost its keys (e.g. after pandas' to_sql(if_exists='replace')).
+    """
+    existing_columns = _table_columns(conn, table)
+    if not existing_columns:
+        conn.execute(TABLE_SCHEMAS[table])
+        return
+    if _has_primary_key(conn, table):
+        return
+
+    staging = f"{table}__migrating"
+    conn.execute(f"DROP TABLE IF EXISTS {staging}")
+    conn.execute(TABLE_SCHEMAS[table].replace(f"CREATE TABLE {table}", f"CREATE TABLE {staging}", 1))
+
+    shared = [col for col in _table_columns(conn, staging) if col in existing_columns]
+    column_list = ", ".join(shared)
+    conn.execute(f"INSERT INTO {staging} ({column_list}) SELECT {column_list} FROM {table}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+
+def _migration_001_primary_keys(conn: sqlite3.Connection):
+    for table in ("flights", "passengers", "crew", "agent_logs"):
+        _ensure_table_with_primary_key(conn, table)
+
+def _migration_002_secondary_indexes(conn: sqlite3.Connection):
+    for statement in INDEXES:
+        conn.execute(statement)
+    # Refresh planner statistics so the new indexes are chosen
+    conn.execute("ANALYZE")
+
+MIGRATIONS = [
+    Migration(1, "Primary keys for flights, passengers, crew and agent_logs", _migration_001_primary_keys),
+    Migration(2, "Secondary indexes for route, flight, crew and run_id lookups", _migration_002_secondary_indexes)
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Get the version of the last migration applied to the database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def apply_migrations(conn: sqlite3.Connection, target_version: Optional[int] = None, verbose: bool = False) -> List[int]:
+    """
+    Apply all pending migrations up to `target_version` (default: latest).
+
+    Returns:
+        The versions that were applied, in order.
+    """
+    target_version = LATEST_VERSION if target_version is None else target_version
+    applied = []
+
+    for migration in MIGRATIONS:
+        if migration.version <= get_schema_version(conn) or migration.version > target_version:
+            continue
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Re-check under the write lock in case another process migrated first
+            if migration.version <= get_schema_version(conn):
+                conn.rollback()
+                continue
+            migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {migration.version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        applied.append(migration.version)
+        if verbose:
+            print(f"  - Applied migration {migration.version}: {migration.description}")
+
+    return applied
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "database/united_ops.db"
+    conn = sqlite3.connect(db_path)
+    print(f"Migrating {db_path} (schema version {get_schema_version(conn)})...")
+    applied = apply_migrations(conn, verbose=True)
+    print(f"✅ Schema at version {get_schema_version(conn)} ({len(applied)} migrations applied).")
+    conn.close()
@@ -1,11 +1,13 @@
 import sqlite3
 import pandas as pd
 import os
+from migrations import apply_migrations
 
 def restore_database():
     """
     Restores the united_ops.db database from the CSV files in the united_ops folder.
-    This function will drop existing tables and recreate them from the CSVs.
+    This function will drop existing tables, recreate them through the versioned
+    migrations (primary keys and indexes included) and reload them from the CSVs.
     """
     db_path = 'database/united_ops.db'
     csv_folder = 'database/united_ops'
@@ -26,74 +28,30 @@ def restore_database():
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    # --- Table Schemas (inferred from CSVs and agent logic) ---
-    
-    # Flights table
-    cursor.execute("DROP TABLE IF EXISTS flights")
-    cursor.execute("""
-    CREATE TABLE flights (
-        flight_number TEXT PRIMARY KEY,
-        departure_location TEXT,
-        arrival_location TEXT,
-        departure_time TEXT,
-        arrival_time TEXT,
-        gate TEXT,
-        status TEXT,
-        crew_required INTEGER,
-        flight_duration_minutes INTEGER,
-        is_international INTEGER,
-        available_seats INTEGER
-    )
-    """)
-    print("  - 'flights' table created.")
-
-    # Passengers table
-    cursor.execute("DROP TABLE IF EXISTS passengers")
-    cursor.execute("""
-    CREATE TABLE passengers (
-        passenger_id TEXT PRIMARY KEY,
-        name TEXT,
-        flight_number TEXT,
-        seat_number TEXT,
-        loyalty_tier TEXT,
-        has_precheck INTEGER,
-        special_needs TEXT
-    )
-    """)
-    print("  - 'passengers' table created.")
-    
-    # Crew table
-    cursor.execute("DROP TABLE IF EXISTS crew")
-    cursor.execute("""
-    CREATE TABLE crew (
-        crew_id TEXT PRIMARY KEY,
-        name TEXT,
-        assigned_flight TEXT,
-        base TEXT,
-        duty_start TEXT,
-        duty_end TEXT,
-        rest_hours_prior REAL,
-        last_flight_end TEXT,
-        fatigue_score REAL,
-        role TEXT
-    )
-    """)
-    print("  - 'crew' table created.")
+    # --- Schema: drop the data tables and rebuild them through the versioned migrations ---
+    for table in ("flights", "passengers", "crew"):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute("PRAGMA user_version = 0")
+    apply_migrations(conn, verbose=True)
+    print("  - 'flights', 'passengers' and 'crew' tables created with keys and indexes.")
 
     # --- Load data from CSVs into tables ---
     try:
         flights_df = pd.read_csv(flights_csv)
-        flights_df.to_sql('flights', conn, if_exists='replace', index=False)
+        flights_df.to_sql('flights', conn, if_exists='append', index=False)
         print(f"  - Loaded {len(flights_df)} records into 'flights'.")
         
         passengers_df = pd.read_csv(passengers_csv)
-        passengers_df.to_sql('passengers', conn, if_exists='replace', index=False)
+        passengers_df.to_sql('passengers', conn, if_exists='append', index=False)
         print(f"  - Loaded {len(passengers_df)} records into 'passengers'.")
 
         crew_df = pd.read_csv(crew_csv)
-        crew_df.to_sql('crew', conn, if_exists='replace', index=False)
+        crew_df.to_sql('crew', conn, if_exists='append', index=False)
         print(f"  - Loaded {len(crew_df)} records into 'crew'.")
         
+        # Refresh planner statistics now that the indexed tables are populated
+        cursor.execute("ANALYZE")
+        
     except Exception as e:
         print(f"An error occurred while loading data: {e}")
         conn.close()
@@ -0,0 +1,368 @@
+"""
+ASGI HTTP Server for the United Airlines Database MCP Server.
+
+Serves the same routes and JSON contract as database_http_server.py (Flask),
+but as a plain ASGI application: requests are handled on an event loop and the
+blocking SQLite work of each tool call runs on a bounded thread pool, so one
+slow query occupies one worker thread instead of stalling every agent.
+
+Usage:
+    python services/database_asgi_server.py                    # single process on port 8001
+    python services/database_asgi_server.py --workers 4        # pre-forked worker processes
+    uvicorn database_asgi_server:app --app-dir services --workers 4 --port 8001
+
+Each worker process opens its own connection pool; WAL mode lets them share
+united_ops.db. Thread pool size: DATABASE_EXECUTOR_THREADS (default: pool size).
+
+The query cache lives in each worker and a write only invalidates the cache of
+the worker that made it, so other workers could keep serving stale seat
+counts. main() turns the cache off (DATABASE_CACHE_SIZE=0) whenever --workers
+is above 1; set DATABASE_CACHE_SIZE=0 yourself when starting several workers
+through uvicorn directly.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database_mcp_server import UnitedAirlinesDatabaseMCPServer, DEFAULT_PAGE_SIZE
+from mcp_wire_format import encode_response, dumps, loads
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Global MCP server instance and the thread pool its blocking calls run on
+mcp_server: Optional[UnitedAirlinesDatabaseMCPServer] = None
+executor: Optional[ThreadPoolExecutor] = None
+
+# Rows sent per body chunk by /stream/<tool_name>
+STREAM_CHUNK_ROWS = 200
+
+class Request:
+    """The parts of an HTTP request the route handlers need."""
+
+    def __init__(self, method: str, path: str, query: Dict[str, List[str]], body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.body = body
+
+    def arg(self, name: str) -> Optional[str]:
+        values = self.query.get(name)
+        return values[0] if values else None
+
+    def int_arg(self, name: str) -> Optional[int]:
+        # Same as Flask's request.args.get(name, type=int): None if missing or not an integer
+        try:
+            return int(self.arg(name))
+        except (TypeError, ValueError):
+            return None
+
+    def json(self) -> Dict[str, Any]:
+        """Parse the JSON body; an empty body is an empty object."""
+        if not self.body:
+            return {}
+        return loads(self.body) or {}
+
+class Streaming:
+    """A response whose body is produced by a blocking iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterator[bytes], content_type: str):
+        self.chunks = chunks
+        self.content_type = content_type
+
+Response = Tuple[int, Any]
+Handler = Callable[..., Awaitable[Any]]
+
+def _get_executor() -> ThreadPoolExecutor:
+    global executor
+    if executor is None:
+        pool_size = mcp_server.pool.pool_size if mcp_server is not None else 5
+        executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("DATABASE_EXECUTOR_THREADS", str(pool_size))),
+            thread_name_prefix="database-tool"
+        )
+    return executor
+
+async def run_blocking(fn: Callable, *args) -> Any:
+    """Run blocking database work on the bounded thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+
+async def execute(tool_name: str, parameters: Dict[str, Any]) -> Response:
+    result = await run_blocking(mcp_server.execute_tool, tool_name, parameters)
+    return 200, result
+
+# --- Route handlers (mirroring database_http_server.py) ---
+
+async def health_check(request: Request) -> Response:
+    return 200, {"status": "healthy", "running": True}
+
+async def get_available_tools(request: Request) -> Response:
+    tools = mcp_server.get_tools()
+    return 200, {"tools": tools, "count": len(tools)}
+
+async def execute_tool(request: Request, tool_name: str) -> Response:
+    return await execute(tool_name, request.json())
+
+async def execute_batch(request: Request) -> Response:
+    body = request.json()
+    calls = body.get("calls")
+    if not isinstance(calls, list) or not all(isinstance(call, dict) and "tool" in call for call in calls):
+        return 400, {"error": "'calls' must be a list of {\"tool\": ..., \"parameters\": {...}} objects"}
+
+    result = await run_blocking(mcp_server.execute_batch, calls, bool(body.get("transactional", False)))
+    return 200, result
+
+async def stream_tool(request: Request, tool_name: str) -> Any:
+    page_size = request.int_arg("page_size") or DEFAULT_PAGE_SIZE
+    try:
+        parameters = request.json()
+    except json.JSONDecodeError:
+        parameters = {}
+    try:
+        rows = mcp_server.stream_tool(tool_name, parameters, page_size=page_size)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+
+    def chunks() -> Iterator[bytes]:
+        lines = []
+        try:
+            for row in rows:
+                lines.append(dumps(row) + b"\n")
+                if len(lines) >= STREAM_CHUNK_ROWS:
+                    yield b"".join(lines)
+                    lines = []
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band as the last line
+            logger.error(f"Error while streaming tool {tool_name}: {e}")
+            lines.append(dumps({"_stream_error": str(e)}) + b"\n")
+        if lines:
+            yield b"".join(lines)
+
+    return Streaming(chunks(), "application/x-ndjson")
+
+async def query_passengers(request: Request) -> Response:
+    parameters = {}
+    if request.arg("flight_number"):
+        parameters["flight_number"] = request.arg("flight_number")
+    if request.arg("loyalty_tier"):
+        parameters["loyalty_tier"] = request.arg("loyalty_tier")
+    if request.int_arg("limit"):
+        parameters["limit"] = request.int_arg("limit")
+    return await execute("query_passengers", parameters)
+
+async def query_flights(request: Request) -> Response:
+    parameters = {}
+    for name in ("departure_location", "arrival_location", "status"):
+        if request.arg(name):
+            parameters[name] = request.arg(name)
+    if request.int_arg("limit"):
+        parameters["limit"] = request.int_arg("limit")
+    return await execute("query_flights", parameters)
+
+async def update_passenger_flight(request: Request, passenger_id: str) -> Response:
+    data = request.json()
+    new_flight = data.get("new_flight")
+    if not new_flight:
+        return 400, {"error": "new_flight parameter is required"}
+
+    return await execute("update_passenger_flight", {
+        "passenger_id": passenger_id,
+        "new_flight": new_flight,
+        "reason": data.get("reason", "No reason provided")
+    })
+
+async def get_available_seats(request: Request, flight_number: str) -> Response:
+    return await execute("get_available_seats", {"flight_number": flight_number})
+
+async def get_flight_details(request: Request, flight_number: str) -> Response:
+    return await execute("get_flight_details", {"flight_number": flight_number})
+
+async def get_passenger_count(request: Request, flight_number: str) -> Response:
+    return await execute("get_passenger_count", {"flight_number": flight_number})
+
+async def get_server_status(request: Request) -> Response:
+    return await execute("get_server_status", {})
+
+async def shutdown(request: Request) -> Response:
+    global mcp_server
+    if mcp_server:
+        server, mcp_server = mcp_server, None
+        await run_blocking(server.close)
+        logger.info("🛑 Database MCP server stopped")
+    return 200, {"status": "shutdown"}
+
+# (method, path pattern, handler, needs an initialised MCP server)
+ROUTES: List[Tuple[str, "re.Pattern", Handler, bool]] = [
+    ("GET", re.compile(r"^/health$"), health_check, False),
+    ("GET", re.compile(r"^/tools$"), get_available_tools, True),
+    ("POST", re.compile(r"^/execute/(?P<tool_name>[^/]+)$"), execute_tool, True),
+    ("POST", re.compile(r"^/execute_batch$"), execute_batch, True),
+    ("POST", re.compile(r"^/stream/(?P<tool_name>[^/]+)$"), stream_tool, True),
+    ("GET", re.compile(r"^/passengers$"), query_passengers, True),
+    ("GET", re.compile(r"^/flights$"), query_flights, True),
+    ("PUT", re.compile(r"^/passengers/(?P<passenger_id>[^/]+)/flight$"), update_passenger_flight, True),
+    ("GET", re.compile(r"^/flights/(?P<flight_number>[^/]+)/seats$"), get_available_seats, True),
+    ("GET", re.compile(r"^/flights/(?P<flight_number>[^/]+)$"), get_flight_details, True),
+    ("GET", re.compile(r"^/flights/(?P<flight_number>[^/]+)/passengers$"), get_passenger_count, True),
+    ("GET", re.compile(r"^/status$"), get_server_status, True),
+    ("POST", re.compile(r"^/shutdown$"), shutdown, False)
+]
+
+def _match(method: str, path: str) -> Tuple[int, Optional[Handler], Dict[str, str], bool]:
+    path_matched = False
+    for route_method, pattern, handler, needs_server in ROUTES:
+        match = pattern.match(path)
+        if match:
+            path_matched = True
+            if route_method == method:
+                return 200, handler, match.groupdict(), needs_server
+    return (405 if path_matched else 404), None, {}, False
+
+# --- ASGI plumbing ---
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+async def _send_payload(send, status: int, payload: Any, request_headers: Dict[bytes, bytes]):
+    # Encoded in the format the client negotiated (JSON or msgpack, gzip when large)
+    body, headers = encode_response(payload, request_headers.get(b"accept", b"").decode("latin-1"),
+                                    request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+    headers["Content-Length"] = str(len(body))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def _send_streaming(send, response: Streaming):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", response.content_type.encode())]
+    })
+    done = object()
+    while True:
+        # Each chunk is produced on the thread pool: it may read the next page from SQLite
+        chunk = await run_blocking(next, response.chunks, done)
+        if chunk is done:
+            break
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+async def _lifespan(receive, send):
+    global mcp_server, executor
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                if mcp_server is None:
+                    mcp_server = await asyncio.get_running_loop().run_in_executor(None, UnitedAirlinesDatabaseMCPServer.from_env)
+                    logger.info(f"🚀 Database MCP server initialized (pid {os.getpid()})")
+                _get_executor()
+                await send({"type": "lifespan.startup.complete"})
+            except Exception as e:
+                logger.error(f"Error initializing database MCP server: {e}")
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+        elif message["type"] == "lifespan.shutdown":
+            if mcp_server is not None:
+                mcp_server.close()
+                mcp_server = None
+            if executor is not None:
+                executor.shutdown(wait=True)
+                executor = None
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    """ASGI entry point."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    request_headers = dict(scope.get("headers", []))
+    status, handler, path_params, needs_server = _match(scope["method"], scope["path"])
+    if handler is None:
+        await _read_body(receive)
+        await _send_payload(send, status, {"error": "Not found" if status == 404 else "Method not allowed"}, request_headers)
+        return
+
+    request = Request(scope["method"], scope["path"], parse_qs(scope.get("query_string", b"").decode()), await _read_body(receive))
+
+    try:
+        if needs_server and mcp_server is None:
+            await _send_payload(send, 500, {"error": "Database MCP server not initialized"}, request_headers)
+            return
+        response = await handler(request, **path_params)
+    except json.JSONDecodeError as e:
+        await _send_payload(send, 400, {"error": f"Invalid JSON body: {e}"}, request_headers)
+        return
+    except Exception as e:
+        logger.error(f"Error handling {scope['method']} {scope['path']}: {e}")
+        await _send_payload(send, 500, {"error": str(e)}, request_headers)
+        return
+
+    if isinstance(response, Streaming):
+        await _send_streaming(send, response)
+    else:
+        await _send_payload(send, *response, request_headers)
+
+def configure_worker_cache(workers: int) -> None:
+    """Turn the per-process query cache off when several workers share the database."""
+    if workers > 1 and os.getenv("DATABASE_CACHE_SIZE", "1024") != "0":
+        print(f"⚠️ Query cache disabled: {workers} workers would each cache seat counts the others change")
+        os.environ["DATABASE_CACHE_SIZE"] = "0"
+
+def main():
+    parser = argparse.ArgumentParser(description="ASGI server for the United Airlines database MCP tools")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8001, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("DATABASE_HTTP_WORKERS", "1")),
+                        help="Number of pre-forked worker processes")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ uvicorn is required to run the ASGI server: pip install uvicorn")
+        sys.exit(1)
+
+    # Workers build their servers from the environment, so this has to happen before they fork
+    configure_worker_cache(args.workers)
+
+    print("🚀 Starting United Airlines Database ASGI Server")
+    print("=" * 60)
+    print(f"Listening on {args.host}:{args.port} with {args.workers} worker process(es)")
+    print("Endpoints: same as database_http_server.py")
+    print("=" * 60)
+
+    # An import string (rather than the app object) lets uvicorn fork worker processes
+    uvicorn.run(
+        "database_asgi_server:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        log_level="warning"
+    )
+
+if __name__ == '__main__':
+    main()
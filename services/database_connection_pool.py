@@ -0,0 +1,206 @@
+"""
+SQLite Connection Pool
+
+Thread-safe pool of persistent SQLite connections for the database MCP server.
+Connections are opened lazily up to a fixed pool size, initialised exactly once
+(PRAGMAs and other per-connection setup) and health-checked before they are
+handed out again after sitting idle.
+"""
+
+import sqlite3
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from queue import LifoQueue, Empty
+from typing import Dict, Any, Callable, Iterator, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ConnectionPoolExhausted(RuntimeError):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+@dataclass
+class PooledConnection:
+    """A pooled SQLite connection plus the bookkeeping the pool needs."""
+    connection: sqlite3.Connection
+    created_at: float = field(default_factory=time.monotonic)
+    last_used_at: float = field(default_factory=time.monotonic)
+    uses: int = 0
+
+class SQLiteConnectionPool:
+    """
+    Bounded pool of SQLite connections.
+
+    At most `pool_size` connections exist at any time. A caller that finds the
+    pool fully checked out waits up to `checkout_timeout` seconds before
+    ConnectionPoolExhausted is raised. Connections idle for longer than
+    `health_check_interval` seconds are validated with `SELECT 1` before reuse
+    and transparently replaced if the check fails.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 5, checkout_timeout: float = 30.0,
+                 health_check_interval: float = 30.0,
+                 initializer: Optional[Callable[[sqlite3.Connection], None]] = None):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.initializer = initializer
+
+        self._idle: "LifoQueue[PooledConnection]" = LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Statistics
+        self.stats = {
+            'connections_created': 0,
+            'connections_closed': 0,
+            'checkouts': 0,
+            'checkout_timeouts': 0,
+            'health_checks': 0,
+            'health_check_failures': 0,
+            'in_use': 0,
+            'peak_in_use': 0,
+            'total_wait_ms': 0.0
+        }
+
+    def _open_connection(self) -> PooledConnection:
+        """Open and initialise a new connection."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            if self.initializer is not None:
+                self.initializer(conn)
+        except Exception:
+            conn.close()
+            raise
+
+        with self._lock:
+            self.stats['connections_created'] += 1
+        logger.debug(f"🔌 Opened pooled connection to {self.db_path}")
+        return PooledConnection(connection=conn)
+
+    def _discard(self, pooled: PooledConnection):
+        """Close a connection that is leaving the pool."""
+        try:
+            pooled.connection.close()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Error closing pooled connection: {e}")
+        with self._lock:
+            self.stats['connections_closed'] += 1
+
+    def _is_healthy(self, pooled: PooledConnection) -> bool:
+        """Run a cheap round trip on a connection that has been idle for a while."""
+        if time.monotonic() - pooled.last_used_at < self.health_check_interval:
+            return True
+
+        with self._lock:
+            self.stats['health_checks'] += 1
+        try:
+            pooled.connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Pooled connection failed health check: {e}")
+            with self._lock:
+                self.stats['health_check_failures'] += 1
+            return False
+
+    def acquire(self) -> PooledConnection:
+        """Check a connection out of the pool, opening one if none is idle."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        wait_start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            with self._lock:
+                self.stats['checkout_timeouts'] += 1
+            raise ConnectionPoolExhausted(
+                f"No database connection available after {self.checkout_timeout}s (pool size {self.pool_size})"
+            )
+
+        try:
+            pooled = None
+            while pooled is None:
+                try:
+                    candidate = self._idle.get_nowait()
+                except Empty:
+                    pooled = self._open_connection()
+                    break
+                if self._is_healthy(candidate):
+                    pooled = candidate
+                else:
+                    self._discard(candidate)
+        except Exception:
+            self._slots.release()
+            raise
+
+        pooled.uses += 1
+        with self._lock:
+            self.stats['checkouts'] += 1
+            self.stats['in_use'] += 1
+            self.stats['peak_in_use'] = max(self.stats['peak_in_use'], self.stats['in_use'])
+            self.stats['total_wait_ms'] += (time.perf_counter() - wait_start) * 1000
+        return pooled
+
+    def release(self, pooled: PooledConnection):
+        """Return a connection to the pool, rolling back any unfinished transaction."""
+        try:
+            if pooled.connection.in_transaction:
+                pooled.connection.rollback()
+            keep = not self._closed
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Dropping pooled connection after failed rollback: {e}")
+            keep = False
+
+        with self._lock:
+            self.stats['in_use'] -= 1
+
+        if keep:
+            pooled.last_used_at = time.monotonic()
+            self._idle.put(pooled)
+        else:
+            self._discard(pooled)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager yielding a pooled connection for the duration of the block."""
+        pooled = self.acquire()
+        try:
+            yield pooled.connection
+        finally:
+            self.release(pooled)
+
+    def close(self):
+        """Close all idle connections; checked-out connections are closed on release."""
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(pooled)
+        logger.info("🛑 Connection pool closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool utilisation statistics."""
+        with self._lock:
+            stats = dict(self.stats)
+
+        open_connections = stats['connections_created'] - stats['connections_closed']
+        stats.update({
+            'pool_size': self.pool_size,
+            'open_connections': open_connections,
+            'idle': self._idle.qsize(),
+            'utilisation': stats['in_use'] / self.pool_size,
+            'avg_wait_ms': stats['total_wait_ms'] / stats['checkouts'] if stats['checkouts'] else 0.0,
+            'closed': self._closed
+        })
+        return stats
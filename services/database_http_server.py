@@ -5,9 +5,10 @@ This provides HTTP endpoints that agents can call to interact with the database
 through standardized MCP tools.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, Response, stream_with_context
 import logging
-from database_mcp_server import UnitedAirlinesDatabaseMCPServer
+from database_mcp_server import UnitedAirlinesDatabaseMCPServer, DEFAULT_PAGE_SIZE
+from mcp_wire_format import encode_response, dumps
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -19,53 +20,109 @@ app = Flask(__name__)
 # Global MCP server instance
 mcp_server = None
 
+def respond(payload):
+    """Encode a response in the negotiated wire format (JSON or msgpack, gzip when large)."""
+    body, headers = encode_response(payload, request.headers.get('Accept'), request.headers.get('Accept-Encoding'))
+    return Response(body, headers=headers)
+
+def create_mcp_server() -> UnitedAirlinesDatabaseMCPServer:
+    """Build the database MCP server from the DATABASE_* environment settings."""
+    return UnitedAirlinesDatabaseMCPServer.from_env()
+
 @app.before_first_request
 def initialize_mcp_server():
     """Initialize the database MCP server before the first request."""
     global mcp_server
     if mcp_server is None:
-        mcp_server = UnitedAirlinesDatabaseMCPServer()
+        mcp_server = create_mcp_server()
         logger.info("🚀 Database MCP server initialized")
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({"status": "healthy", "running": True})
+    return respond({"status": "healthy", "running": True})
 
 @app.route('/tools', methods=['GET'])
 def get_available_tools():
     """Get all available database tools."""
     try:
         if mcp_server is None:
-            return jsonify({"error": "Database MCP server not initialized"}), 500
+            return respond({"error": "Database MCP server not initialized"}), 500
         
         tools = mcp_server.get_tools()
-        return jsonify({
+        return respond({
             "tools": tools,
             "count": len(tools)
         })
         
     except Exception as e:
         logger.error(f"Error getting tools: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 @app.route('/execute/<tool_name>', methods=['POST'])
 def execute_tool(tool_name):
     """Execute a specific database tool."""
     try:
         if mcp_server is None:
-            return jsonify({"error": "Database MCP server not initialized"}), 500
+            return respond({"error": "Database MCP server not initialized"}), 500
         
         # Get parameters from request body
         parameters = request.get_json() or {}
         
         # Execute the tool
         result = mcp_server.execute_tool(tool_name, parameters)
-        return jsonify(result)
+        return respond(result)
         
     except Exception as e:
         logger.error(f"Error executing tool {tool_name}: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
+
+@app.route('/execute_batch', methods=['POST'])
+def execute_batch():
+    """Execute several database tools in one request, optionally in one transaction."""
+    try:
+        if mcp_server is None:
+            return respond({"error": "Database MCP server not initialized"}), 500
+        
+        body = request.get_json() or {}
+        calls = body.get("calls")
+        if not isinstance(calls, list) or not all(isinstance(call, dict) and "tool" in call for call in calls):
+            return respond({"error": "'calls' must be a list of {\"tool\": ..., \"parameters\": {...}} objects"}), 400
+        
+        result = mcp_server.execute_batch(calls, transactional=bool(body.get("transactional", False)))
+        return respond(result)
+        
+    except Exception as e:
+        logger.error(f"Error executing batch: {e}")
+        return respond({"error": str(e)}), 500
+
+@app.route('/stream/<tool_name>', methods=['POST'])
+def stream_tool(tool_name):
+    """Stream all rows of a query_* tool as newline-delimited JSON."""
+    try:
+        if mcp_server is None:
+            return respond({"error": "Database MCP server not initialized"}), 500
+        
+        parameters = request.get_json(silent=True) or {}
+        page_size = request.args.get('page_size', default=DEFAULT_PAGE_SIZE, type=int)
+        rows = mcp_server.stream_tool(tool_name, parameters, page_size=page_size)
+        
+    except ValueError as e:
+        return respond({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error streaming tool {tool_name}: {e}")
+        return respond({"error": str(e)}), 500
+    
+    def generate():
+        try:
+            for row in rows:
+                yield dumps(row) + b"\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band as the last line
+            logger.error(f"Error while streaming tool {tool_name}: {e}")
+            yield dumps({"_stream_error": str(e)}) + b"\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 # Convenience endpoints for common operations
 @app.route('/passengers', methods=['GET'])
@@ -73,7 +130,7 @@ def query_passengers():
     """Query passengers with optional filters."""
     try:
         if mcp_server is None:
-            return jsonify({"error": "Database MCP server not initialized"}), 500
+            return respond({"error": "Database MCP server not initialized"}), 500
         
         # Get query parameters
         flight_number = request.args.get('flight_number')
@@ -89,18 +146,18 @@ def query_passengers():
             parameters['limit'] = limit
         
         result = mcp_server.execute_tool("query_passengers", parameters)
-        return jsonify(result)
+        return respond(result)
         
     except Exception as e:
         logger.error(f"Error querying passengers: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 @app.route('/flights', methods=['GET'])
 def query_flights():
     """Query flights with optional filters."""
     try:
         if mcp_server is None:
-            return jsonify({"error": "Database MCP server not initialized"}), 500
+            return respond({"error": "Database MCP server not initialized"}), 500
         
         # Get query parameters
         departure_location = request.args.get('departure_location')
@@ -119,18 +176,18 @@ def query_flights():
             parameters['limit'] = limit
         
         result = mcp_server.execute_tool("query_flights", parameters)
-        return jsonify(result)
+        return respond(result)
         
     except Exception as e:
         logger.error(f"Error querying flights: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 @app.route('/passengers/<passenger_id>/flight', methods=['PUT'])
 def update_passenger_flight(passenger_id):
     """Update a passenger's flight assignment."""
     try:
         if mcp_server is None:
-            return jsonify({"error": "Database MCP server not initialized"}), 500
+            return respond({"error": "Database MCP server not initialized"}), 500
         
         # Get parameters from request body
         data = request.get_json() or {}
@@ -138,7 +195,7 @@ def update_passenger_flight(passenger_id):
         reason = data.get('reason', 'No reason provided')
         
         if not new_flight:
-            return jsonify({"error": "new_flight parameter is required"}), 400
+            return respond({"error": "new_flight parameter is required"}), 400
         
         parameters = {
             "passenger_id": passenger_id,
@@ -147,56 +204,70 @@ def update_passenger_flight(passenger_id):
         }
         
         result = mcp_server.execute_tool("update_passenger_flight", parameters)
-        return jsonify(result)
+        return respond(result)
         
     except Exception as e:
         logger.error(f"Error updating passenger flight: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 @app.route('/flights/<flight_number>/seats', methods=['GET'])
 def get_available_seats(flight_number):
     """Get available seats for a specific flight."""
     try:
         if mcp_server is None:
-            return jsonify({"error": "Database MCP server not initialized"}), 500
+            return respond({"error": "Database MCP server not initialized"}), 500
         
         parameters = {"flight_number": flight_number}
         result = mcp_server.execute_tool("get_available_seats", parameters)
-        return jsonify(result)
+        return respond(result)
         
     except Exception as e:
         logger.error(f"Error getting available seats: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 @app.route('/flights/<flight_number>', methods=['GET'])
 def get_flight_details(flight_number):
     """Get detailed information about a specific flight."""
     try:
         if mcp_server is None:
-            return jsonify({"error": "Database MCP server not initialized"}), 500
+            return respond({"error": "Database MCP server not initialized"}), 500
         
         parameters = {"flight_number": flight_number}
         result = mcp_server.execute_tool("get_flight_details", parameters)
-        return jsonify(result)
+        return respond(result)
         
     except Exception as e:
         logger.error(f"Error getting flight details: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 @app.route('/flights/<flight_number>/passengers', methods=['GET'])
 def get_passenger_count(flight_number):
     """Get the number of passengers on a specific flight."""
     try:
         if mcp_server is None:
-            return jsonify({"error": "Database MCP server not initialized"}), 500
+            return respond({"error": "Database MCP server not initialized"}), 500
         
         parameters = {"flight_number": flight_number}
         result = mcp_server.execute_tool("get_passenger_count", parameters)
-        return jsonify(result)
+        return respond(result)
         
     except Exception as e:
         logger.error(f"Error getting passenger count: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
+
+@app.route('/status', methods=['GET'])
+def get_server_status():
+    """Get database server health and connection pool statistics."""
+    try:
+        if mcp_server is None:
+            return respond({"error": "Database MCP server not initialized"}), 500
+        
+        result = mcp_server.execute_tool("get_server_status", {})
+        return respond(result)
+        
+    except Exception as e:
+        logger.error(f"Error getting server status: {e}")
+        return respond({"error": str(e)}), 500
 
 @app.route('/shutdown', methods=['POST'])
 def shutdown():
@@ -204,13 +275,14 @@ def shutdown():
     try:
         global mcp_server
         if mcp_server:
+            mcp_server.close()
             mcp_server = None
             logger.info("🛑 Database MCP server stopped")
-        return jsonify({"status": "shutdown"})
+        return respond({"status": "shutdown"})
         
     except Exception as e:
         logger.error(f"Error shutting down database MCP server: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 if __name__ == '__main__':
     print("🚀 Starting United Airlines Database HTTP Server")
@@ -219,17 +291,20 @@ if __name__ == '__main__':
     print("  GET  /health                           - Health check")
     print("  GET  /tools                            - Get available tools")
     print("  POST /execute/<tool_name>              - Execute any tool")
+    print("  POST /execute_batch                    - Execute several tools in one request")
+    print("  POST /stream/<tool_name>               - Stream query_* rows as NDJSON")
     print("  GET  /passengers                       - Query passengers")
     print("  GET  /flights                          - Query flights")
     print("  PUT  /passengers/<id>/flight           - Update passenger flight")
     print("  GET  /flights/<number>/seats           - Get available seats")
     print("  GET  /flights/<number>                 - Get flight details")
     print("  GET  /flights/<number>/passengers      - Get passenger count")
+    print("  GET  /status                           - Server, storage, connection pool and cache status")
     print("  POST /shutdown                         - Shutdown server")
     print("=" * 60)
     
     # Initialize MCP server
-    mcp_server = UnitedAirlinesDatabaseMCPServer()
+    mcp_server = create_mcp_server()
     
     try:
         # Run Flask app
@@ -238,5 +313,6 @@ if __name__ == '__main__':
         print("\n🛑 Shutting down server...")
     finally:
         if mcp_server:
+            mcp_server.close()
             mcp_server = None
         print("✅ Server stopped") 
\ No newline at end of file
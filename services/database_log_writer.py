@@ -0,0 +1,243 @@
+"""
+Agent Log Writer
+
+Group-commit sink for the agent_logs table. log_message calls enqueue rows on
+a bounded in-memory queue; a single writer thread drains it and inserts each
+batch in one transaction, so a burst of agent log lines costs one commit
+instead of one commit (and fsync) per line.
+
+A batch that hits "database is locked" (another connection holds the write
+lock, e.g. a transactional tool batch) is retried with backoff for up to
+lock_retry_seconds rather than dropped.
+
+Durability modes:
+    async: log_message returns once the row is queued. Rows still queued when
+        the process dies are lost; close() and flush() write them out.
+    sync: log_message waits until the batch containing its row has committed.
+        Concurrent callers still share commits.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from database_connection_pool import SQLiteConnectionPool
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = {"async", "sync"}
+
+INSERT_LOG_ROW = "INSERT INTO agent_logs (timestamp, run_id, agent_name, message, context) VALUES (?, ?, ?, ?, ?)"
+
+def log_row(run_id: str, agent_name: str, message: str, context: str = "{}") -> tuple:
+    """INSERT_LOG_ROW values, stamped now (same format as DATETIME('now')) so queueing does not skew log order."""
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return (timestamp, run_id, agent_name, message, context)
+
+class LogQueueFull(RuntimeError):
+    """Raised when the log queue stays full for longer than the enqueue timeout."""
+
+class _Flush:
+    """Queue marker: the writer sets `done` once everything queued before it is committed."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+class _PendingRow:
+    """A queued row; `committed` is only waited on in sync mode."""
+    __slots__ = ("values", "committed", "error")
+
+    def __init__(self, values: tuple, wait: bool):
+        self.values = values
+        self.committed = threading.Event() if wait else None
+        self.error: Optional[Exception] = None
+
+class AgentLogWriter:
+    """
+    Background writer that batches agent_logs inserts.
+
+    max_batch_rows: commit as soon as this many rows are pending.
+    flush_interval_ms: otherwise commit at most this long after the first pending row.
+    max_queue_size: bound on queued rows; writers block (up to enqueue_timeout) when full.
+    lock_retry_seconds: how long a batch keeps retrying while the database is locked.
+    """
+
+    def __init__(self, pool: SQLiteConnectionPool, durability: str = "async", max_batch_rows: int = 256,
+                 flush_interval_ms: float = 50.0, max_queue_size: int = 10000, enqueue_timeout: float = 5.0,
+                 lock_retry_seconds: float = 60.0):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unsupported log durability mode: {durability}")
+        if max_batch_rows < 1 or max_queue_size < 1 or flush_interval_ms < 0:
+            raise ValueError("max_batch_rows and max_queue_size must be positive and flush_interval_ms non-negative")
+
+        self.pool = pool
+        self.durability = durability
+        self.max_batch_rows = max_batch_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.enqueue_timeout = enqueue_timeout
+        self.lock_retry_seconds = lock_retry_seconds
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "rows_enqueued": 0,
+            "rows_written": 0,
+            "rows_failed": 0,
+            "batches_committed": 0,
+            "largest_batch": 0,
+            "queue_full_waits": 0,
+            "lock_retries": 0
+        }
+
+        self._thread = threading.Thread(target=self._run, name="agent-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, run_id: str, agent_name: str, message: str, context: str = "{}"):
+        """
+        Queue one agent_logs row. In sync mode, block until it is committed.
+
+        Raises:
+            LogQueueFull: If the queue stayed full for enqueue_timeout seconds
+            RuntimeError: If the writer is closed, or (sync mode) the batch failed
+        """
+        if self._closed:
+            raise RuntimeError("Agent log writer is closed")
+
+        row = _PendingRow(log_row(run_id, agent_name, message, context), wait=self.durability == "sync")
+
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self._stats["queue_full_waits"] += 1
+            try:
+                self._queue.put(row, timeout=self.enqueue_timeout)
+            except queue.Full:
+                raise LogQueueFull(f"Agent log queue full ({self._queue.maxsize} rows) for {self.enqueue_timeout}s")
+
+        with self._lock:
+            self._stats["rows_enqueued"] += 1
+
+        if row.committed is not None:
+            while not row.committed.wait(0.5):
+                if not self._thread.is_alive():
+                    raise RuntimeError("Agent log writer stopped before the row was written")
+            if row.error is not None:
+                raise RuntimeError(f"Failed to write agent log row: {row.error}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every row queued before this call is committed. Returns False on timeout."""
+        if self._closed or not self._thread.is_alive():
+            return True
+        marker = _Flush()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Write out everything still queued and stop the writer thread."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer counters and the current queue depth."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["durability"] = self.durability
+        stats["avg_batch_rows"] = round(stats["rows_written"] / stats["batches_committed"], 2) if stats["batches_committed"] else 0.0
+        return stats
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch: List[_PendingRow] = []
+            markers: List[_Flush] = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+
+            # Collect rows until the batch is full, the interval elapses or a flush is requested
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, _Flush):
+                    markers.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_batch_rows:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(batch)
+            for marker in markers:
+                marker.done.set()
+            if stop:
+                return
+
+    def _insert(self, batch: List[_PendingRow]):
+        with self.pool.connection() as conn:
+            try:
+                conn.executemany(INSERT_LOG_ROW, [row.values for row in batch])
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+
+    def _write_batch(self, batch: List[_PendingRow]):
+        error = None
+        deadline = time.monotonic() + self.lock_retry_seconds
+        delay = 0.05
+        while True:
+            try:
+                self._insert(batch)
+                break
+            except sqlite3.OperationalError as e:
+                # Locked or busy: the holder of the write lock will finish, so wait for it instead of dropping the rows
+                if time.monotonic() + delay > deadline:
+                    error = e
+                    logger.error(f"❌ Failed to write {len(batch)} agent log rows after {self.lock_retry_seconds:g}s of retries: {e}")
+                    break
+                with self._lock:
+                    self._stats["lock_retries"] += 1
+                logger.warning(f"⏳ Agent log batch of {len(batch)} rows hit '{e}' - retrying in {delay:.2f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, 1.0)
+            except Exception as e:
+                error = e
+                logger.error(f"❌ Failed to write {len(batch)} agent log rows: {e}")
+                break
+
+        with self._lock:
+            if error is None:
+                self._stats["rows_written"] += len(batch)
+                self._stats["batches_committed"] += 1
+                self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+            else:
+                self._stats["rows_failed"] += len(batch)
+
+        for row in batch:
+            if row.committed is not None:
+                row.error = error
+                row.committed.set()
@@ -0,0 +1,325 @@
+"""
+Async Database MCP Client
+
+asyncio counterpart of DatabaseMCPClient with the same method surface, built
+on a pooled httpx.AsyncClient. Independent lookups can be overlapped with
+gather():
+
+    async with AsyncDatabaseMCPClient() as client:
+        passengers, details = await client.gather(
+            client.query_passengers(flight_number="UA111"),
+            client.get_flight_details("UA111")
+        )
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional
+
+import httpx
+
+# Make sibling service modules importable however this module is loaded
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mcp_wire_format import client_accept_header, decode_response, loads
+from mcp_resilience import RetryPolicy, Backoff, MCPUnavailableError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class AsyncDatabaseMCPClient:
+    """
+    Async MCP client for communicating with the database server.
+
+    max_connections: bound on concurrent connections to the server; further
+        requests wait for a free connection.
+    max_keepalive_connections: idle connections kept open for reuse.
+    """
+
+    def __init__(self, server_url: str = "http://localhost:8001", timeout: float = 30, max_retries: int = 3, retry_delay: float = 1.0,
+                 wire_format: Optional[str] = None, max_connections: int = 20, max_keepalive_connections: int = 10,
+                 transport: Optional[httpx.AsyncBaseTransport] = None, max_retry_delay: float = 10.0, fail_fast: Optional[bool] = None):
+        self.server_url = server_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.client = httpx.AsyncClient(
+            base_url=self.server_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections),
+            headers={'Content-Type': 'application/json', 'Accept': client_accept_header(wire_format)},
+            transport=transport
+        )
+        # Same backoff, circuit breaker and retry budget as DatabaseMCPClient (shared per server URL)
+        self.retry_policy = RetryPolicy(
+            "Async Database Client", self.server_url, (httpx.HTTPError,),
+            max_attempts=max_retries, backoff=Backoff(base_delay=retry_delay, max_delay=max_retry_delay), fail_fast=fail_fast
+        )
+        self._suppress_logging = False
+
+    async def __aenter__(self) -> "AsyncDatabaseMCPClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled connections."""
+        await self.client.aclose()
+
+    def suppress_logging(self, suppress: bool = True):
+        """Temporarily suppress logging for batch operations."""
+        self._suppress_logging = suppress
+
+    @staticmethod
+    async def gather(*calls: Awaitable, return_exceptions: bool = False) -> List[Any]:
+        """
+        Run several client calls concurrently and return their results in order.
+
+        Args:
+            calls: Coroutines from this client's methods
+            return_exceptions: Return exceptions as results instead of raising the first one
+        """
+        return list(await asyncio.gather(*calls, return_exceptions=return_exceptions))
+
+    async def _send(self, method: str, path: str, max_attempts: Optional[int] = None, stream: bool = False, **kwargs) -> httpx.Response:
+        """Send a request under the retry policy; non-2xx responses raise."""
+        async def attempt():
+            response = await self.client.send(self.client.build_request(method, path, **kwargs), stream=stream)
+            if response.is_error:
+                if stream:
+                    await response.aread()
+                    await response.aclose()
+                response.raise_for_status()
+            return response
+        return await self.retry_policy.acall(attempt, max_attempts=max_attempts)
+
+    async def _request(self, method: str, path: str, description: str, **kwargs) -> Any:
+        try:
+            return decode_response(await self._send(method, path, **kwargs))
+        except (httpx.HTTPError, MCPUnavailableError) as e:
+            raise RuntimeError(f"Failed to {description}: {e}")
+
+    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute a database tool with retry logic.
+
+        Args:
+            tool_name: Name of the tool to execute
+            parameters: Tool parameters
+
+        Returns:
+            Dictionary with tool execution result
+        """
+        result = await self._request("POST", f"/execute/{tool_name}", f"execute {tool_name}", json=parameters)
+        if not self._suppress_logging:
+            logger.info(f"🗄️ Async Database Client: Executed {tool_name}")
+        return result
+
+    async def execute_batch(self, calls: List[Dict[str, Any]], transactional: bool = False) -> Dict[str, Any]:
+        """
+        Execute several database tools in a single request with retry logic.
+
+        Args:
+            calls: List of {"tool": <tool name>, "parameters": {...}} dictionaries
+            transactional: Run all calls in one database transaction; the first
+                failed call rolls the whole batch back
+
+        Returns:
+            Dictionary with per-call results in request order
+        """
+        result = await self._request("POST", "/execute_batch", "execute batch",
+                                     json={"calls": calls, "transactional": transactional})
+        if not self._suppress_logging:
+            logger.info(f"🗄️ Async Database Client: Executed batch of {len(calls)} calls")
+        return result
+
+    async def stream_tool(self, tool_name: str, parameters: Optional[Dict[str, Any]] = None,
+                          page_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the rows of a query_* tool from the server's NDJSON endpoint.
+
+        Only opening the stream is retried; a failure after rows have been
+        yielded is raised to the caller.
+
+        Args:
+            tool_name: query_passengers, query_flights or query_crew
+            parameters: Tool filters (limit caps the number of rows)
+            page_size: Rows the server reads from the database per page
+
+        Yields:
+            Row dictionaries
+        """
+        try:
+            response = await self._send("POST", f"/stream/{tool_name}", stream=True, json=parameters or {},
+                                        params={"page_size": page_size} if page_size else None)
+        except (httpx.HTTPError, MCPUnavailableError) as e:
+            raise RuntimeError(f"Failed to stream {tool_name}: {e}")
+
+        rows = 0
+        try:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                row = loads(line)
+                if "_stream_error" in row:
+                    raise RuntimeError(f"Stream of {tool_name} failed after {rows} rows: {row['_stream_error']}")
+                rows += 1
+                yield row
+        finally:
+            await response.aclose()
+
+        if not self._suppress_logging:
+            logger.info(f"🗄️ Async Database Client: Streamed {rows} rows from {tool_name}")
+
+    async def query_passengers(self, flight_number: Optional[str] = None, loyalty_tier: Optional[str] = None, limit: Optional[int] = None,
+                               fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Query passengers with optional filters (see DatabaseMCPClient.query_passengers)."""
+        params = {}
+        if flight_number:
+            params['flight_number'] = flight_number
+        if loyalty_tier:
+            params['loyalty_tier'] = loyalty_tier
+        if limit:
+            params['limit'] = limit
+        if fields:
+            params['fields'] = fields
+
+        result = await self.execute_tool("query_passengers", params)
+        return result.get("result", [])
+
+    async def query_flights(self, departure_location: Optional[str] = None, arrival_location: Optional[str] = None, status: Optional[str] = None,
+                            limit: Optional[int] = None, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Query flights with optional filters (see DatabaseMCPClient.query_flights)."""
+        params = {}
+        if departure_location:
+            params['departure_location'] = departure_location
+        if arrival_location:
+            params['arrival_location'] = arrival_location
+        if status:
+            params['status'] = status
+        if limit:
+            params['limit'] = limit
+        if fields:
+            params['fields'] = fields
+
+        result = await self.execute_tool("query_flights", params)
+        return result.get("result", [])
+
+    async def search_alternative_flights(self, departure_location: str, arrival_location: str, departure_after: str,
+                                         passenger_count: int, exclude_flight_number: Optional[str] = None,
+                                         fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Find the earliest-arriving flights on a route that together cover passenger_count seats."""
+        params = {
+            "departure_location": departure_location,
+            "arrival_location": arrival_location,
+            "departure_after": departure_after,
+            "passenger_count": passenger_count
+        }
+        if exclude_flight_number:
+            params['exclude_flight_number'] = exclude_flight_number
+        if fields:
+            params['fields'] = fields
+
+        result = await self.execute_tool("search_alternative_flights", params)
+        return result.get("result", [])
+
+    async def query_crew(self, assigned_flight: Optional[str] = None, role: Optional[str] = None, base: Optional[str] = None,
+                         min_rest_hours: Optional[float] = None, max_fatigue_score: Optional[float] = None,
+                         has_duty_assignment: Optional[bool] = None, limit: Optional[int] = None,
+                         fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Query crew with optional filters (see DatabaseMCPClient.query_crew)."""
+        params = {}
+        if assigned_flight is not None:
+            params['assigned_flight'] = assigned_flight
+        if role:
+            params['role'] = role
+        if base:
+            params['base'] = base
+        if min_rest_hours is not None:
+            params['min_rest_hours'] = min_rest_hours
+        if max_fatigue_score is not None:
+            params['max_fatigue_score'] = max_fatigue_score
+        if has_duty_assignment is not None:
+            params['has_duty_assignment'] = has_duty_assignment
+        if limit:
+            params['limit'] = limit
+        if fields:
+            params['fields'] = fields
+
+        result = await self.execute_tool("query_crew", params)
+        return result.get("result", [])
+
+    async def update_passenger_flight(self, passenger_id: str, new_flight: str, reason: str = "No reason provided") -> Dict[str, Any]:
+        """Update a passenger's flight assignment."""
+        result = await self.execute_tool("update_passenger_flight", {
+            "passenger_id": passenger_id,
+            "new_flight": new_flight,
+            "reason": reason
+        })
+        return result.get("result", {})
+
+    async def bulk_reassign_passengers(self, assignments: List[Dict[str, Any]], reason: str = "No reason provided") -> Dict[str, Any]:
+        """Reassign many passengers in one transaction with seat-inventory accounting."""
+        result = await self.execute_tool("bulk_reassign_passengers", {
+            "assignments": assignments,
+            "reason": reason
+        })
+        if not result.get("success"):
+            return {"success": False, "error": result.get("error", "Unknown error")}
+        return result.get("result", {})
+
+    async def update_flight_status(self, flight_number: str, status: str, departure_time: Optional[str] = None) -> Dict[str, Any]:
+        """Set the status of a flight."""
+        params = {
+            "flight_number": flight_number,
+            "status": status
+        }
+        if departure_time:
+            params['departure_time'] = departure_time
+
+        result = await self.execute_tool("update_flight_status", params)
+        return result.get("result", {})
+
+    async def get_available_seats(self, flight_number: str) -> Dict[str, Any]:
+        """Get number of available seats on a specific flight."""
+        result = await self.execute_tool("get_available_seats", {"flight_number": flight_number})
+        return result.get("result", {})
+
+    async def get_flight_details(self, flight_number: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get detailed information about a specific flight."""
+        params = {"flight_number": flight_number}
+        if fields:
+            params['fields'] = fields
+
+        result = await self.execute_tool("get_flight_details", params)
+        return result.get("result", {})
+
+    async def get_passenger_count(self, flight_number: str) -> Dict[str, Any]:
+        """Get the number of passengers on a specific flight."""
+        result = await self.execute_tool("get_passenger_count", {"flight_number": flight_number})
+        return result.get("result", {})
+
+    async def get_server_status(self) -> Dict[str, Any]:
+        """Get database server health and connection pool statistics."""
+        result = await self.execute_tool("get_server_status", {})
+        return result.get("result", {})
+
+    async def get_available_tools(self) -> List[Dict[str, Any]]:
+        """Get all available database tools."""
+        try:
+            result = await self._request("GET", "/tools", "get tools")
+        except RuntimeError:
+            return []
+        return result.get("tools", [])
+
+    async def is_available(self) -> bool:
+        """Check if the database MCP server is available (one probe; False at once while the circuit is open)."""
+        try:
+            await self._send("GET", "/health", max_attempts=1, timeout=5)
+            return True
+        except (httpx.HTTPError, MCPUnavailableError):
+            return False
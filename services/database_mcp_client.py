@@ -6,12 +6,19 @@ with the database MCP server via HTTP.
 """
 
 import requests
-import json
-import time
+import os
+import sys
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator
 import random
 
+# Make sibling service modules importable however this module is loaded
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mcp_wire_format import client_accept_header, decode_response, loads
+from mcp_resilience import RetryPolicy, Backoff, MCPUnavailableError
+from mcp_transport import select_transport, IN_PROCESS, InProcessDatabaseTransport
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -21,15 +28,37 @@ class DatabaseMCPClient:
     MCP client for communicating with the database server.
     """
     
-    def __init__(self, server_url: str = "http://localhost:8001", timeout: int = 30, max_retries: int = 3, retry_delay: float = 1.0):
+    def __init__(self, server_url: str = "http://localhost:8001", timeout: int = 30, max_retries: int = 3, retry_delay: float = 1.0,
+                 wire_format: Optional[str] = None, max_retry_delay: float = 10.0, fail_fast: Optional[bool] = None,
+                 transport: Optional[str] = None, server: Optional[Any] = None):
         self.server_url = server_url.rstrip('/')
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        # Responses arrive as JSON or msgpack (wire_format / MCP_WIRE_FORMAT), gzip-compressed when large
+        self.session.headers.update({'Content-Type': 'application/json', 'Accept': client_accept_header(wire_format)})
+        # Jittered exponential backoff from retry_delay, plus the circuit breaker and retry budget shared by clients of this server
+        self.retry_policy = RetryPolicy(
+            "Database Client", self.server_url, (requests.exceptions.RequestException,),
+            max_attempts=max_retries, backoff=Backoff(base_delay=retry_delay, max_delay=max_retry_delay), fail_fast=fail_fast
+        )
+        # "http" (default) or "inprocess" (DATABASE_MCP_TRANSPORT / MCP_TRANSPORT): call `server`, or the
+        # process-wide database MCP server, directly with no HTTP or serialisation
+        self.transport = IN_PROCESS if server is not None else select_transport(transport, "DATABASE_MCP_TRANSPORT")
+        self._in_process = InProcessDatabaseTransport(server) if self.transport == IN_PROCESS else None
         self._suppress_logging = False
     
+    def _request(self, method: str, path: str, max_attempts: Optional[int] = None, **kwargs) -> requests.Response:
+        """Send a request under the retry policy; non-2xx responses raise."""
+        kwargs.setdefault("timeout", self.timeout)
+        
+        def attempt():
+            response = self.session.request(method, f"{self.server_url}{path}", **kwargs)
+            response.raise_for_status()
+            return response
+        return self.retry_policy.call(attempt, max_attempts=max_attempts)
+    
     def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute a database tool with retry logic.
@@ -41,32 +70,82 @@ class DatabaseMCPClient:
         Returns:
             Dictionary with tool execution result
         """
-        for attempt in range(self.max_retries):
+        if self._in_process is not None:
+            result = self._in_process.execute_tool(tool_name, parameters)
+        else:
+            try:
+                result = decode_response(self._request("POST", f"/execute/{tool_name}", json=parameters))
+            except (requests.exceptions.RequestException, MCPUnavailableError) as e:
+                raise RuntimeError(f"Failed to execute {tool_name}: {e}")
+        
+        # Only log if not suppressing logging
+        if not self._suppress_logging:
+            logger.info(f"🗄️ Database Client: Executed {tool_name}")
+        return result
+    
+    def execute_batch(self, calls: List[Dict[str, Any]], transactional: bool = False) -> Dict[str, Any]:
+        """
+        Execute several database tools in a single request with retry logic.
+        
+        Args:
+            calls: List of {"tool": <tool name>, "parameters": {...}} dictionaries
+            transactional: Run all calls in one database transaction; the first
+                failed call rolls the whole batch back
+            
+        Returns:
+            Dictionary with per-call results in request order
+        """
+        if self._in_process is not None:
+            result = self._in_process.execute_batch(calls, transactional)
+        else:
             try:
-                response = self.session.post(
-                    f"{self.server_url}/execute/{tool_name}",
-                    json=parameters,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                # Only log if not suppressing logging
-                if not self._suppress_logging:
-                    logger.info(f"🗄️ Database Client: Executed {tool_name}")
-                return result
-                
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"❌ Database Client: Attempt {attempt + 1}/{self.max_retries} failed: {e}")
-                if attempt < self.max_retries - 1:
-                    logger.info(f"⏳ Retrying in {self.retry_delay} seconds...")
-                    time.sleep(self.retry_delay)
-                else:
-                    logger.error(f"❌ Database Client: All {self.max_retries} attempts failed")
-                    raise RuntimeError(f"Failed to execute {tool_name} after {self.max_retries} attempts: {e}")
-        
-        # This should never be reached due to the raise statement above, but needed for type checking
-        raise RuntimeError("Unexpected error in execute_tool")
+                result = decode_response(self._request("POST", "/execute_batch", json={"calls": calls, "transactional": transactional}))
+            except (requests.exceptions.RequestException, MCPUnavailableError) as e:
+                raise RuntimeError(f"Failed to execute batch: {e}")
+        
+        if not self._suppress_logging:
+            logger.info(f"🗄️ Database Client: Executed batch of {len(calls)} calls")
+        return result
+    
+    def stream_tool(self, tool_name: str, parameters: Optional[Dict[str, Any]] = None, page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the rows of a query_* tool from the server's NDJSON endpoint.
+        
+        Rows are parsed one line at a time, so neither side holds the full
+        result set. Only opening the stream is retried; a failure after rows
+        have been yielded is raised to the caller.
+        
+        Args:
+            tool_name: query_passengers, query_flights or query_crew
+            parameters: Tool filters (limit caps the number of rows)
+            page_size: Rows the server reads from the database per page
+            
+        Yields:
+            Row dictionaries
+        """
+        if self._in_process is not None:
+            yield from self._in_process.stream_tool(tool_name, parameters or {}, page_size)
+            return
+        
+        query = {"page_size": page_size} if page_size else None
+        try:
+            response = self._request("POST", f"/stream/{tool_name}", json=parameters or {}, params=query, stream=True)
+        except (requests.exceptions.RequestException, MCPUnavailableError) as e:
+            raise RuntimeError(f"Failed to stream {tool_name}: {e}")
+        
+        rows = 0
+        with response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                row = loads(line)
+                if "_stream_error" in row:
+                    raise RuntimeError(f"Stream of {tool_name} failed after {rows} rows: {row['_stream_error']}")
+                rows += 1
+                yield row
+        
+        if not self._suppress_logging:
+            logger.info(f"🗄️ Database Client: Streamed {rows} rows from {tool_name}")
     
     def suppress_logging(self, suppress: bool = True):
         """
@@ -77,7 +156,8 @@ class DatabaseMCPClient:
         """
         self._suppress_logging = suppress
     
-    def query_passengers(self, flight_number: Optional[str] = None, loyalty_tier: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    def query_passengers(self, flight_number: Optional[str] = None, loyalty_tier: Optional[str] = None, limit: Optional[int] = None,
+                         fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Query passengers with optional filters.
         
@@ -85,6 +165,7 @@ class DatabaseMCPClient:
             flight_number: Flight number to filter by
             loyalty_tier: Loyalty tier to filter by
             limit: Maximum number of results
+            fields: Only return these columns (optional, default all)
             
         Returns:
             List of passenger dictionaries
@@ -96,11 +177,14 @@ class DatabaseMCPClient:
             params['loyalty_tier'] = loyalty_tier
         if limit:
             params['limit'] = limit
+        if fields:
+            params['fields'] = fields
         
         result = self.execute_tool("query_passengers", params)
         return result.get("result", [])
     
-    def query_flights(self, departure_location: Optional[str] = None, arrival_location: Optional[str] = None, status: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    def query_flights(self, departure_location: Optional[str] = None, arrival_location: Optional[str] = None, status: Optional[str] = None, limit: Optional[int] = None,
+                      fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Query flights with optional filters.
         
@@ -109,6 +193,7 @@ class DatabaseMCPClient:
             arrival_location: Arrival airport code
             status: Flight status
             limit: Maximum number of results
+            fields: Only return these columns (optional, default all)
             
         Returns:
             List of flight dictionaries
@@ -122,13 +207,47 @@ class DatabaseMCPClient:
             params['status'] = status
         if limit:
             params['limit'] = limit
+        if fields:
+            params['fields'] = fields
         
         result = self.execute_tool("query_flights", params)
         return result.get("result", [])
     
+    def search_alternative_flights(self, departure_location: str, arrival_location: str, departure_after: str,
+                                   passenger_count: int, exclude_flight_number: Optional[str] = None,
+                                   fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Find the earliest-arriving flights on a route that together cover passenger_count seats.
+        
+        Args:
+            departure_location: Origin airport code
+            arrival_location: Destination airport code
+            departure_after: Only flights departing after this time
+            passenger_count: Number of seats needed
+            exclude_flight_number: Flight number to leave out (e.g. the cancelled flight)
+            fields: Only return these columns (optional, default all)
+            
+        Returns:
+            List of flight dictionaries, earliest arrival first
+        """
+        params = {
+            "departure_location": departure_location,
+            "arrival_location": arrival_location,
+            "departure_after": departure_after,
+            "passenger_count": passenger_count
+        }
+        if exclude_flight_number:
+            params['exclude_flight_number'] = exclude_flight_number
+        if fields:
+            params['fields'] = fields
+        
+        result = self.execute_tool("search_alternative_flights", params)
+        return result.get("result", [])
+    
     def query_crew(self, assigned_flight: Optional[str] = None, role: Optional[str] = None, base: Optional[str] = None, 
                    min_rest_hours: Optional[float] = None, max_fatigue_score: Optional[float] = None, 
-                   has_duty_assignment: Optional[bool] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+                   has_duty_assignment: Optional[bool] = None, limit: Optional[int] = None,
+                   fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Query crew with optional filters.
         
@@ -140,6 +259,7 @@ class DatabaseMCPClient:
             max_fatigue_score: Maximum fatigue score allowed
             has_duty_assignment: Filter for crew with duty assignments
             limit: Maximum number of results
+            fields: Only return these columns (optional, default all)
             
         Returns:
             List of crew dictionaries
@@ -159,6 +279,8 @@ class DatabaseMCPClient:
             params['has_duty_assignment'] = has_duty_assignment
         if limit:
             params['limit'] = limit
+        if fields:
+            params['fields'] = fields
         
         result = self.execute_tool("query_crew", params)
         return result.get("result", [])
@@ -184,6 +306,50 @@ class DatabaseMCPClient:
         result = self.execute_tool("update_passenger_flight", params)
         return result.get("result", {})
     
+    def bulk_reassign_passengers(self, assignments: List[Dict[str, Any]], reason: str = "No reason provided") -> Dict[str, Any]:
+        """
+        Reassign many passengers in one transaction with seat-inventory accounting.
+        
+        Args:
+            assignments: List of {passenger_id, new_flight, new_departure_time (optional),
+                connecting_flights (optional list of {flight_number, departure_time} whose seats are taken too)}
+            reason: Reason for the reassignment
+            
+        Returns:
+            Summary with reassigned/rejected counts and per-flight seat changes
+        """
+        params = {
+            "assignments": assignments,
+            "reason": reason
+        }
+        
+        result = self.execute_tool("bulk_reassign_passengers", params)
+        if not result.get("success"):
+            return {"success": False, "error": result.get("error", "Unknown error")}
+        return result.get("result", {})
+    
+    def update_flight_status(self, flight_number: str, status: str, departure_time: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Set the status of a flight.
+        
+        Args:
+            flight_number: Flight number to update
+            status: New status (scheduled, delayed, cancelled, etc.)
+            departure_time: Departure time, needed when the flight number repeats across dates
+            
+        Returns:
+            Update result dictionary
+        """
+        params = {
+            "flight_number": flight_number,
+            "status": status
+        }
+        if departure_time:
+            params['departure_time'] = departure_time
+        
+        result = self.execute_tool("update_flight_status", params)
+        return result.get("result", {})
+    
     def get_available_seats(self, flight_number: str) -> Dict[str, Any]:
         """
         Get number of available seats on a specific flight.
@@ -198,17 +364,21 @@ class DatabaseMCPClient:
         result = self.execute_tool("get_available_seats", params)
         return result.get("result", {})
     
-    def get_flight_details(self, flight_number: str) -> Dict[str, Any]:
+    def get_flight_details(self, flight_number: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Get detailed information about a specific flight.
         
         Args:
             flight_number: Flight number to get details for
+            fields: Only return these columns (optional, default all)
             
         Returns:
             Dictionary with flight details
         """
         params = {"flight_number": flight_number}
+        if fields:
+            params['fields'] = fields
+        
         result = self.execute_tool("get_flight_details", params)
         return result.get("result", {})
     
@@ -226,6 +396,16 @@ class DatabaseMCPClient:
         result = self.execute_tool("get_passenger_count", params)
         return result.get("result", {})
     
+    def get_server_status(self) -> Dict[str, Any]:
+        """
+        Get database server health and connection pool statistics.
+        
+        Returns:
+            Dictionary with server status information
+        """
+        result = self.execute_tool("get_server_status", {})
+        return result.get("result", {})
+    
     def get_available_tools(self) -> List[Dict[str, Any]]:
         """
         Get all available database tools.
@@ -233,39 +413,25 @@ class DatabaseMCPClient:
         Returns:
             List of available tools
         """
-        for attempt in range(self.max_retries):
-            try:
-                response = self.session.get(
-                    f"{self.server_url}/tools",
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                return result.get("tools", [])
-                
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"❌ Database Client: Attempt {attempt + 1}/{self.max_retries} failed: {e}")
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                else:
-                    logger.error(f"❌ Database Client: All {self.max_retries} attempts failed")
-                    return []
-        
-        return []
+        if self._in_process is not None:
+            return self._in_process.get_tools()
+        
+        try:
+            result = decode_response(self._request("GET", "/tools"))
+        except (requests.exceptions.RequestException, MCPUnavailableError):
+            return []
+        return result.get("tools", [])
     
     def is_available(self) -> bool:
-        """Check if the database MCP server is available with retry logic."""
-        for attempt in range(self.max_retries):
-            try:
-                response = self.session.get(f"{self.server_url}/health", timeout=5)
-                return response.status_code == 200
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"❌ Database Client: Health check attempt {attempt + 1}/{self.max_retries} failed: {e}")
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-        
-        return False
+        """Check if the database MCP server is available (one probe; False at once while the circuit is open)."""
+        if self._in_process is not None:
+            return self._in_process.is_available()
+        
+        try:
+            self._request("GET", "/health", max_attempts=1, timeout=5)
+            return True
+        except (requests.exceptions.RequestException, MCPUnavailableError):
+            return False
 
 # Global client instance
 _database_client = None
@@ -8,17 +8,110 @@ for proper MCP database integration, especially when moving to GCP.
 
 import sqlite3
 import logging
+import time
 import json
-from typing import Dict, Any, List, Optional, Callable
+import base64
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Callable, Iterator, Iterable, Tuple
 from dataclasses import dataclass
-import pandas as pd
 from datetime import datetime
 import os
+import sys
+import threading
+
+# Make sibling service modules and the database package importable however this module is loaded
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_connection_pool import SQLiteConnectionPool
+from database_storage_config import StorageConfig, read_effective_settings
+from database_tool_registry import ToolRegistry, ToolParameterError
+from database_query_cache import QueryCache, make_cache_key
+from database_log_writer import AgentLogWriter, INSERT_LOG_ROW, log_row
+from single_flight import SingleFlight
+from database.migrations import apply_migrations, get_schema_version
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _fetch_all(conn: sqlite3.Connection, query: str, params=()) -> List[Dict[str, Any]]:
+    """Run a query and return its rows as plain dictionaries (no DataFrame round trip)."""
+    cursor = conn.execute(query, params)
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def _fetch_one(conn: sqlite3.Connection, query: str, params=()) -> Optional[Dict[str, Any]]:
+    """Run a query and return its first row as a dictionary, or None."""
+    cursor = conn.execute(query, params)
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return {description[0]: value for description, value in zip(cursor.description, row)}
+
+def _chunks(values: List[Any], size: int = 500) -> Iterator[List[Any]]:
+    """Split values into chunks that stay below SQLite's bound-parameter limit."""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _is_untracked_flight(flight_number: str) -> bool:
+    """Placeholder assignments such as 'UNASSIGNED (...)' carry no seat inventory."""
+    return flight_number.startswith(UNTRACKED_FLIGHT_PREFIXES)
+
+def _row_count(result: Any) -> int:
+    return len(result["rows"]) if isinstance(result, dict) else len(result)
+
+def _limit_clause(params: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Bound LIMIT/OFFSET clause for the optional limit and offset parameters."""
+    if "limit" not in params and "offset" not in params:
+        return "", []
+    # SQLite only accepts OFFSET after a LIMIT; -1 means no limit
+    return " LIMIT ? OFFSET ?", [params.get("limit", -1), params.get("offset", 0)]
+
+def _encode_after(values: List[Any]) -> str:
+    """Opaque keyset cursor for the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def _decode_after(token: str, key_count: int) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError):
+        raise ToolParameterError("parameters.after is not a valid page token")
+    if not isinstance(values, list) or len(values) != key_count:
+        raise ToolParameterError("parameters.after is not a valid page token")
+    return values
+
+# Per-flight lookups served from the read-through cache, invalidated by writes to that flight
+CACHEABLE_TOOLS = {"get_flight_details", "get_available_seats", "get_passenger_count"}
+
+# Read-only tools whose identical concurrent calls share one execution (single-flight)
+COALESCED_TOOLS = {
+    "query_passengers", "query_flights", "query_crew", "search_alternative_flights",
+    "get_available_seats", "get_flight_details", "get_passenger_count"
+}
+
+def _flight_tag(flight_number: str) -> str:
+    return f"flight:{flight_number}"
+
+# Tables whose rows the query/get tools can project with `fields`
+PROJECTABLE_TABLES = ("passengers", "flights", "crew")
+
+# Sort keys used for keyset pagination of each table's query_* tool
+PAGINATION_KEYS = {
+    "query_passengers": ("passenger_id",),
+    "query_flights": ("flight_number", "departure_time"),
+    "query_crew": ("crew_id",)
+}
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Upper bound on the number of tool calls (or bulk assignments) accepted in one request
+MAX_BATCH_SIZE = 5000
+
+# Passenger flight values that are not real flights and therefore hold no seats
+UNTRACKED_FLIGHT_PREFIXES = ("UNASSIGNED", "NO_FLIGHT_AVAILABLE")
+
 @dataclass
 class DatabaseTool:
     """Represents a database operation as an MCP tool."""
@@ -33,11 +126,65 @@ class UnitedAirlinesDatabaseMCPServer:
     Exposes database queries and updates as standardized tools.
     """
     
-    def __init__(self, db_path: str = "../database/united_ops.db"):
+    def __init__(self, db_path: str = "../database/united_ops.db", pool_size: int = 5, checkout_timeout: float = 30.0,
+                 storage_config: Optional[StorageConfig] = None, run_migrations: bool = True,
+                 cache_size: int = 1024, cache_ttl: float = 30.0, log_durability: str = "async",
+                 log_batch_rows: int = 256, log_flush_interval_ms: float = 50.0, single_flight: bool = True):
         self.db_path = db_path
+        self.storage_config = storage_config or StorageConfig()
+        # Read-through cache for hot flight lookups (cache_size=0 disables it)
+        self.cache = QueryCache(max_entries=cache_size, ttl_seconds=cache_ttl)
+        # Identical read calls already in flight are joined instead of re-run (single_flight=False disables it)
+        self.single_flight = SingleFlight() if single_flight else None
+        # Bumped by every committed write so later reads never join one that started before it
+        self._write_generation = 0
+        self._write_generation_lock = threading.Lock()
+        # Per-thread connection of an in-progress transactional batch
+        self._local = threading.local()
+        self.pool = SQLiteConnectionPool(
+            db_path,
+            pool_size=pool_size,
+            checkout_timeout=checkout_timeout,
+            initializer=self._initialize_connection
+        )
+        if run_migrations:
+            self._apply_migrations()
+        # agent_logs rows are group-committed by a background writer (the table is created by migrations)
+        self.log_writer = AgentLogWriter(
+            self.pool,
+            durability=log_durability,
+            max_batch_rows=log_batch_rows,
+            flush_interval_ms=log_flush_interval_ms
+        )
+        # Column names per table, used to validate `fields` projections
+        self.table_columns = self._read_table_columns()
         self.tools = self._initialize_tools()
+        self.registry = ToolRegistry(self.tools)
         logger.info(f"🚀 United Airlines Database MCP Server initialized with {len(self.tools)} tools")
     
+    @classmethod
+    def from_env(cls, **overrides) -> "UnitedAirlinesDatabaseMCPServer":
+        """
+        Build a server from DATABASE_* environment variables (pool size, storage
+        PRAGMAs, query cache and log writer settings); keyword arguments win.
+        """
+        settings = {
+            "pool_size": int(os.getenv("DATABASE_POOL_SIZE", "5")),
+            "storage_config": StorageConfig.from_env(),
+            # Read-through cache for flight lookups (DATABASE_CACHE_SIZE=0 disables it)
+            "cache_size": int(os.getenv("DATABASE_CACHE_SIZE", "1024")),
+            "cache_ttl": float(os.getenv("DATABASE_CACHE_TTL_SECONDS", "30")),
+            # Group-commit agent log writer: "async" returns once queued, "sync" waits for the commit
+            "log_durability": os.getenv("DATABASE_LOG_DURABILITY", "async"),
+            "log_batch_rows": int(os.getenv("DATABASE_LOG_BATCH_ROWS", "256")),
+            "log_flush_interval_ms": float(os.getenv("DATABASE_LOG_FLUSH_MS", "50")),
+            "single_flight": os.getenv("DATABASE_SINGLE_FLIGHT", "1").lower() not in ("0", "false", "no", "off")
+        }
+        if os.getenv("DATABASE_PATH"):
+            settings["db_path"] = os.getenv("DATABASE_PATH")
+        settings.update(overrides)
+        return cls(**settings)
+    
     def _initialize_tools(self) -> List[DatabaseTool]:
         """Initialize all available database tools."""
         return [
@@ -49,7 +196,11 @@ class UnitedAirlinesDatabaseMCPServer:
                     "properties": {
                         "flight_number": {"type": "string", "description": "Flight number to filter by"},
                         "loyalty_tier": {"type": "string", "description": "Loyalty tier to filter by (1K, Gold, Silver, etc.)"},
-                        "limit": {"type": "integer", "description": "Maximum number of results to return"}
+                        "limit": {"type": "integer", "minimum": 0, "description": "Maximum number of results to return"},
+                        "offset": {"type": "integer", "minimum": 0, "description": "Number of results to skip (optional)"},
+                        "page_size": {"type": "integer", "minimum": 1, "maximum": MAX_PAGE_SIZE, "description": "Return one keyset page of this size as {rows, next_after} (optional)"},
+                        "after": {"type": "string", "description": "next_after token from the previous page (optional)"},
+                        "fields": self._fields_schema("passengers")
                     }
                 },
                 handler=self._query_passengers
@@ -63,24 +214,49 @@ class UnitedAirlinesDatabaseMCPServer:
                         "departure_location": {"type": "string", "description": "Departure airport code"},
                         "arrival_location": {"type": "string", "description": "Arrival airport code"},
                         "status": {"type": "string", "description": "Flight status (scheduled, delayed, cancelled, etc.)"},
-                        "limit": {"type": "integer", "description": "Maximum number of results to return"}
+                        "limit": {"type": "integer", "minimum": 0, "description": "Maximum number of results to return"},
+                        "offset": {"type": "integer", "minimum": 0, "description": "Number of results to skip (optional)"},
+                        "page_size": {"type": "integer", "minimum": 1, "maximum": MAX_PAGE_SIZE, "description": "Return one keyset page of this size as {rows, next_after} (optional)"},
+                        "after": {"type": "string", "description": "next_after token from the previous page (optional)"},
+                        "fields": self._fields_schema("flights")
                     }
                 },
                 handler=self._query_flights
             ),
+            DatabaseTool(
+                name="search_alternative_flights",
+                description="Find flights on a route departing after a given time with open seats, earliest arrival first, stopping once enough seats cover passenger_count.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "departure_location": {"type": "string", "description": "Origin airport code"},
+                        "arrival_location": {"type": "string", "description": "Destination airport code"},
+                        "departure_after": {"type": "string", "description": "Only flights departing strictly after this time"},
+                        "passenger_count": {"type": "integer", "minimum": 1, "description": "Seats needed; flights are returned until their cumulative seats cover it"},
+                        "exclude_flight_number": {"type": "string", "description": "Flight number to exclude, e.g. the cancelled flight (optional)"},
+                        "fields": self._fields_schema("flights")
+                    },
+                    "required": ["departure_location", "arrival_location", "departure_after", "passenger_count"]
+                },
+                handler=self._search_alternative_flights
+            ),
             DatabaseTool(
                 name="query_crew",
                 description="Query crew with optional filters for assigned_flight, role, base, etc.",
                 input_schema={
                     "type": "object",
                     "properties": {
-                        "assigned_flight": {"type": "string", "description": "Flight number to filter by (use null for unassigned)"},
+                        "assigned_flight": {"type": ["string", "null"], "description": "Flight number to filter by (use null for unassigned)"},
                         "role": {"type": "string", "description": "Crew role to filter by (Pilot, Attendant, etc.)"},
                         "base": {"type": "string", "description": "Crew base to filter by"},
                         "min_rest_hours": {"type": "number", "description": "Minimum rest hours required"},
                         "max_fatigue_score": {"type": "number", "description": "Maximum fatigue score allowed"},
                         "has_duty_assignment": {"type": "boolean", "description": "Filter for crew with duty assignments"},
-                        "limit": {"type": "integer", "description": "Maximum number of results to return"}
+                        "limit": {"type": "integer", "minimum": 0, "description": "Maximum number of results to return"},
+                        "offset": {"type": "integer", "minimum": 0, "description": "Number of results to skip (optional)"},
+                        "page_size": {"type": "integer", "minimum": 1, "maximum": MAX_PAGE_SIZE, "description": "Return one keyset page of this size as {rows, next_after} (optional)"},
+                        "after": {"type": "string", "description": "next_after token from the previous page (optional)"},
+                        "fields": self._fields_schema("crew")
                     }
                 },
                 handler=self._query_crew
@@ -99,6 +275,56 @@ class UnitedAirlinesDatabaseMCPServer:
                 },
                 handler=self._update_passenger_flight
             ),
+            DatabaseTool(
+                name="bulk_reassign_passengers",
+                description="Reassign many passengers in one transaction, moving seat inventory from their current flights to the new ones and rejecting assignments that would oversell.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "assignments": {
+                            "type": "array",
+                            "description": "List of {passenger_id, new_flight, new_departure_time (optional, disambiguates repeated flight numbers), connecting_flights (optional, later legs of a connection whose seats are taken too)}",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "passenger_id": {"type": "string"},
+                                    "new_flight": {"type": "string"},
+                                    "new_departure_time": {"type": "string"},
+                                    "connecting_flights": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "object",
+                                            "properties": {
+                                                "flight_number": {"type": "string"},
+                                                "departure_time": {"type": "string"}
+                                            },
+                                            "required": ["flight_number"]
+                                        }
+                                    }
+                                },
+                                "required": ["passenger_id", "new_flight"]
+                            }
+                        },
+                        "reason": {"type": "string", "description": "Reason for the reassignment (optional)"}
+                    },
+                    "required": ["assignments"]
+                },
+                handler=self._bulk_reassign_passengers
+            ),
+            DatabaseTool(
+                name="update_flight_status",
+                description="Set the status of a flight (e.g. scheduled, delayed, cancelled).",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "flight_number": {"type": "string", "description": "Flight number to update"},
+                        "status": {"type": "string", "description": "New flight status"},
+                        "departure_time": {"type": "string", "description": "Departure time, required when the flight number repeats across dates (optional)"}
+                    },
+                    "required": ["flight_number", "status"]
+                },
+                handler=self._update_flight_status
+            ),
             DatabaseTool(
                 name="get_available_seats",
                 description="Get number of available seats on a specific flight.",
@@ -117,7 +343,8 @@ class UnitedAirlinesDatabaseMCPServer:
                 input_schema={
                     "type": "object",
                     "properties": {
-                        "flight_number": {"type": "string", "description": "Flight number to get details for"}
+                        "flight_number": {"type": "string", "description": "Flight number to get details for"},
+                        "fields": self._fields_schema("flights")
                     },
                     "required": ["flight_number"]
                 },
@@ -161,6 +388,15 @@ class UnitedAirlinesDatabaseMCPServer:
                     "required": ["run_id", "agent_name", "message"]
                 },
                 handler=self._log_message
+            ),
+            DatabaseTool(
+                name="get_server_status",
+                description="Get database server health, storage settings and connection pool utilisation statistics.",
+                input_schema={
+                    "type": "object",
+                    "properties": {}
+                },
+                handler=self._get_server_status
             )
         ]
     
@@ -175,43 +411,395 @@ class UnitedAirlinesDatabaseMCPServer:
             for tool in self.tools
         ]
     
-    def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a specific tool with given parameters."""
-        for tool in self.tools:
-            if tool.name == tool_name:
-                try:
-                    result = tool.handler(parameters)
-                    return {
-                        "success": True,
-                        "tool": tool_name,
-                        "result": result,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                except Exception as e:
-                    logger.error(f"❌ Error executing tool {tool_name}: {e}")
-                    return {
-                        "success": False,
-                        "tool": tool_name,
-                        "error": str(e),
-                        "timestamp": datetime.now().isoformat()
-                    }
+    def execute_tool(self, tool_name: str, parameters: Dict[str, Any], as_dataframe: bool = False) -> Dict[str, Any]:
+        """
+        Execute a specific tool with given parameters.
+        
+        Results are plain Python dicts/lists. In-process callers that want a
+        pandas DataFrame for row results can opt in with as_dataframe=True.
+        """
+        tool = self.registry.get(tool_name)
+        if tool is None:
+            return {
+                "success": False,
+                "tool": tool_name,
+                "error": f"Tool '{tool_name}' not found",
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        start = time.perf_counter()
+        try:
+            self.registry.validate(tool_name, parameters)
+            result = self._call_handler(tool, parameters)
+            if as_dataframe and isinstance(result, list):
+                import pandas as pd
+                result = pd.DataFrame(result)
+            envelope = {
+                "success": True,
+                "tool": tool_name,
+                "result": result,
+                "timestamp": datetime.now().isoformat()
+            }
+        except ToolParameterError as e:
+            logger.warning(f"⚠️ Invalid parameters for tool {tool_name}: {e}")
+            envelope = {
+                "success": False,
+                "tool": tool_name,
+                "error": f"Invalid parameters: {e}",
+                "timestamp": datetime.now().isoformat()
+            }
+        except Exception as e:
+            logger.error(f"❌ Error executing tool {tool_name}: {e}")
+            envelope = {
+                "success": False,
+                "tool": tool_name,
+                "error": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        self.registry.record(tool_name, (time.perf_counter() - start) * 1000, envelope["success"])
+        return envelope
+    
+    def _call_handler(self, tool: DatabaseTool, parameters: Dict[str, Any]) -> Any:
+        """
+        Run a tool handler, serving cacheable per-flight lookups from the query
+        cache and joining identical read calls that are already in flight.
+        """
+        # Reads inside a transactional batch must see the batch's own uncommitted writes
+        if getattr(self._local, "batch_connection", None) is not None:
+            return tool.handler(parameters)
+        
+        cacheable = tool.name in CACHEABLE_TOOLS and self.cache.enabled
+        coalesced = tool.name in COALESCED_TOOLS and self.single_flight is not None
+        if not cacheable and not coalesced:
+            return tool.handler(parameters)
+        
+        key = make_cache_key(tool.name, parameters)
+        if cacheable:
+            found, result = self.cache.lookup(key)
+            if found:
+                return result
+        
+        if coalesced:
+            # Only calls that started after the same committed writes may share an execution
+            if tool.name in CACHEABLE_TOOLS:
+                generation = self.cache.snapshot((_flight_tag(parameters.get("flight_number")),))
+            else:
+                generation = self._write_generation
+            return self.single_flight.do((key, generation), lambda: self._run_and_cache(tool, parameters, key, cacheable))
+        return self._run_and_cache(tool, parameters, key, cacheable)
+    
+    def _run_and_cache(self, tool: DatabaseTool, parameters: Dict[str, Any], key: Any, cacheable: bool) -> Any:
+        if not cacheable:
+            return tool.handler(parameters)
+        
+        tags = (_flight_tag(parameters["flight_number"]),)
+        snapshot = self.cache.snapshot(tags)
+        result = tool.handler(parameters)
+        if result.get("success"):
+            self.cache.put(key, result, tags, snapshot)
+        return result
+    
+    def _invalidate_flights_on_commit(self, flight_numbers: Iterable[Optional[str]]):
+        """Queue cache invalidation for flights written by the current transaction."""
+        pending = getattr(self._local, "pending_invalidations", None)
+        if pending is None:
+            pending = self._local.pending_invalidations = set()
+        pending.update(_flight_tag(number) for number in flight_numbers if number)
+    
+    def _finish_invalidations(self, committed: bool):
+        """Apply queued invalidations once the transaction has committed; drop them on rollback."""
+        pending = getattr(self._local, "pending_invalidations", None)
+        self._local.pending_invalidations = None
+        if not committed:
+            return
+        if pending:
+            self.cache.invalidate(pending)
+        with self._write_generation_lock:
+            self._write_generation += 1
+    
+    @staticmethod
+    def _call_failed(result: Dict[str, Any]) -> bool:
+        """A batch call failed: the envelope says so, or the handler returned {"success": False, ...}."""
+        return not result["success"] or (isinstance(result.get("result"), dict) and result["result"].get("success") is False)
+    
+    def execute_batch(self, calls: List[Dict[str, Any]], transactional: bool = False) -> Dict[str, Any]:
+        """
+        Execute several tool calls in one request.
+        
+        Args:
+            calls: List of {"tool": <tool name>, "parameters": {...}} dictionaries
+            transactional: Run every call on one connection inside a single
+                transaction. The first failed call (invalid call, error, or a
+                handler result with success False) rolls the whole batch back
+                and the remaining calls are skipped.
+            
+        Returns:
+            Dictionary with per-call results in request order
+        """
+        if len(calls) > MAX_BATCH_SIZE:
+            return {
+                "success": False,
+                "error": f"Batch of {len(calls)} calls exceeds the limit of {MAX_BATCH_SIZE}",
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        if not transactional:
+            results = [self.execute_tool(call.get("tool"), call.get("parameters") or {}) for call in calls]
+            return {
+                "success": not any(self._call_failed(result) for result in results),
+                "transactional": False,
+                "count": len(results),
+                "results": results,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        results = []
+        committed = False
+        with self.pool.connection() as conn:
+            self._local.batch_connection = conn
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for call in calls:
+                    result = self.execute_tool(call.get("tool"), call.get("parameters") or {})
+                    results.append(result)
+                    if self._call_failed(result):
+                        break
+                
+                if len(results) == len(calls) and not any(self._call_failed(result) for result in results):
+                    conn.commit()
+                    committed = True
+                else:
+                    conn.rollback()
+            except Exception as e:
+                conn.rollback()
+                committed = False
+                logger.error(f"❌ Transactional batch failed: {e}")
+                results.append({
+                    "success": False,
+                    "error": str(e),
+                    "timestamp": datetime.now().isoformat()
+                })
+            finally:
+                self._local.batch_connection = None
+                self._finish_invalidations(committed)
+        
+        for call in calls[len(results):]:
+            results.append({
+                "success": False,
+                "tool": call.get("tool"),
+                "error": "Skipped: batch transaction rolled back",
+                "timestamp": datetime.now().isoformat()
+            })
+        
+        if committed:
+            logger.info(f"📦 Committed transactional batch of {len(calls)} calls")
+        else:
+            logger.warning(f"⚠️ Rolled back transactional batch of {len(calls)} calls")
         
         return {
-            "success": False,
-            "tool": tool_name,
-            "error": f"Tool '{tool_name}' not found",
+            "success": committed,
+            "transactional": True,
+            "committed": committed,
+            "count": len(calls),
+            "results": results[:len(calls)],
             "timestamp": datetime.now().isoformat()
         }
     
-    def _get_connection(self):
-        """Get database connection."""
-        return sqlite3.connect(self.db_path)
+    def _initialize_connection(self, conn: sqlite3.Connection):
+        """One-time setup for every connection the pool opens."""
+        self.storage_config.apply(conn)
+    
+    def _apply_migrations(self):
+        """Bring the database schema (keys and indexes) up to the latest version."""
+        with self._connection() as conn:
+            applied = apply_migrations(conn)
+            if applied:
+                logger.info(f"🧱 Applied schema migrations {applied} (schema version {get_schema_version(conn)})")
+    
+    def _read_table_columns(self) -> Dict[str, List[str]]:
+        """Read the column names of the tables the query tools project from."""
+        with self._connection() as conn:
+            return {
+                table: [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+                for table in PROJECTABLE_TABLES
+            }
+    
+    def _fields_schema(self, table: str) -> Dict[str, Any]:
+        """Input schema for a `fields` projection over one table's columns."""
+        return {
+            "type": "array",
+            "items": {"type": "string", "enum": self.table_columns[table]},
+            "description": f"Only return these {table} columns (optional, default all)"
+        }
+    
+    def _select_list(self, table: str, params: Dict[str, Any], required: Tuple[str, ...] = ()) -> str:
+        """SQL column list for the requested `fields`, plus any columns the query itself needs."""
+        fields = params.get("fields")
+        if not fields:
+            return "*"
+        unknown = [field for field in fields if field not in self.table_columns[table]]
+        if unknown:
+            raise ToolParameterError(f"Unknown {table} field(s): {', '.join(unknown)}")
+        columns = list(dict.fromkeys(list(fields) + list(required)))
+        return ", ".join(f'"{column}"' for column in columns)
+    
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection from the pool for the duration of the block.
+        
+        Inside a transactional batch every tool shares the batch's connection.
+        """
+        batch_connection = getattr(self._local, "batch_connection", None)
+        if batch_connection is not None:
+            yield batch_connection
+            return
+        
+        with self.pool.connection() as conn:
+            yield conn
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Connection for a write: commits on success and rolls back on error.
+        
+        Inside a transactional batch the write joins the batch transaction and
+        is committed (or rolled back) together with the rest of the batch.
+        """
+        if getattr(self._local, "batch_connection", None) is not None:
+            with self._connection() as conn:
+                yield conn
+            return
+        
+        with self._connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self._finish_invalidations(committed=False)
+                raise
+        self._finish_invalidations(committed=True)
+    
+    def close(self):
+        """Write out queued agent log rows and release all pooled database connections."""
+        self.log_writer.close()
+        self.pool.close()
+    
+    def _get_server_status(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Get server health, storage settings and connection pool statistics."""
+        with self._connection() as conn:
+            storage = read_effective_settings(conn)
+            schema_version = get_schema_version(conn)
+        
+        return {
+            "success": True,
+            "db_path": self.db_path,
+            "schema_version": schema_version,
+            "tool_count": len(self.tools),
+            "storage": storage,
+            "connection_pool": self.pool.get_stats(),
+            "tool_metrics": self.registry.get_metrics(),
+            "query_cache": self.cache.get_stats(),
+            "single_flight": self.single_flight.get_stats() if self.single_flight is not None else {"enabled": False},
+            "log_writer": self.log_writer.get_stats()
+        }
+    
+    def _fetch_page(self, conn: sqlite3.Connection, tool_name: str, table: str, query: str,
+                    query_params: List[Any], params: Dict[str, Any]) -> Any:
+        """
+        Run a filtered query_* statement (`query` is the FROM/WHERE part).
+        
+        Without page_size/after the whole (LIMIT/OFFSET bounded) result is
+        returned as a list. With them, one page ordered by the table key is
+        returned as {rows, next_after, page_size}; pass next_after back as
+        `after` to continue from the last row without rescanning earlier pages.
+        """
+        if "page_size" not in params and "after" not in params:
+            limit_clause, limit_params = _limit_clause(params)
+            select = f"SELECT {self._select_list(table, params)} "
+            return _fetch_all(conn, select + query + limit_clause, query_params + limit_params)
+        
+        if "limit" in params or "offset" in params:
+            raise ToolParameterError("use either limit/offset or page_size/after, not both")
+        
+        key_columns = PAGINATION_KEYS[tool_name]
+        key_list = ", ".join(key_columns)
+        page_size = params.get("page_size", DEFAULT_PAGE_SIZE)
+        query = f"SELECT {self._select_list(table, params, required=key_columns)} " + query
+        query_params = list(query_params)
+        
+        if params.get("after"):
+            query += f" AND ({key_list}) > ({', '.join('?' * len(key_columns))})"
+            query_params.extend(_decode_after(params["after"], len(key_columns)))
+        
+        # Fetch one extra row to learn whether another page exists
+        query += f" ORDER BY {key_list} LIMIT ?"
+        rows = _fetch_all(conn, query, query_params + [page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_after = _encode_after([rows[-1][column] for column in key_columns]) if has_more else None
+        
+        # Key columns were only selected to build the cursor
+        hidden = [column for column in key_columns if params.get("fields") and column not in params["fields"]]
+        for row in rows:
+            for column in hidden:
+                del row[column]
+        
+        return {
+            "rows": rows,
+            "next_after": next_after,
+            "page_size": page_size
+        }
+    
+    def stream_tool(self, tool_name: str, parameters: Dict[str, Any], page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every row of a query_* tool, one keyset page at a time.
+        
+        Parameters are validated up front; rows are then produced lazily and a
+        pooled connection is held only while each page is read, never while the
+        caller consumes rows. `limit` caps the total number of rows streamed.
+        
+        Raises:
+            ValueError: If the tool cannot be streamed or the parameters are invalid
+        """
+        if tool_name not in PAGINATION_KEYS:
+            raise ValueError(f"Tool '{tool_name}' does not support streaming")
+        self.registry.validate(tool_name, parameters)
+        if "offset" in parameters:
+            raise ToolParameterError("offset is not supported when streaming")
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ToolParameterError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+        
+        return self._stream_pages(tool_name, parameters, page_size)
+    
+    def _stream_pages(self, tool_name: str, parameters: Dict[str, Any], page_size: int) -> Iterator[Dict[str, Any]]:
+        handler = self.registry.get(tool_name).handler
+        filters = {key: value for key, value in parameters.items() if key not in ("limit", "page_size", "after")}
+        remaining = parameters.get("limit")
+        after = None
+        
+        while remaining is None or remaining > 0:
+            page_params = dict(filters, page_size=page_size if remaining is None else min(page_size, remaining))
+            if after:
+                page_params["after"] = after
+            
+            start = time.perf_counter()
+            page = handler(page_params)
+            self.registry.record(tool_name, (time.perf_counter() - start) * 1000, True)
+            
+            yield from page["rows"]
+            if remaining is not None:
+                remaining -= len(page["rows"])
+            after = page["next_after"]
+            if not after:
+                break
     
     def _query_passengers(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Query passengers with optional filters."""
-        conn = self._get_connection()
-        try:
-            query = "SELECT * FROM passengers WHERE 1=1"
+        with self._connection() as conn:
+            query = "FROM passengers WHERE 1=1"
             query_params = []
             
             if "flight_number" in params:
@@ -222,23 +810,15 @@ class UnitedAirlinesDatabaseMCPServer:
                 query += " AND loyalty_tier = ?"
                 query_params.append(params["loyalty_tier"])
             
-            if "limit" in params:
-                query += f" LIMIT {params['limit']}"
-            
-            df = pd.read_sql_query(query, conn, params=query_params)
-            result = df.to_dict('records')
+            result = self._fetch_page(conn, "query_passengers", "passengers", query, query_params, params)
             
-            logger.info(f"📊 Query passengers: {len(result)} results")
+            logger.info(f"📊 Query passengers: {_row_count(result)} results")
             return result
-            
-        finally:
-            conn.close()
     
     def _query_flights(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Query flights with optional filters."""
-        conn = self._get_connection()
-        try:
-            query = "SELECT * FROM flights WHERE 1=1"
+        with self._connection() as conn:
+            query = "FROM flights WHERE 1=1"
             query_params = []
             
             if "departure_location" in params:
@@ -253,23 +833,51 @@ class UnitedAirlinesDatabaseMCPServer:
                 query += " AND status = ?"
                 query_params.append(params["status"])
             
-            if "limit" in params:
-                query += f" LIMIT {params['limit']}"
-            
-            df = pd.read_sql_query(query, conn, params=query_params)
-            result = df.to_dict('records')
+            result = self._fetch_page(conn, "query_flights", "flights", query, query_params, params)
             
-            logger.info(f"✈️ Query flights: {len(result)} results")
+            logger.info(f"✈️ Query flights: {_row_count(result)} results")
             return result
+    
+    def _search_alternative_flights(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Search alternative flights with filtering, ordering and the seat cutoff done in SQL."""
+        with self._connection() as conn:
+            # seats_before is the seat total of the flights ranked ahead of each row;
+            # a flight is needed while that total is still short of passenger_count
+            query = f"""
+                SELECT {self._select_list("flights", params)} FROM (
+                    SELECT *,
+                           COALESCE(SUM(available_seats) OVER (
+                               ORDER BY arrival_time, departure_time, flight_number
+                               ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                           ), 0) AS seats_before
+                    FROM flights
+                    WHERE departure_location = ?
+                      AND arrival_location = ?
+                      AND departure_time > ?
+                      AND flight_number != ?
+                      AND status != 'cancelled'
+                      AND available_seats > 0
+                )
+                WHERE seats_before < ?
+                ORDER BY arrival_time, departure_time, flight_number
+            """
+            rows = _fetch_all(conn, query, (
+                params["departure_location"],
+                params["arrival_location"],
+                params["departure_after"],
+                params.get("exclude_flight_number") or "",
+                int(params["passenger_count"])
+            ))
+            for row in rows:
+                row.pop("seats_before", None)
             
-        finally:
-            conn.close()
+            logger.info(f"🔎 Alternative flights {params['departure_location']}->{params['arrival_location']}: {len(rows)} flights")
+            return rows
     
     def _query_crew(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Query crew with optional filters."""
-        conn = self._get_connection()
-        try:
-            query = "SELECT * FROM crew WHERE 1=1"
+        with self._connection() as conn:
+            query = "FROM crew WHERE 1=1"
             query_params = []
             
             if "assigned_flight" in params:
@@ -302,26 +910,22 @@ class UnitedAirlinesDatabaseMCPServer:
                 else:
                     query += " AND (duty_start IS NULL OR duty_end IS NULL)"
             
-            if "limit" in params:
-                query += f" LIMIT {params['limit']}"
-            
-            df = pd.read_sql_query(query, conn, params=query_params)
-            result = df.to_dict('records')
+            result = self._fetch_page(conn, "query_crew", "crew", query, query_params, params)
             
-            logger.info(f"👩‍💼 Query crew: {len(result)} results")
+            logger.info(f"👩‍💼 Query crew: {_row_count(result)} results")
             return result
-            
-        finally:
-            conn.close()
     
     def _update_passenger_flight(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Update a passenger's flight assignment."""
-        conn = self._get_connection()
-        try:
+        with self._transaction() as conn:
             passenger_id = params["passenger_id"]
             new_flight = params["new_flight"]
             reason = params.get("reason", "No reason provided")
             
+            previous = conn.execute(
+                "SELECT flight_number FROM passengers WHERE passenger_id = ?", (passenger_id,)
+            ).fetchone()
+            
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE passengers SET flight_number = ? WHERE passenger_id = ?",
@@ -329,7 +933,8 @@ class UnitedAirlinesDatabaseMCPServer:
             )
             
             if cursor.rowcount > 0:
-                conn.commit()
+                # Passenger counts change on both the old and the new flight
+                self._invalidate_flights_on_commit([previous[0] if previous else None, new_flight])
                 logger.info(f"✅ Updated passenger {passenger_id} to flight {new_flight}")
                 return {
                     "success": True,
@@ -346,28 +951,200 @@ class UnitedAirlinesDatabaseMCPServer:
                     "error": "Passenger not found",
                     "rows_affected": 0
                 }
+    
+    def _bulk_reassign_passengers(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reassign passengers in bulk with seat-inventory accounting.
+
+        A connection's later legs (connecting_flights) are not stored on the
+        passenger, but their seats are taken in the same transaction; the
+        passenger is rejected unless every leg has a seat.
+        """
+        assignments = params["assignments"]
+        reason = params.get("reason", "No reason provided")
+        if len(assignments) > MAX_BATCH_SIZE:
+            raise ValueError(f"{len(assignments)} assignments exceed the limit of {MAX_BATCH_SIZE}")
+        
+        with self._transaction() as conn:
+            # Take the write lock before reading inventory so the seat check and
+            # the decrement are atomic with respect to other writers
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            
+            passenger_ids = list({item["passenger_id"] for item in assignments})
+            current_flight = {}
+            for chunk in _chunks(passenger_ids):
+                placeholders = ", ".join("?" * len(chunk))
+                current_flight.update(conn.execute(
+                    f"SELECT passenger_id, flight_number FROM passengers WHERE passenger_id IN ({placeholders})", chunk
+                ).fetchall())
+            
+            # Flight numbers repeat across dates, so inventory is tracked per flights rowid
+            leg_numbers = {leg["flight_number"] for item in assignments for leg in item.get("connecting_flights") or []}
+            flight_numbers = list({item["new_flight"] for item in assignments} | set(current_flight.values()) | leg_numbers)
+            flight_numbers = [number for number in flight_numbers if number and not _is_untracked_flight(number)]
+            departures = {}
+            seats = {}
+            for chunk in _chunks(flight_numbers):
+                placeholders = ", ".join("?" * len(chunk))
+                for rowid, number, departure_time, available in conn.execute(
+                    f"SELECT rowid, flight_number, departure_time, available_seats FROM flights WHERE flight_number IN ({placeholders})", chunk
+                ):
+                    departures.setdefault(number, []).append((rowid, departure_time))
+                    seats[rowid] = available or 0
+            
+            passenger_updates = []
+            seat_deltas: Dict[int, int] = {}
+            rejected = []
+            unchanged = 0
+            touched_flights = set()
+            
+            def resolve(flight_number: str, departure_time: Optional[str]):
+                """(flights rowid, None) for a departure, or (None, rejection reason)."""
+                candidates = departures.get(flight_number, [])
+                if departure_time:
+                    candidates = [c for c in candidates if c[1] == str(departure_time)]
+                if not candidates:
+                    return None, "Flight not found"
+                if len(candidates) > 1:
+                    return None, "Ambiguous flight number; new_departure_time required"
+                return candidates[0][0], None
+            
+            for item in assignments:
+                passenger_id = item["passenger_id"]
+                new_flight = item["new_flight"]
+                if passenger_id not in current_flight:
+                    rejected.append({"passenger_id": passenger_id, "new_flight": new_flight, "reason": "Passenger not found"})
+                    continue
+                
+                source_flight = current_flight[passenger_id]
+                if source_flight == new_flight:
+                    unchanged += 1
+                    continue
                 
-        finally:
-            conn.close()
+                if not _is_untracked_flight(new_flight):
+                    target_rowid, reason = resolve(new_flight, item.get("new_departure_time"))
+                    if reason:
+                        rejected.append({"passenger_id": passenger_id, "new_flight": new_flight, "reason": reason})
+                        continue
+                    if seats[target_rowid] < 1:
+                        rejected.append({"passenger_id": passenger_id, "new_flight": new_flight, "reason": "No seats available"})
+                        continue
+                    
+                    leg_rowids = []
+                    for leg in item.get("connecting_flights") or []:
+                        leg_rowid, reason = resolve(leg["flight_number"], leg.get("departure_time"))
+                        if reason is None and seats[leg_rowid] < 1:
+                            reason = "No seats available"
+                        if reason:
+                            reason = f"{reason} on connecting flight {leg['flight_number']}"
+                            break
+                        leg_rowids.append(leg_rowid)
+                    if reason:
+                        rejected.append({"passenger_id": passenger_id, "new_flight": new_flight, "reason": reason})
+                        continue
+                    
+                    for rowid in [target_rowid] + leg_rowids:
+                        seats[rowid] -= 1
+                        seat_deltas[rowid] = seat_deltas.get(rowid, 0) - 1
+                    touched_flights.update(leg["flight_number"] for leg in item.get("connecting_flights") or [])
+                
+                # Only release the old seat when the source flight resolves to a single departure
+                source = departures.get(source_flight, [])
+                if len(source) == 1:
+                    source_rowid = source[0][0]
+                    seats[source_rowid] += 1
+                    seat_deltas[source_rowid] = seat_deltas.get(source_rowid, 0) + 1
+                
+                touched_flights.update((source_flight, new_flight))
+                current_flight[passenger_id] = new_flight
+                passenger_updates.append((new_flight, passenger_id))
+            
+            conn.executemany("UPDATE passengers SET flight_number = ? WHERE passenger_id = ?", passenger_updates)
+            self._invalidate_flights_on_commit(touched_flights)
+            changed = [(delta, rowid) for rowid, delta in seat_deltas.items() if delta]
+            conn.executemany("UPDATE flights SET available_seats = available_seats + ? WHERE rowid = ?", changed)
+            
+            flights_by_rowid = {rowid: (number, departure_time)
+                                for number, rows in departures.items() for rowid, departure_time in rows}
+            seat_changes = [
+                {
+                    "flight_number": flights_by_rowid[rowid][0],
+                    "departure_time": flights_by_rowid[rowid][1],
+                    "delta": delta,
+                    "available_seats": seats[rowid]
+                }
+                for delta, rowid in changed
+            ]
+        
+        logger.info(f"✅ Reassigned {len(passenger_updates)} passengers ({len(rejected)} rejected): {reason}")
+        return {
+            "success": True,
+            "requested": len(assignments),
+            "reassigned": len(passenger_updates),
+            "unchanged": unchanged,
+            "rejected_count": len(rejected),
+            "rejected": rejected,
+            "seat_changes": seat_changes,
+            "reason": reason
+        }
+    
+    def _update_flight_status(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Update the status of a flight."""
+        flight_number = params["flight_number"]
+        status = params["status"]
+        
+        with self._transaction() as conn:
+            query = "UPDATE flights SET status = ? WHERE flight_number = ?"
+            query_params = [status, flight_number]
+            if params.get("departure_time"):
+                query += " AND departure_time = ?"
+                query_params.append(params["departure_time"])
+            else:
+                departures = conn.execute("SELECT COUNT(*) FROM flights WHERE flight_number = ?", (flight_number,)).fetchone()[0]
+                if departures > 1:
+                    return {
+                        "success": False,
+                        "flight_number": flight_number,
+                        "error": "Ambiguous flight number; departure_time required",
+                        "rows_affected": 0
+                    }
+            
+            cursor = conn.execute(query, query_params)
+            if cursor.rowcount == 0:
+                return {
+                    "success": False,
+                    "flight_number": flight_number,
+                    "error": "Flight not found",
+                    "rows_affected": 0
+                }
+            self._invalidate_flights_on_commit([flight_number])
+        
+        logger.info(f"🛫 Flight {flight_number} status set to {status}")
+        return {
+            "success": True,
+            "flight_number": flight_number,
+            "status": status,
+            "rows_affected": cursor.rowcount
+        }
     
     def _get_available_seats(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Get number of available seats on a specific flight."""
-        conn = self._get_connection()
-        try:
+        with self._connection() as conn:
             flight_number = params["flight_number"]
             
             # Get flight details
             flight_query = "SELECT available_seats FROM flights WHERE flight_number = ?"
-            flight_df = pd.read_sql_query(flight_query, conn, params=[flight_number])
+            row = conn.execute(flight_query, (flight_number,)).fetchone()
             
-            if len(flight_df) == 0:
+            if row is None:
                 return {
                     "success": False,
                     "flight_number": flight_number,
                     "error": "Flight not found"
                 }
             
-            available_seats = flight_df.iloc[0]['available_seats']
+            available_seats = row[0]
             
             logger.info(f"💺 Flight {flight_number}: {available_seats} available seats")
             return {
@@ -375,48 +1152,36 @@ class UnitedAirlinesDatabaseMCPServer:
                 "flight_number": flight_number,
                 "available_seats": int(available_seats)
             }
-            
-        finally:
-            conn.close()
     
     def _get_flight_details(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Get detailed information about a specific flight."""
-        conn = self._get_connection()
-        try:
+        with self._connection() as conn:
             flight_number = params["flight_number"]
             
-            query = "SELECT * FROM flights WHERE flight_number = ?"
-            df = pd.read_sql_query(query, conn, params=[flight_number])
+            query = f"SELECT {self._select_list('flights', params)} FROM flights WHERE flight_number = ?"
+            flight_details = _fetch_one(conn, query, (flight_number,))
             
-            if len(df) == 0:
+            if flight_details is None:
                 return {
                     "success": False,
                     "flight_number": flight_number,
                     "error": "Flight not found"
                 }
             
-            flight_details = df.iloc[0].to_dict()
-            
             logger.info(f"✈️ Retrieved details for flight {flight_number}")
             return {
                 "success": True,
                 "flight_number": flight_number,
                 "details": flight_details
             }
-            
-        finally:
-            conn.close()
     
     def _get_passenger_count(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Get the number of passengers on a specific flight."""
-        conn = self._get_connection()
-        try:
+        with self._connection() as conn:
             flight_number = params["flight_number"]
             
             query = "SELECT COUNT(*) as passenger_count FROM passengers WHERE flight_number = ?"
-            df = pd.read_sql_query(query, conn, params=[flight_number])
-            
-            passenger_count = df.iloc[0]['passenger_count']
+            passenger_count = conn.execute(query, (flight_number,)).fetchone()[0]
             
             logger.info(f"👥 Flight {flight_number}: {passenger_count} passengers")
             return {
@@ -424,73 +1189,46 @@ class UnitedAirlinesDatabaseMCPServer:
                 "flight_number": flight_number,
                 "passenger_count": int(passenger_count)
             }
-            
-        finally:
-            conn.close()
     
     def _read_messages(self, params: Dict[str, Any]) -> str:
         """Read agent messages from the agent_logs table for a given run_id."""
-        conn = self._get_connection()
-        try:
+        # Read-your-writes: make sure rows still queued in the log writer are committed. Not inside a
+        # transactional batch: the batch holds the write lock the writer would wait on, and its own
+        # log_message rows are already on the batch connection
+        if getattr(self._local, "batch_connection", None) is None:
+            self.log_writer.flush()
+        
+        with self._connection() as conn:
             run_id = params["run_id"]
             
-            # Create table if it doesn't exist
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS agent_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT DEFAULT (DATETIME('now')),
-                    run_id TEXT,
-                    agent_name TEXT,
-                    message TEXT,
-                    context TEXT
-                )
-            """)
-            
-            cursor.execute("""
+            rows = conn.execute("""
                 SELECT timestamp, agent_name, message
                 FROM agent_logs
                 WHERE run_id = ?
-                ORDER BY timestamp ASC
-            """, (run_id,))
-            rows = cursor.fetchall()
+                ORDER BY timestamp ASC, id ASC
+            """, (run_id,)).fetchall()
             
             if not rows:
                 return f"No messages found in database for run_id: {run_id}"
             
             return "\n".join(f"{ts} | {agent}: {msg}" for ts, agent, msg in rows)
-            
-        finally:
-            conn.close()
     
     def _log_message(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Log a message from an agent to the agent_logs table."""
-        conn = self._get_connection()
+        """Queue a message from an agent for the agent_logs table (written directly inside a transactional batch)."""
         try:
-            run_id = params["run_id"]
             agent_name = params["agent_name"]
-            message = params["message"]
-            context = params.get("context", "{}")
-            
-            # Create table if it doesn't exist
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS agent_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT DEFAULT (DATETIME('now')),
-                    run_id TEXT,
-                    agent_name TEXT,
-                    message TEXT,
-                    context TEXT
+            batch_connection = getattr(self._local, "batch_connection", None)
+            if batch_connection is not None:
+                # Commits or rolls back with the rest of the batch
+                batch_connection.execute(INSERT_LOG_ROW, log_row(params["run_id"], agent_name, params["message"],
+                                                                 params.get("context", "{}")))
+            else:
+                self.log_writer.write(
+                    run_id=params["run_id"],
+                    agent_name=agent_name,
+                    message=params["message"],
+                    context=params.get("context", "{}")
                 )
-            """)
-            
-            cursor.execute("""
-                INSERT INTO agent_logs (run_id, agent_name, message, context)
-                VALUES (?, ?, ?, ?)
-            """, (run_id, agent_name, message, context))
-            
-            conn.commit()
             
             logger.info(f"📝 Logged message for {agent_name}")
             return {
@@ -504,17 +1242,17 @@ class UnitedAirlinesDatabaseMCPServer:
                 "success": False,
                 "error": str(e)
             }
-        finally:
-            conn.close()
 
 # Global instance
 _database_mcp_server = None
+_database_mcp_server_lock = threading.Lock()
 
 def get_database_mcp_server() -> UnitedAirlinesDatabaseMCPServer:
-    """Get the global database MCP server instance."""
+    """Get the global database MCP server instance (configured from DATABASE_* settings)."""
     global _database_mcp_server
-    if _database_mcp_server is None:
-        _database_mcp_server = UnitedAirlinesDatabaseMCPServer()
+    with _database_mcp_server_lock:
+        if _database_mcp_server is None:
+            _database_mcp_server = UnitedAirlinesDatabaseMCPServer.from_env()
     return _database_mcp_server
 
 def test_database_mcp_server():
@@ -550,6 +1288,13 @@ def test_database_mcp_server():
     result = server.execute_tool("get_passenger_count", {"flight_number": "UA70161"})
     print(f"  Get passenger count result: {result}")
     
+    # Test 6: Server status
+    print("\n📊 Testing get_server_status tool:")
+    result = server.execute_tool("get_server_status", {})
+    print(f"  Connection pool: {result['result']['connection_pool']}")
+    
+    server.close()
+    
     print("\nExample tool calls:")
     print("  - Query passengers on flight: {'flight_number': 'UA70161', 'limit': 10}")
     print("  - Get flight details: {'flight_number': 'UA70161'}")
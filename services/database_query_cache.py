@@ -0,0 +1,147 @@
+"""
+Database Query Cache
+
+In-process LRU/TTL cache for the database MCP server's hot per-flight lookups
+(get_flight_details, get_available_seats, get_passenger_count).
+
+Entries are tagged with the flights they describe. Writers invalidate tags
+after their transaction commits, and each tag carries a generation counter so
+a read that started before an invalidation can never store its stale result.
+"""
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+_MISSING = object()
+
+def make_cache_key(tool_name: str, parameters: Dict[str, Any]) -> Tuple[str, str]:
+    """Key a tool call by its name and order-independent (normalised) parameters."""
+    return tool_name, json.dumps(parameters, sort_keys=True, separators=(",", ":"), default=str)
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and tag-based invalidation.
+
+    max_entries: least recently used entries are evicted beyond this size (0 disables the cache).
+    ttl_seconds: entries older than this are treated as misses.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0):
+        if max_entries < 0 or ttl_seconds < 0:
+            raise ValueError("max_entries and ttl_seconds must be non-negative")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, set] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "stale_puts_skipped": 0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value). The value is a deep copy so callers may mutate it."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats["misses"] += 1
+                return False, None
+
+            expires_at, value, tags = entry
+            if expires_at < time.monotonic():
+                self._remove(key, tags)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return True, copy.deepcopy(value)
+
+    def snapshot(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """Generation of each tag, taken before reading the value that will be cached."""
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def put(self, key: Hashable, value: Any, tags: Iterable[str], snapshot: Optional[Tuple[int, ...]] = None):
+        """
+        Store a value under `tags`. If `snapshot` is given and any tag was
+        invalidated since it was taken, the (possibly stale) value is dropped.
+        """
+        if not self.enabled:
+            return
+        tags = tuple(tags)
+        value = copy.deepcopy(value)
+
+        with self._lock:
+            if snapshot is not None and snapshot != tuple(self._generations.get(tag, 0) for tag in tags):
+                self._stats["stale_puts_skipped"] += 1
+                return
+
+            if key in self._entries:
+                self._remove(key, self._entries[key][2])
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key, (_, _, oldest_tags) = next(iter(self._entries.items()))
+                self._remove(oldest_key, oldest_tags)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """Drop every entry carrying any of `tags`; returns the number of entries removed."""
+        removed = 0
+        with self._lock:
+            for tag in set(tags):
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._remove(key, entry[2])
+                        removed += 1
+            self._stats["invalidations"] += removed
+        return removed
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            for tag in self._keys_by_tag:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters and current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl_seconds
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _remove(self, key: Hashable, tags: Tuple[str, ...]):
+        del self._entries[key]
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
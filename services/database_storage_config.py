@@ -0,0 +1,112 @@
+"""
+SQLite Storage Configuration
+
+Storage-level settings applied to every connection the database MCP server
+opens. The defaults put united_ops.db in WAL mode so that passenger updates and
+agent log writes no longer block the readers coming through the HTTP server.
+"""
+
+import os
+import sqlite3
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, Any
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TEMP_STORE_MODES = {"DEFAULT", "FILE", "MEMORY"}
+
+@dataclass(frozen=True)
+class StorageConfig:
+    """
+    PRAGMA settings for a SQLite connection.
+
+    journal_mode: WAL lets readers proceed while a writer commits.
+    synchronous: NORMAL is durable across application crashes in WAL mode and
+        only skips the fsync on every commit.
+    cache_size_kib: page cache per connection, in KiB.
+    mmap_size_bytes: memory-mapped I/O window (0 disables mmap).
+    busy_timeout_ms: how long a writer waits for a lock before SQLITE_BUSY.
+    temp_store: where temporary B-trees for sorts and indices live.
+    """
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size_kib: int = 64 * 1024
+    mmap_size_bytes: int = 256 * 1024 * 1024
+    busy_timeout_ms: int = 5000
+    temp_store: str = "MEMORY"
+
+    def __post_init__(self):
+        if self.journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"Unsupported journal_mode: {self.journal_mode}")
+        if self.synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Unsupported synchronous mode: {self.synchronous}")
+        if self.temp_store.upper() not in TEMP_STORE_MODES:
+            raise ValueError(f"Unsupported temp_store: {self.temp_store}")
+        if self.cache_size_kib < 0 or self.mmap_size_bytes < 0 or self.busy_timeout_ms < 0:
+            raise ValueError("cache_size_kib, mmap_size_bytes and busy_timeout_ms must be non-negative")
+
+    @classmethod
+    def legacy(cls) -> "StorageConfig":
+        """SQLite's out-of-the-box settings (rollback journal), used as the benchmark baseline."""
+        return cls(
+            journal_mode="DELETE",
+            synchronous="FULL",
+            cache_size_kib=2000,
+            mmap_size_bytes=0,
+            busy_timeout_ms=5000,
+            temp_store="DEFAULT"
+        )
+
+    @classmethod
+    def from_env(cls) -> "StorageConfig":
+        """Build a config from DATABASE_* environment variables, falling back to the defaults."""
+        defaults = cls()
+        return cls(
+            journal_mode=os.getenv("DATABASE_JOURNAL_MODE", defaults.journal_mode),
+            synchronous=os.getenv("DATABASE_SYNCHRONOUS", defaults.synchronous),
+            cache_size_kib=int(os.getenv("DATABASE_CACHE_SIZE_KIB", defaults.cache_size_kib)),
+            mmap_size_bytes=int(os.getenv("DATABASE_MMAP_SIZE_BYTES", defaults.mmap_size_bytes)),
+            busy_timeout_ms=int(os.getenv("DATABASE_BUSY_TIMEOUT_MS", defaults.busy_timeout_ms)),
+            temp_store=os.getenv("DATABASE_TEMP_STORE", defaults.temp_store)
+        )
+
+    def apply(self, conn: sqlite3.Connection):
+        """Apply the settings to a freshly opened connection."""
+        # busy_timeout first so that switching the journal mode can wait out other connections
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+
+        journal_mode = conn.execute(f"PRAGMA journal_mode = {self.journal_mode.upper()}").fetchone()[0]
+        if journal_mode.upper() != self.journal_mode.upper():
+            # In-memory databases, for example, cannot use WAL
+            logger.warning(f"⚠️ Requested journal_mode {self.journal_mode}, SQLite is using {journal_mode}")
+
+        conn.execute(f"PRAGMA synchronous = {self.synchronous.upper()}")
+        # A negative cache_size is interpreted by SQLite as KiB rather than pages
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size_bytes)}")
+        conn.execute(f"PRAGMA temp_store = {self.temp_store.upper()}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the configured settings as a dictionary."""
+        return asdict(self)
+
+def read_effective_settings(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Read back the PRAGMA values SQLite is actually using on a connection."""
+    synchronous_names = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+    temp_store_names = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+
+    cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+    return {
+        "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0].upper(),
+        "synchronous": synchronous_names.get(conn.execute("PRAGMA synchronous").fetchone()[0]),
+        "cache_size_kib": -cache_size if cache_size < 0 else None,
+        "cache_size_pages": cache_size if cache_size >= 0 else None,
+        "mmap_size_bytes": conn.execute("PRAGMA mmap_size").fetchone()[0],
+        "busy_timeout_ms": conn.execute("PRAGMA busy_timeout").fetchone()[0],
+        "temp_store": temp_store_names.get(conn.execute("PRAGMA temp_store").fetchone()[0])
+    }
@@ -0,0 +1,151 @@
+"""
+Database Tool Registry
+
+Name-to-tool dispatch for the database MCP server. Each tool's input_schema is
+compiled into a validator once, when the registry is built, and every call is
+counted and timed so the server status shows which tools dominate.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# JSON Schema type names mapped to the Python types they accept
+_JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+    "null": (type(None),)
+}
+
+class ToolParameterError(ValueError):
+    """Raised when tool parameters do not match the tool's input_schema."""
+
+def _type_check(types: List[str]) -> Callable[[Any], bool]:
+    accepted = tuple(python_type for name in types for python_type in _JSON_TYPES[name])
+    numeric = "integer" in types or "number" in types
+
+    def check(value: Any) -> bool:
+        # bool is a subclass of int, but true/false is not a number in JSON Schema
+        if isinstance(value, bool) and numeric and "boolean" not in types:
+            return False
+        return isinstance(value, accepted)
+    return check
+
+def compile_validator(schema: Dict[str, Any], path: str = "parameters") -> Callable[[Any], None]:
+    """
+    Compile the subset of JSON Schema used by the tool definitions (type,
+    properties, required, items, enum, minimum, maximum) into a validator
+    that raises ToolParameterError on the first mismatch.
+    """
+    checks: List[Callable[[Any], None]] = []
+
+    schema_type = schema.get("type")
+    if schema_type is not None:
+        types = [schema_type] if isinstance(schema_type, str) else list(schema_type)
+        type_ok = _type_check(types)
+
+        def check_type(value: Any):
+            if not type_ok(value):
+                raise ToolParameterError(f"{path} must be of type {' or '.join(types)}, got {type(value).__name__}")
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value: Any):
+            if value not in allowed:
+                raise ToolParameterError(f"{path} must be one of {allowed}, got {value!r}")
+        checks.append(check_enum)
+
+    for bound, fails in (("minimum", lambda value, limit: value < limit), ("maximum", lambda value, limit: value > limit)):
+        if bound in schema:
+            limit = schema[bound]
+
+            def check_bound(value: Any, bound=bound, limit=limit, fails=fails):
+                if isinstance(value, (int, float)) and not isinstance(value, bool) and fails(value, limit):
+                    raise ToolParameterError(f"{path} must be {'>=' if bound == 'minimum' else '<='} {limit}")
+            checks.append(check_bound)
+
+    required = list(schema.get("required", []))
+    properties = {
+        name: compile_validator(property_schema, f"{path}.{name}")
+        for name, property_schema in schema.get("properties", {}).items()
+    }
+    if required or properties:
+        def check_object(value: Any):
+            if not isinstance(value, dict):
+                return
+            missing = [name for name in required if name not in value]
+            if missing:
+                raise ToolParameterError(f"{path} is missing required field(s): {', '.join(missing)}")
+            for name, validate in properties.items():
+                if name in value:
+                    validate(value[name])
+        checks.append(check_object)
+
+    if "items" in schema:
+        validate_item = compile_validator(schema["items"], f"{path}[]")
+
+        def check_items(value: Any):
+            if isinstance(value, (list, tuple)):
+                for item in value:
+                    validate_item(item)
+        checks.append(check_items)
+
+    def validate(value: Any):
+        for check in checks:
+            check(value)
+    return validate
+
+class ToolRegistry:
+    """
+    Dict-based tool lookup with precompiled parameter validators and per-tool
+    call metrics. Tools are any objects with name, input_schema and handler.
+    """
+
+    def __init__(self, tools: List[Any]):
+        self._tools = {tool.name: tool for tool in tools}
+        self._validators = {tool.name: compile_validator(tool.input_schema) for tool in tools}
+        self._metrics = {
+            tool.name: {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+            for tool in tools
+        }
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def get(self, name: str) -> Optional[Any]:
+        """Get a tool by name, or None if it is not registered."""
+        return self._tools.get(name)
+
+    def validate(self, name: str, parameters: Any):
+        """Validate parameters against the tool's compiled input_schema."""
+        self._validators[name](parameters)
+
+    def record(self, name: str, elapsed_ms: float, success: bool):
+        """Record one call of a tool."""
+        with self._lock:
+            metrics = self._metrics[name]
+            metrics["calls"] += 1
+            metrics["total_ms"] += elapsed_ms
+            metrics["max_ms"] = max(metrics["max_ms"], elapsed_ms)
+            if not success:
+                metrics["errors"] += 1
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tool call counts and latency, busiest tools first; tools never called are omitted."""
+        with self._lock:
+            snapshot = {name: dict(metrics) for name, metrics in self._metrics.items() if metrics["calls"]}
+
+        for metrics in snapshot.values():
+            metrics["avg_ms"] = round(metrics["total_ms"] / metrics["calls"], 3)
+            metrics["total_ms"] = round(metrics["total_ms"], 3)
+            metrics["max_ms"] = round(metrics["max_ms"], 3)
+        return dict(sorted(snapshot.items(), key=lambda item: item[1]["total_ms"], reverse=True))
@@ -0,0 +1,301 @@
+"""
+MCP Client Resilience
+
+Retry and failure-isolation policy shared by the MCP HTTP clients:
+
+    Backoff: exponential delay with full jitter, so clients that failed together
+        do not retry in lockstep.
+    CircuitBreaker: per-endpoint closed/open/half-open state. After
+        failure_threshold consecutive failures calls fail immediately until
+        reset_timeout passes, then a single probe decides whether to close.
+    RetryBudget: retries spend tokens that only normal requests earn, so during
+        an outage retries add at most `ratio` extra load instead of multiplying it.
+    RetryPolicy: runs a call under all three; fail_fast disables retries.
+
+Only transport failures, 5xx and 429 responses are retried and count against
+the breaker; other 4xx responses mean the server is up and are raised at once.
+
+Breakers and budgets are shared per endpoint (server URL) across client
+instances. Environment overrides: MCP_FAIL_FAST, MCP_BREAKER_FAILURE_THRESHOLD,
+MCP_BREAKER_RESET_SECONDS, MCP_RETRY_BUDGET_RATIO.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class MCPUnavailableError(RuntimeError):
+    """Base class for calls refused by the resilience policy rather than the server."""
+
+class CircuitOpenError(MCPUnavailableError):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+class RetryBudgetExhausted(MCPUnavailableError):
+    """Raised when a retry is needed but the endpoint's retry budget is spent."""
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes", "on")
+
+def failure_status(exc: BaseException) -> Tuple[bool, Optional[int]]:
+    """
+    Classify an HTTP client exception (requests or httpx).
+
+    Returns:
+        (is_failure, status_code): is_failure is True for transport errors,
+        5xx and 429, which are retried and count against the breaker
+    """
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        return True, None
+    return status >= 500 or status == 429, status
+
+class Backoff:
+    """Exponential backoff with full jitter: attempt n waits uniform(0, min(max_delay, base_delay * multiplier**n))."""
+
+    def __init__(self, base_delay: float = 0.5, max_delay: float = 10.0, multiplier: float = 2.0):
+        if base_delay < 0 or max_delay < 0 or multiplier < 1:
+            raise ValueError("base_delay and max_delay must be non-negative and multiplier at least 1")
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+    def delay(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (0 for the first retry)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** attempt))
+
+class CircuitBreaker:
+    """Thread-safe closed/open/half-open circuit breaker for one endpoint."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        if failure_threshold < 1 or reset_timeout < 0:
+            raise ValueError("failure_threshold must be positive and reset_timeout non-negative")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """True if a call may go out now; in half-open state only one probe is let through."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats["opened"] += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release_probe(self):
+        """Let another half-open probe through after a probe ended without a verdict."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            return {"state": self._state, "consecutive_failures": self._failures, **self._stats}
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of request volume.
+
+    Every first attempt deposits `ratio` tokens (capped at max_tokens); every
+    retry spends one. `reserve` tokens are available from the start so a quiet
+    client can still retry an occasional failure.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0, max_tokens: float = 100.0):
+        if ratio < 0 or reserve < 0 or max_tokens < reserve:
+            raise ValueError("ratio and reserve must be non-negative and max_tokens at least reserve")
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = reserve
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            return self._tokens
+
+# Per-endpoint shared state
+_breakers: Dict[str, CircuitBreaker] = {}
+_budgets: Dict[str, RetryBudget] = {}
+_registry_lock = threading.Lock()
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """The circuit breaker shared by every client of `endpoint`."""
+    with _registry_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(
+                failure_threshold=int(os.getenv("MCP_BREAKER_FAILURE_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("MCP_BREAKER_RESET_SECONDS", "30"))
+            )
+        return _breakers[endpoint]
+
+def get_retry_budget(endpoint: str) -> RetryBudget:
+    """The retry budget shared by every client of `endpoint`."""
+    with _registry_lock:
+        if endpoint not in _budgets:
+            _budgets[endpoint] = RetryBudget(ratio=float(os.getenv("MCP_RETRY_BUDGET_RATIO", "0.2")))
+        return _budgets[endpoint]
+
+class RetryPolicy:
+    """
+    Run calls to one endpoint with backoff, circuit breaking and a retry budget.
+
+    name: log prefix, e.g. "Database Client".
+    retry_on: exception types raised by the HTTP library (e.g. requests.RequestException).
+    fail_fast: make a single attempt (default: MCP_FAIL_FAST).
+    """
+
+    def __init__(self, name: str, endpoint: str, retry_on: Tuple[Type[BaseException], ...], max_attempts: int = 3,
+                 backoff: Optional[Backoff] = None, breaker: Optional[CircuitBreaker] = None,
+                 budget: Optional[RetryBudget] = None, fail_fast: Optional[bool] = None):
+        self.name = name
+        self.endpoint = endpoint
+        self.retry_on = retry_on
+        self.fail_fast = _env_flag("MCP_FAIL_FAST") if fail_fast is None else fail_fast
+        self.max_attempts = 1 if self.fail_fast else max(1, max_attempts)
+        self.backoff = backoff or Backoff()
+        self.breaker = breaker or get_circuit_breaker(endpoint)
+        self.budget = budget or get_retry_budget(endpoint)
+
+    def call(self, fn: Callable[[], Any], max_attempts: Optional[int] = None) -> Any:
+        """
+        Call fn(), retrying transient failures (at most max_attempts tries, default the policy's).
+
+        Raises:
+            CircuitOpenError: If the endpoint's breaker is open
+            RetryBudgetExhausted: If a retry was needed but the budget is spent
+            The last retry_on exception: If every attempt failed, or on a non-retryable error
+        """
+        attempt = 0
+        while True:
+            self._before_attempt(attempt)
+            try:
+                result = fn()
+            except self.retry_on as e:
+                delay = self._after_failure(e, attempt, max_attempts)
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], max_attempts: Optional[int] = None) -> Any:
+        """Async version of call(); fn returns an awaitable."""
+        attempt = 0
+        while True:
+            self._before_attempt(attempt)
+            try:
+                result = await fn()
+            except self.retry_on as e:
+                delay = self._after_failure(e, attempt, max_attempts)
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _before_attempt(self, attempt: int):
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"{self.name}: circuit open for {self.endpoint}, failing fast")
+        if attempt == 0:
+            self.budget.record_request()
+
+    def _after_failure(self, error: BaseException, attempt: int, max_attempts: Optional[int]) -> float:
+        """Record a failed attempt; re-raise it unless another attempt should follow. Returns the delay."""
+        max_attempts = self.max_attempts if max_attempts is None else min(max_attempts, self.max_attempts)
+        is_failure, _ = failure_status(error)
+        if not is_failure:
+            # The server answered (e.g. 400/404): it is healthy and retrying will not help
+            self.breaker.record_success()
+            raise error
+
+        self.breaker.record_failure()
+        logger.warning(f"❌ {self.name}: Attempt {attempt + 1}/{max_attempts} failed: {error}")
+        if attempt + 1 >= max_attempts:
+            logger.error(f"❌ {self.name}: All {max_attempts} attempts failed")
+            raise error
+        if self.breaker.state == CircuitBreaker.OPEN:
+            # This failure tripped the breaker: further attempts would be refused anyway
+            logger.error(f"❌ {self.name}: Circuit opened for {self.endpoint}, not retrying")
+            raise error
+        if not self.budget.try_spend():
+            logger.error(f"❌ {self.name}: Retry budget for {self.endpoint} exhausted")
+            raise RetryBudgetExhausted(f"{self.name}: retry budget exhausted for {self.endpoint}: {error}") from error
+
+        delay = self.backoff.delay(attempt)
+        logger.info(f"⏳ Retrying in {delay:.2f} seconds...")
+        return delay
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "fail_fast": self.fail_fast,
+            "circuit": self.breaker.get_stats(),
+            "retry_tokens": round(self.budget.tokens, 2)
+        }
@@ -0,0 +1,80 @@
+"""
+MCP Client Transports
+
+DatabaseMCPClient and PassengerCommunicationsMCPClient reach their servers over
+HTTP by default. When the agents run in the same process as the servers, the
+in-process transports below call the server objects directly: no HTTP, no
+encoding, and results are the dictionaries the server built.
+
+Selection (first set wins): the client's `transport` argument, the per-service
+variable (DATABASE_MCP_TRANSPORT / PASSENGER_MCP_TRANSPORT), MCP_TRANSPORT,
+then "http".
+"""
+
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+HTTP = "http"
+IN_PROCESS = "inprocess"
+
+TRANSPORTS = {HTTP, IN_PROCESS}
+
+def select_transport(transport: Optional[str], service_env_var: str) -> str:
+    """Resolve the transport name for a client."""
+    name = (transport or os.getenv(service_env_var) or os.getenv("MCP_TRANSPORT") or HTTP).lower()
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unsupported MCP transport: {name} (expected one of {sorted(TRANSPORTS)})")
+    return name
+
+class InProcessDatabaseTransport:
+    """Calls a UnitedAirlinesDatabaseMCPServer in this process (default: the process-wide singleton)."""
+
+    def __init__(self, server: Optional[Any] = None):
+        if server is None:
+            from database_mcp_server import get_database_mcp_server
+            server = get_database_mcp_server()
+        self.server = server
+
+    def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return self.server.execute_tool(tool_name, parameters)
+
+    def execute_batch(self, calls: List[Dict[str, Any]], transactional: bool = False) -> Dict[str, Any]:
+        return self.server.execute_batch(calls, transactional=transactional)
+
+    def stream_tool(self, tool_name: str, parameters: Dict[str, Any], page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        try:
+            return self.server.stream_tool(tool_name, parameters, **({"page_size": page_size} if page_size else {}))
+        except ValueError as e:
+            raise RuntimeError(f"Failed to stream {tool_name}: {e}")
+
+    def get_tools(self) -> List[Dict[str, Any]]:
+        return self.server.get_tools()
+
+    def is_available(self) -> bool:
+        return True
+
+class InProcessPassengerCommunicationsTransport:
+    """Calls a PassengerCommunicationsMCP in this process (default: the started process-wide singleton)."""
+
+    def __init__(self, mcp: Optional[Any] = None):
+        if mcp is None:
+            from passenger_communications_mcp_server import get_passenger_mcp
+            mcp = get_passenger_mcp()
+            if not mcp.running:
+                mcp.start()
+        self.mcp = mcp
+
+    def send_rebooking_proposal(self, proposal: Dict[str, Any]) -> Dict[str, Any]:
+        return self.mcp.send_rebooking_proposal(proposal)
+
+    def get_passenger_response(self, message_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        return self.mcp.get_passenger_response(message_id, timeout)
+
+    def get_all_available_responses(self) -> List[Dict[str, Any]]:
+        return self.mcp.get_all_available_responses()
+
+    def get_system_status(self) -> Dict[str, Any]:
+        return self.mcp.get_system_status()
+
+    def is_available(self) -> bool:
+        return self.mcp.running
@@ -0,0 +1,150 @@
+"""
+MCP Wire Format
+
+Response encoding shared by the MCP HTTP servers and clients. Servers pick the
+encoding from the request's Accept header and compress large bodies when the
+client accepts gzip; clients decode by the response's Content-Type.
+
+Encodings:
+    application/json: orjson when installed, otherwise the standard library.
+    application/msgpack: ormsgpack or msgpack when installed (opt-in through
+        Accept, or MCP_WIRE_FORMAT=msgpack on the clients).
+
+Responses of at least MCP_GZIP_MIN_BYTES (default 16384) are gzip-compressed
+for clients that send Accept-Encoding: gzip.
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import ormsgpack
+    msgpack = None
+except ImportError:  # pragma: no cover - depends on the environment
+    ormsgpack = None
+    try:
+        import msgpack
+    except ImportError:
+        msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+# Other spellings of the msgpack media type seen in Accept headers
+_MSGPACK_ALIASES = {MSGPACK, "application/x-msgpack", "application/vnd.msgpack"}
+
+MSGPACK_AVAILABLE = ormsgpack is not None or msgpack is not None
+
+GZIP_MIN_BYTES = int(os.getenv("MCP_GZIP_MIN_BYTES", "16384"))
+# Fastest level: JSON from the tools still shrinks ~5-10x and the CPU cost stays small
+GZIP_LEVEL = 1
+
+def dumps(payload: Any) -> bytes:
+    """Encode a payload as JSON bytes; values JSON cannot represent are converted with str()."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(payload, default=str).encode()
+
+def loads(data: bytes) -> Any:
+    """Decode JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def pack(payload: Any) -> bytes:
+    """Encode a payload as msgpack bytes."""
+    if ormsgpack is not None:
+        return ormsgpack.packb(payload, default=str,
+                               option=ormsgpack.OPT_NON_STR_KEYS | ormsgpack.OPT_PASSTHROUGH_DATETIME)
+    if msgpack is not None:
+        return msgpack.packb(payload, default=str, use_bin_type=True)
+    raise RuntimeError("msgpack encoding requires the ormsgpack or msgpack package")
+
+def unpack(data: bytes) -> Any:
+    """Decode msgpack bytes."""
+    if ormsgpack is not None:
+        return ormsgpack.unpackb(data, option=ormsgpack.OPT_NON_STR_KEYS)
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    raise RuntimeError("msgpack decoding requires the ormsgpack or msgpack package")
+
+def _media_ranges(header: Optional[str]):
+    """Yield (media type, q) pairs from an Accept or Accept-Encoding header."""
+    for part in (header or "").split(","):
+        fields = part.strip().split(";")
+        media_type = fields[0].strip().lower()
+        if not media_type:
+            continue
+        q = 1.0
+        for parameter in fields[1:]:
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        yield media_type, q
+
+def negotiate(accept: Optional[str]) -> str:
+    """Pick the response Content-Type for an Accept header. JSON unless msgpack is preferred and available."""
+    json_q = msgpack_q = 0.0
+    for media_type, q in _media_ranges(accept):
+        if media_type in _MSGPACK_ALIASES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type in (JSON, "application/*", "*/*"):
+            json_q = max(json_q, q)
+    if MSGPACK_AVAILABLE and msgpack_q > 0 and msgpack_q >= json_q:
+        return MSGPACK
+    return JSON
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    return any(coding in ("gzip", "*") and q > 0 for coding, q in _media_ranges(accept_encoding))
+
+def encode_response(payload: Any, accept: Optional[str] = None, accept_encoding: Optional[str] = None,
+                    gzip_min_bytes: Optional[int] = None) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Encode a response payload for the request's Accept / Accept-Encoding headers.
+
+    Returns:
+        (body, headers) where headers carry Content-Type, Vary and, when
+        compressed, Content-Encoding
+    """
+    content_type = negotiate(accept)
+    body = pack(payload) if content_type == MSGPACK else dumps(payload)
+    headers = {"Content-Type": content_type, "Vary": "Accept, Accept-Encoding"}
+
+    threshold = GZIP_MIN_BYTES if gzip_min_bytes is None else gzip_min_bytes
+    if len(body) >= threshold and accepts_gzip(accept_encoding):
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+def client_accept_header(wire_format: Optional[str] = None) -> str:
+    """
+    Accept header for an MCP client. wire_format is "json" or "msgpack"
+    (default: MCP_WIRE_FORMAT, else json); msgpack falls back to JSON when
+    no msgpack package is installed.
+    """
+    wire_format = (wire_format or os.getenv("MCP_WIRE_FORMAT", "json")).lower()
+    if wire_format not in ("json", "msgpack"):
+        raise ValueError(f"Unsupported wire format: {wire_format}")
+    if wire_format == "msgpack" and MSGPACK_AVAILABLE:
+        return f"{MSGPACK}, {JSON};q=0.5"
+    return JSON
+
+def decode_response(response) -> Any:
+    """
+    Decode a requests/httpx response body by its Content-Type. gzip
+    Content-Encoding is already undone by the HTTP library.
+    """
+    content_type = response.headers.get("Content-Type", JSON).split(";")[0].strip().lower()
+    if content_type in _MSGPACK_ALIASES:
+        return unpack(response.content)
+    return loads(response.content)
@@ -4,9 +4,10 @@ HTTP Server wrapper for the Passenger Communications MCP Server.
 This provides HTTP endpoints that the MCP client can call.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, Response
 import logging
 from passenger_communications_mcp_server import PassengerCommunicationsMCP
+from mcp_wire_format import encode_response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -18,6 +19,11 @@ app = Flask(__name__)
 # Global MCP server instance
 mcp_server = None
 
+def respond(payload):
+    """Encode a response in the negotiated wire format (JSON or msgpack, gzip when large)."""
+    body, headers = encode_response(payload, request.headers.get('Accept'), request.headers.get('Accept-Encoding'))
+    return Response(body, headers=headers)
+
 @app.before_first_request
 def initialize_mcp_server():
     """Initialize the MCP server before the first request."""
@@ -30,7 +36,7 @@ def initialize_mcp_server():
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({"status": "healthy", "running": True})
+    return respond({"status": "healthy", "running": True})
 
 @app.route('/send_rebooking_proposal', methods=['POST'])
 def send_rebooking_proposal():
@@ -38,25 +44,25 @@ def send_rebooking_proposal():
     try:
         proposal = request.get_json()
         if not proposal:
-            return jsonify({"error": "No proposal data provided"}), 400
+            return respond({"error": "No proposal data provided"}), 400
         
         # Validate required fields
         required_fields = ['passenger_id', 'original_flight', 'rebooked_flight', 'arrival_location']
         for field in required_fields:
             if field not in proposal:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
+                return respond({"error": f"Missing required field: {field}"}), 400
         
         # Ensure MCP server is initialized
         if mcp_server is None:
-            return jsonify({"error": "MCP server not initialized"}), 500
+            return respond({"error": "MCP server not initialized"}), 500
         
         # Send to MCP server
         result = mcp_server.send_rebooking_proposal(proposal)
-        return jsonify(result)
+        return respond(result)
         
     except Exception as e:
         logger.error(f"Error sending rebooking proposal: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 @app.route('/get_passenger_response', methods=['GET'])
 def get_passenger_response():
@@ -66,22 +72,22 @@ def get_passenger_response():
         timeout = float(request.args.get('timeout', 30.0))
         
         if not message_id:
-            return jsonify({"error": "No message_id provided"}), 400
+            return respond({"error": "No message_id provided"}), 400
         
         # Ensure MCP server is initialized
         if mcp_server is None:
-            return jsonify({"error": "MCP server not initialized"}), 500
+            return respond({"error": "MCP server not initialized"}), 500
         
         # Get response from MCP server
         response = mcp_server.get_passenger_response(message_id, timeout)
         if response:
-            return jsonify(response)
+            return respond(response)
         else:
-            return jsonify({"status": "pending", "message": "Response not ready"}), 202
+            return respond({"status": "pending", "message": "Response not ready"}), 202
         
     except Exception as e:
         logger.error(f"Error getting passenger response: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 @app.route('/get_all_available_responses', methods=['GET'])
 def get_all_available_responses():
@@ -89,18 +95,18 @@ def get_all_available_responses():
     try:
         # Ensure MCP server is initialized
         if mcp_server is None:
-            return jsonify({"error": "MCP server not initialized"}), 500
+            return respond({"error": "MCP server not initialized"}), 500
         
         # Get all available responses from MCP server
         responses = mcp_server.get_all_available_responses()
-        return jsonify({
+        return respond({
             "responses": responses,
             "count": len(responses)
         })
         
     except Exception as e:
         logger.error(f"Error getting all available responses: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 @app.route('/get_system_status', methods=['GET'])
 def get_system_status():
@@ -108,14 +114,14 @@ def get_system_status():
     try:
         # Ensure MCP server is initialized
         if mcp_server is None:
-            return jsonify({"error": "MCP server not initialized"}), 500
+            return respond({"error": "MCP server not initialized"}), 500
         
         status = mcp_server.get_system_status()
-        return jsonify(status)
+        return respond(status)
         
     except Exception as e:
         logger.error(f"Error getting system status: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 @app.route('/shutdown', methods=['POST'])
 def shutdown():
@@ -126,11 +132,11 @@ def shutdown():
             mcp_server.stop()
             mcp_server = None
             logger.info("🛑 MCP server stopped")
-        return jsonify({"status": "shutdown"})
+        return respond({"status": "shutdown"})
         
     except Exception as e:
         logger.error(f"Error shutting down MCP server: {e}")
-        return jsonify({"error": str(e)}), 500
+        return respond({"error": str(e)}), 500
 
 if __name__ == '__main__':
     print("🚀 Starting Passenger Communications HTTP Server")
@@ -6,12 +6,19 @@ with the passenger communications MCP server.
 """
 
 import requests
-import json
-import time
+import os
+import sys
 import logging
 from typing import Dict, Any, Optional, List
 import random
 
+# Make sibling service modules importable however this module is loaded
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mcp_wire_format import client_accept_header, decode_response
+from mcp_resilience import RetryPolicy, Backoff, MCPUnavailableError
+from mcp_transport import select_transport, IN_PROCESS, InProcessPassengerCommunicationsTransport
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -21,19 +28,41 @@ class PassengerCommunicationsMCPClient:
     MCP client for communicating with the passenger communications server.
     """
     
-    def __init__(self, server_url: str = "http://localhost:8000", timeout: int = 30, max_retries: int = 3, retry_delay: float = 0.0):
+    def __init__(self, server_url: str = "http://localhost:8000", timeout: int = 30, max_retries: int = 3, retry_delay: float = 0.25,
+                 wire_format: Optional[str] = None, max_retry_delay: float = 5.0, fail_fast: Optional[bool] = None,
+                 transport: Optional[str] = None, mcp: Optional[Any] = None):
         self.server_url = server_url.rstrip('/')
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        # Responses arrive as JSON or msgpack (wire_format / MCP_WIRE_FORMAT), gzip-compressed when large
+        self.session.headers.update({'Content-Type': 'application/json', 'Accept': client_accept_header(wire_format)})
+        # Jittered exponential backoff from retry_delay, plus the circuit breaker and retry budget shared by clients of this server
+        self.retry_policy = RetryPolicy(
+            "MCP Client", self.server_url, (requests.exceptions.RequestException,),
+            max_attempts=max_retries, backoff=Backoff(base_delay=retry_delay, max_delay=max_retry_delay), fail_fast=fail_fast
+        )
+        # "http" (default) or "inprocess" (PASSENGER_MCP_TRANSPORT / MCP_TRANSPORT): call `mcp`, or the
+        # process-wide passenger communications system, directly with no HTTP or serialisation
+        self.transport = IN_PROCESS if mcp is not None else select_transport(transport, "PASSENGER_MCP_TRANSPORT")
+        self._in_process = InProcessPassengerCommunicationsTransport(mcp) if self.transport == IN_PROCESS else None
         self._suppress_logging = False
     
     def suppress_logging(self, suppress: bool = True):
         """Temporarily suppress logging for batch operations."""
         self._suppress_logging = suppress
     
+    def _request(self, method: str, path: str, max_attempts: Optional[int] = None, **kwargs) -> requests.Response:
+        """Send a request under the retry policy; non-2xx responses raise."""
+        kwargs.setdefault("timeout", self.timeout)
+        
+        def attempt():
+            response = self.session.request(method, f"{self.server_url}{path}", **kwargs)
+            response.raise_for_status()
+            return response
+        return self.retry_policy.call(attempt, max_attempts=max_attempts)
+    
     def send_rebooking_proposal(self, proposal: Dict[str, Any]) -> Dict[str, Any]:
         """
         Send a rebooking proposal to the passenger communications server with retry logic.
@@ -44,31 +73,17 @@ class PassengerCommunicationsMCPClient:
         Returns:
             Dictionary with message_id and status
         """
-        for attempt in range(self.max_retries):
+        if self._in_process is not None:
+            result = self._in_process.send_rebooking_proposal(proposal)
+        else:
             try:
-                response = self.session.post(
-                    f"{self.server_url}/send_rebooking_proposal",
-                    json=proposal,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                if not self._suppress_logging:
-                    logger.info(f"📨 MCP Client: Sent proposal for {proposal.get('passenger_name', proposal['passenger_id'])}")
-                return result
-                
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"❌ MCP Client: Attempt {attempt + 1}/{self.max_retries} failed: {e}")
-                if attempt < self.max_retries - 1:
-                    logger.info(f"⏳ Retrying in {self.retry_delay} seconds...")
-                    time.sleep(self.retry_delay)
-                else:
-                    logger.error(f"❌ MCP Client: All {self.max_retries} attempts failed")
-                    raise RuntimeError(f"Failed to send proposal after {self.max_retries} attempts: {e}")
+                result = decode_response(self._request("POST", "/send_rebooking_proposal", json=proposal))
+            except (requests.exceptions.RequestException, MCPUnavailableError) as e:
+                raise RuntimeError(f"Failed to send proposal: {e}")
         
-        # This should never be reached due to the raise statement above, but needed for type checking
-        raise RuntimeError("Unexpected error in send_rebooking_proposal")
+        if not self._suppress_logging:
+            logger.info(f"📨 MCP Client: Sent proposal for {proposal.get('passenger_name', proposal['passenger_id'])}")
+        return result
     
     def get_passenger_response(self, message_id: str, timeout: float = 30.0) -> Optional[Dict[str, Any]]:
         """
@@ -81,31 +96,20 @@ class PassengerCommunicationsMCPClient:
         Returns:
             Response dictionary or None if not available
         """
-        for attempt in range(self.max_retries):
+        if self._in_process is not None:
+            result = self._in_process.get_passenger_response(message_id, timeout) or {}
+        else:
             try:
-                response = self.session.get(
-                    f"{self.server_url}/get_passenger_response",
-                    params={"message_id": message_id, "timeout": timeout},
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                if result.get("status") == "completed":
-                    logger.info(f"📤 MCP Client: Received response for message {message_id[:8]}...")
-                    return result
-                else:
-                    logger.debug(f"⏳ MCP Client: Response not ready for message {message_id[:8]}...")
-                    return None
-                    
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"❌ MCP Client: Attempt {attempt + 1}/{self.max_retries} failed: {e}")
-                if attempt < self.max_retries - 1:
-                    logger.info(f"⏳ Retrying in {self.retry_delay} seconds...")
-                    time.sleep(self.retry_delay)
-                else:
-                    logger.error(f"❌ MCP Client: All {self.max_retries} attempts failed")
-                    return None
+                result = decode_response(self._request("GET", "/get_passenger_response", params={"message_id": message_id, "timeout": timeout}))
+            except (requests.exceptions.RequestException, MCPUnavailableError):
+                return None
+        
+        if result.get("status") == "completed":
+            logger.info(f"📤 MCP Client: Received response for message {message_id[:8]}...")
+            return result
+        else:
+            logger.debug(f"⏳ MCP Client: Response not ready for message {message_id[:8]}...")
+            return None
     
     def get_all_available_responses(self) -> List[Dict[str, Any]]:
         """
@@ -114,34 +118,21 @@ class PassengerCommunicationsMCPClient:
         Returns:
             List of response dictionaries for completed messages
         """
-        for attempt in range(self.max_retries):
+        if self._in_process is not None:
+            responses = self._in_process.get_all_available_responses()
+        else:
             try:
-                response = self.session.get(
-                    f"{self.server_url}/get_all_available_responses",
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                responses = result.get("responses", [])
-                
-                if responses:
-                    logger.info(f"📤 MCP Client: Received {len(responses)} available responses")
-                else:
-                    logger.debug(f"⏳ MCP Client: No responses ready")
-                
-                return responses
-                    
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"❌ MCP Client: Attempt {attempt + 1}/{self.max_retries} failed: {e}")
-                if attempt < self.max_retries - 1:
-                    logger.info(f"⏳ Retrying in {self.retry_delay} seconds...")
-                    time.sleep(self.retry_delay)
-                else:
-                    logger.error(f"❌ MCP Client: All {self.max_retries} attempts failed")
-                    return []
+                result = decode_response(self._request("GET", "/get_all_available_responses"))
+            except (requests.exceptions.RequestException, MCPUnavailableError):
+                return []
+            responses = result.get("responses", [])
+        
+        if responses:
+            logger.info(f"📤 MCP Client: Received {len(responses)} available responses")
+        else:
+            logger.debug(f"⏳ MCP Client: No responses ready")
         
-        return []
+        return responses
 
     def get_system_status(self) -> Dict[str, Any]:
         """
@@ -150,40 +141,24 @@ class PassengerCommunicationsMCPClient:
         Returns:
             Dictionary with system status information
         """
-        for attempt in range(self.max_retries):
-            try:
-                response = self.session.get(
-                    f"{self.server_url}/get_system_status",
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                
-                return response.json()
-                
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"❌ MCP Client: Attempt {attempt + 1}/{self.max_retries} failed: {e}")
-                if attempt < self.max_retries - 1:
-                    logger.info(f"⏳ Retrying in {self.retry_delay} seconds...")
-                    time.sleep(self.retry_delay)
-                else:
-                    logger.error(f"❌ MCP Client: All {self.max_retries} attempts failed")
-                    raise RuntimeError(f"Failed to get system status after {self.max_retries} attempts: {e}")
+        if self._in_process is not None:
+            return self._in_process.get_system_status()
         
-        # This should never be reached due to the raise statement above, but needed for type checking
-        raise RuntimeError("Unexpected error in get_system_status")
+        try:
+            return decode_response(self._request("GET", "/get_system_status"))
+        except (requests.exceptions.RequestException, MCPUnavailableError) as e:
+            raise RuntimeError(f"Failed to get system status: {e}")
     
     def is_available(self) -> bool:
-        """Check if the MCP server is available with retry logic."""
-        for attempt in range(self.max_retries):
-            try:
-                response = self.session.get(f"{self.server_url}/health", timeout=5)
-                return response.status_code == 200
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"❌ MCP Client: Health check attempt {attempt + 1}/{self.max_retries} failed: {e}")
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+        """Check if the MCP server is available (one probe; False at once while the circuit is open)."""
+        if self._in_process is not None:
+            return self._in_process.is_available()
         
-        return False
+        try:
+            self._request("GET", "/health", max_attempts=1, timeout=5)
+            return True
+        except (requests.exceptions.RequestException, MCPUnavailableError):
+            return False
 
 # Global client instance
 _mcp_client = None
@@ -0,0 +1,71 @@
+"""
+Single-flight Request Coalescing
+
+When several threads ask for the same key at the same moment, only the first
+(the leader) runs the call; the others wait for it and receive copies of its
+result, or its exception. Nothing is kept once the call finishes - this only
+merges calls that overlap in time (pair it with a cache to reuse results).
+"""
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class _Call:
+    __slots__ = ("done", "result", "error", "duplicates")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.duplicates = 0
+
+class SingleFlight:
+    """Thread-safe call coalescing keyed by any hashable value."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"executions": 0, "suppressed_duplicates": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn() unless a call for `key` is already in flight, in which case
+        wait for that call and return a deep copy of its result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.duplicates += 1
+                self._stats["suppressed_duplicates"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        # Followers copy call.result; hand the leader its own copy if anyone is sharing it
+        return copy.deepcopy(call.result) if call.duplicates else call.result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get execution / suppressed-duplicate counters and the number of calls in flight."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
@@ -0,0 +1,898 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import shutil
+import sqlite3
+import threading
+import time
+import pytest
+
+from database_connection_pool import SQLiteConnectionPool, ConnectionPoolExhausted
+from database_mcp_server import UnitedAirlinesDatabaseMCPServer
+from database_storage_config import StorageConfig
+from database_query_cache import QueryCache
+from database.migrations import apply_migrations, get_schema_version, LATEST_VERSION
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "database", "united_ops.db")
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Work on a private copy of united_ops.db so tests never touch the shipped database."""
+    path = tmp_path / "united_ops.db"
+    shutil.copy(SOURCE_DB, path)
+    return str(path)
+
+@pytest.fixture
+def server(db_path):
+    server = UnitedAirlinesDatabaseMCPServer(db_path=db_path, pool_size=3)
+    yield server
+    server.close()
+
+def test_pool_reuses_connections(db_path):
+    initialized = []
+    pool = SQLiteConnectionPool(db_path, pool_size=2, initializer=initialized.append)
+
+    for _ in range(10):
+        with pool.connection() as conn:
+            conn.execute("SELECT 1").fetchone()
+
+    stats = pool.get_stats()
+    assert stats["connections_created"] == 1
+    assert stats["checkouts"] == 10
+    assert stats["in_use"] == 0
+    assert len(initialized) == 1
+    pool.close()
+
+def test_pool_times_out_when_exhausted(db_path):
+    pool = SQLiteConnectionPool(db_path, pool_size=1, checkout_timeout=0.05)
+
+    with pool.connection():
+        with pytest.raises(ConnectionPoolExhausted):
+            pool.acquire()
+
+    assert pool.get_stats()["checkout_timeouts"] == 1
+    pool.close()
+
+def test_pool_replaces_unhealthy_connection(db_path):
+    pool = SQLiteConnectionPool(db_path, pool_size=1, health_check_interval=0.0)
+
+    pooled = pool.acquire()
+    pool.release(pooled)
+    pooled.connection.close()
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+
+    stats = pool.get_stats()
+    assert stats["health_check_failures"] == 1
+    assert stats["connections_created"] == 2
+    pool.close()
+
+def test_pool_rolls_back_unfinished_transaction(db_path):
+    pool = SQLiteConnectionPool(db_path, pool_size=1)
+
+    with pool.connection() as conn:
+        conn.execute("UPDATE flights SET available_seats = -1")
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM flights WHERE available_seats = -1").fetchone() == (0,)
+    pool.close()
+
+def test_concurrent_tool_calls_share_bounded_pool(db_path):
+    # Cache and call coalescing disabled so every call checks out a pooled connection
+    server = UnitedAirlinesDatabaseMCPServer(db_path=db_path, pool_size=3, cache_size=0, single_flight=False)
+    errors = []
+
+    def worker():
+        for _ in range(20):
+            result = server.execute_tool("get_flight_details", {"flight_number": "UA70161"})
+            if not result["success"]:
+                errors.append(result)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    status = server.execute_tool("get_server_status", {})["result"]
+    assert status["connection_pool"]["connections_created"] <= 3
+    assert status["connection_pool"]["peak_in_use"] <= 3
+    assert status["connection_pool"]["checkouts"] >= 160
+    server.close()
+
+def test_storage_config_applied_to_every_connection(server):
+    status = server.execute_tool("get_server_status", {})["result"]
+
+    assert status["storage"]["journal_mode"] == "WAL"
+    assert status["storage"]["synchronous"] == "NORMAL"
+    assert status["storage"]["busy_timeout_ms"] == 5000
+    assert status["storage"]["cache_size_kib"] == StorageConfig().cache_size_kib
+
+def test_readers_not_blocked_by_open_write_transaction(server, db_path):
+    # The first pooled connection switches the database file into WAL mode
+    server.execute_tool("get_server_status", {})
+    writer = sqlite3.connect(db_path, timeout=0)
+    writer.execute("BEGIN EXCLUSIVE")
+    writer.execute("UPDATE flights SET available_seats = available_seats + 1")
+
+    result = server.execute_tool("get_flight_details", {"flight_number": "UA70161"})
+
+    writer.rollback()
+    writer.close()
+    assert result["success"]
+    assert result["result"]["success"]
+
+def test_storage_config_rejects_unknown_modes():
+    with pytest.raises(ValueError):
+        StorageConfig(journal_mode="SHADOW")
+
+def test_startup_migrations_add_keys_and_indexes(server, db_path):
+    status = server.execute_tool("get_server_status", {})["result"]
+    assert status["schema_version"] == LATEST_VERSION
+
+    conn = sqlite3.connect(db_path)
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM passengers WHERE flight_number = ?", ("UA70161",)).fetchall()
+    flights = conn.execute("SELECT COUNT(*) FROM flights").fetchone()[0]
+    conn.close()
+
+    assert {"idx_passengers_flight_tier", "idx_flights_route_departure", "idx_crew_assigned_flight",
+            "idx_crew_role_base", "idx_agent_logs_run_timestamp"} <= indexes
+    assert "idx_passengers_flight_tier" in plan[0][3]
+    assert flights == 1064
+
+def test_migrations_are_idempotent(db_path):
+    conn = sqlite3.connect(db_path)
+    assert apply_migrations(conn) == [1, 2]
+    assert apply_migrations(conn) == []
+    assert get_schema_version(conn) == LATEST_VERSION
+    conn.close()
+
+def test_results_are_plain_python_values(server):
+    details = server.execute_tool("get_flight_details", {"flight_number": "UA70161"})["result"]["details"]
+    seats = server.execute_tool("get_available_seats", {"flight_number": "UA70161"})["result"]
+    crew = server.execute_tool("query_crew", {"assigned_flight": None, "limit": 5})["result"]
+
+    assert details["departure_location"] == "JFK"
+    assert type(details["available_seats"]) is int
+    assert seats["available_seats"] == details["available_seats"]
+    assert all(type(row) is dict for row in crew)
+
+def test_dataframe_output_is_opt_in(server):
+    import pandas as pd
+
+    result = server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": 3}, as_dataframe=True)
+
+    assert isinstance(result["result"], pd.DataFrame)
+    assert list(result["result"].columns[:2]) == ["passenger_id", "name"]
+
+def _passenger_flight(db_path, passenger_id):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT flight_number FROM passengers WHERE passenger_id = ?", (passenger_id,)).fetchone()
+    conn.close()
+    return row[0]
+
+def test_batch_returns_per_item_results(server):
+    batch = server.execute_batch([
+        {"tool": "get_flight_details", "parameters": {"flight_number": "UA70161"}},
+        {"tool": "get_available_seats", "parameters": {"flight_number": "UA70161"}},
+        {"tool": "no_such_tool", "parameters": {}}
+    ])
+
+    assert not batch["success"]
+    assert batch["count"] == 3
+    assert [item["success"] for item in batch["results"]] == [True, True, False]
+    assert batch["results"][0]["result"]["details"]["departure_location"] == "JFK"
+
+def test_transactional_batch_commits_all_updates(server, db_path):
+    passengers = server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": 3})["result"]
+    calls = [
+        {"tool": "update_passenger_flight",
+         "parameters": {"passenger_id": p["passenger_id"], "new_flight": "UA70161", "reason": "batch test"}}
+        for p in passengers
+    ]
+
+    batch = server.execute_batch(calls, transactional=True)
+
+    assert batch["committed"]
+    assert all(item["result"]["success"] for item in batch["results"])
+    assert all(_passenger_flight(db_path, p["passenger_id"]) == "UA70161" for p in passengers)
+
+def test_transactional_batch_rolls_back_on_failure(server, db_path):
+    passenger_id = server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": 1})["result"][0]["passenger_id"]
+
+    batch = server.execute_batch([
+        {"tool": "update_passenger_flight",
+         "parameters": {"passenger_id": passenger_id, "new_flight": "UA70161", "reason": "batch test"}},
+        {"tool": "no_such_tool", "parameters": {}},
+        {"tool": "get_flight_details", "parameters": {"flight_number": "UA70161"}}
+    ], transactional=True)
+
+    assert not batch["committed"]
+    assert batch["results"][2]["error"].startswith("Skipped")
+    assert _passenger_flight(db_path, passenger_id) == "UA111"
+    assert server.pool.get_stats()["in_use"] == 0
+
+    # A handler that reports its own failure rolls the batch back too
+    batch = server.execute_batch([
+        {"tool": "update_passenger_flight",
+         "parameters": {"passenger_id": passenger_id, "new_flight": "UA70161", "reason": "batch test"}},
+        {"tool": "update_passenger_flight", "parameters": {"passenger_id": "NOPE", "new_flight": "UA70161"}},
+        {"tool": "get_flight_details", "parameters": {"flight_number": "UA70161"}}
+    ], transactional=True)
+
+    assert not batch["success"] and not batch["committed"]
+    assert batch["results"][1]["result"]["error"] == "Passenger not found"
+    assert batch["results"][2]["error"].startswith("Skipped")
+    assert _passenger_flight(db_path, passenger_id) == "UA111"
+
+def _seats(db_path, flight_number):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT available_seats FROM flights WHERE flight_number = ?", (flight_number,)).fetchone()
+    conn.close()
+    return row[0]
+
+def test_bulk_reassign_moves_seat_inventory(server, db_path):
+    passengers = server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": 3})["result"]
+    source_seats, target_seats = _seats(db_path, "UA111"), _seats(db_path, "UA70161")
+
+    summary = server.execute_tool("bulk_reassign_passengers", {
+        "assignments": [{"passenger_id": p["passenger_id"], "new_flight": "UA70161"} for p in passengers]
+    })["result"]
+
+    assert summary["reassigned"] == 3 and summary["rejected_count"] == 0
+    assert _seats(db_path, "UA111") == source_seats + 3
+    assert _seats(db_path, "UA70161") == target_seats - 3
+    assert all(_passenger_flight(db_path, p["passenger_id"]) == "UA70161" for p in passengers)
+
+def test_bulk_reassign_rejects_oversell_and_ambiguous_flights(server, db_path):
+    target_seats = _seats(db_path, "UA70161")
+    passengers = server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": target_seats + 2})["result"]
+    assignments = [{"passenger_id": p["passenger_id"], "new_flight": "UA70161"} for p in passengers]
+    assignments.append({"passenger_id": passengers[0]["passenger_id"], "new_flight": "UA1853"})
+    assignments.append({"passenger_id": "NOPE", "new_flight": "UA70161"})
+
+    summary = server.execute_tool("bulk_reassign_passengers", {"assignments": assignments})["result"]
+    reasons = [item["reason"] for item in summary["rejected"]]
+
+    assert summary["reassigned"] == target_seats
+    assert reasons.count("No seats available") == 2
+    assert any(reason.startswith("Ambiguous") for reason in reasons)
+    assert "Passenger not found" in reasons
+    assert _seats(db_path, "UA70161") == 0
+
+def test_bulk_reassign_takes_seats_on_connecting_flights(server, db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE flights SET available_seats = 1 WHERE flight_number = 'UA1018'")
+    passengers = server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": 2})["result"]
+    target_seats = _seats(db_path, "UA70161")
+    connecting_flights = [{"flight_number": "UA1018"}]
+
+    summary = server.execute_tool("bulk_reassign_passengers", {
+        "assignments": [{"passenger_id": p["passenger_id"], "new_flight": "UA70161", "connecting_flights": connecting_flights}
+                        for p in passengers]
+    })["result"]
+
+    # The second passenger finds the connecting leg full and keeps their seat on UA111
+    assert summary["reassigned"] == 1
+    assert [item["reason"] for item in summary["rejected"]] == ["No seats available on connecting flight UA1018"]
+    assert _seats(db_path, "UA70161") == target_seats - 1
+    assert _seats(db_path, "UA1018") == 0
+    assert _passenger_flight(db_path, passengers[1]["passenger_id"]) == "UA111"
+
+def test_bulk_reassign_to_unassigned_releases_seat(server, db_path):
+    passenger_id = server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": 1})["result"][0]["passenger_id"]
+    source_seats = _seats(db_path, "UA111")
+
+    summary = server.execute_tool("bulk_reassign_passengers", {
+        "assignments": [{"passenger_id": passenger_id, "new_flight": "UNASSIGNED (cancelled flight UA111)"}]
+    })["result"]
+
+    assert summary["reassigned"] == 1
+    assert _seats(db_path, "UA111") == source_seats + 1
+
+def test_search_alternative_flights_matches_python_filter(server, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    route = [dict(row) for row in conn.execute(
+        "SELECT * FROM flights WHERE departure_location = 'JFK' AND arrival_location = 'ORD'")]
+    conn.close()
+    candidates = sorted(
+        (f for f in route if f["departure_time"] > "2025-06-25 09:33:00" and f["flight_number"] != "UA111"
+         and f["status"] != "cancelled" and f["available_seats"] > 0),
+        key=lambda f: (f["arrival_time"], f["departure_time"], f["flight_number"]))
+    expected, seats = [], 0
+    for flight in candidates:
+        if seats >= 40:
+            break
+        expected.append(flight["flight_number"])
+        seats += flight["available_seats"]
+
+    result = server.execute_tool("search_alternative_flights", {
+        "departure_location": "JFK", "arrival_location": "ORD", "departure_after": "2025-06-25 09:33:00",
+        "passenger_count": 40, "exclude_flight_number": "UA111"
+    })["result"]
+
+    assert [f["flight_number"] for f in result] == expected
+    assert "seats_before" not in result[0]
+    assert sum(f["available_seats"] for f in result) >= min(40, sum(f["available_seats"] for f in candidates))
+
+def test_invalid_parameters_rejected_before_sql(server):
+    missing = server.execute_tool("get_flight_details", {})
+    wrong_type = server.execute_tool("query_flights", {"limit": "5; DROP TABLE flights"})
+    negative = server.execute_tool("query_passengers", {"limit": -1})
+    bad_item = server.execute_tool("bulk_reassign_passengers", {"assignments": [{"passenger_id": "P1"}]})
+
+    assert "missing required field(s): flight_number" in missing["error"]
+    assert "must be of type integer" in wrong_type["error"]
+    assert "must be >= 0" in negative["error"]
+    assert "parameters.assignments[]" in bad_item["error"]
+    assert server.execute_tool("query_crew", {"assigned_flight": None, "limit": 1})["success"]
+
+def test_limit_and_offset_are_bound_parameters(server):
+    first_page = server.execute_tool("query_flights", {"limit": 5})["result"]
+    second_page = server.execute_tool("query_flights", {"limit": 5, "offset": 5})["result"]
+    both = server.execute_tool("query_flights", {"limit": 10})["result"]
+
+    assert first_page + second_page == both
+
+def test_status_reports_per_tool_metrics(server):
+    for _ in range(3):
+        server.execute_tool("get_flight_details", {"flight_number": "UA70161"})
+    server.execute_tool("get_flight_details", {})
+
+    metrics = server.execute_tool("get_server_status", {})["result"]["tool_metrics"]
+
+    assert metrics["get_flight_details"]["calls"] == 4
+    assert metrics["get_flight_details"]["errors"] == 1
+    assert metrics["get_flight_details"]["avg_ms"] >= 0
+    assert "query_crew" not in metrics
+
+def test_keyset_pagination_walks_every_row_once(server):
+    seen, after = [], None
+    while True:
+        params = {"flight_number": "UA111", "page_size": 7}
+        if after:
+            params["after"] = after
+        page = server.execute_tool("query_passengers", params)["result"]
+        seen.extend(row["passenger_id"] for row in page["rows"])
+        after = page["next_after"]
+        if not after:
+            break
+
+    everyone = server.execute_tool("query_passengers", {"flight_number": "UA111"})["result"]
+    assert seen == sorted(row["passenger_id"] for row in everyone)
+
+def test_keyset_pagination_on_composite_flight_key(server):
+    first = server.execute_tool("query_flights", {"page_size": 600})["result"]
+    rest = server.execute_tool("query_flights", {"page_size": 600, "after": first["next_after"]})["result"]
+
+    assert len(first["rows"]) + len(rest["rows"]) == 1064
+    assert rest["next_after"] is None
+    assert not server.execute_tool("query_flights", {"page_size": 5, "limit": 5})["success"]
+    assert not server.execute_tool("query_flights", {"page_size": 5, "after": "not-a-token"})["success"]
+
+def test_stream_tool_yields_rows_lazily(server):
+    rows = server.stream_tool("query_crew", {}, page_size=100)
+    assert server.pool.get_stats()["in_use"] == 0
+
+    crew = list(rows)
+    capped = list(server.stream_tool("query_passengers", {"limit": 250}, page_size=100))
+
+    assert len(crew) == len(server.execute_tool("query_crew", {})["result"])
+    assert len(capped) == 250
+    with pytest.raises(ValueError):
+        server.stream_tool("update_passenger_flight", {})
+
+def test_http_stream_endpoint_emits_ndjson(server, monkeypatch):
+    import json
+    import database_http_server
+
+    monkeypatch.setattr(database_http_server, "mcp_server", server)
+    client = database_http_server.app.test_client()
+
+    response = client.post("/stream/query_passengers?page_size=50", json={"flight_number": "UA111"})
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+
+    assert response.mimetype == "application/x-ndjson"
+    assert len(rows) == len(server.execute_tool("query_passengers", {"flight_number": "UA111"})["result"])
+    assert client.post("/stream/get_flight_details", json={}).status_code == 400
+
+def test_fields_projection_limits_columns(server):
+    crew = server.execute_tool("query_crew", {"limit": 3, "fields": ["crew_id", "role"]})["result"]
+    details = server.execute_tool("get_flight_details", {
+        "flight_number": "UA111", "fields": ["departure_time", "departure_location"]})["result"]["details"]
+    page = server.execute_tool("query_passengers", {"page_size": 2, "fields": ["name"]})["result"]
+    streamed = next(iter(server.stream_tool("query_flights", {"fields": ["gate"]}, page_size=10)))
+
+    assert all(set(row) == {"crew_id", "role"} for row in crew)
+    assert details == {"departure_time": "2025-06-25 09:33:00", "departure_location": "JFK"}
+    assert set(page["rows"][0]) == {"name"} and page["next_after"]
+    assert set(streamed) == {"gate"}
+
+def test_fields_validated_against_table_schema(server):
+    result = server.execute_tool("query_passengers", {"fields": ["passenger_id", "password"]})
+    injected = server.execute_tool("query_flights", {"fields": ["* FROM crew --"]})
+
+    assert not result["success"] and "password" in result["error"]
+    assert not injected["success"]
+    fields_schema = next(t for t in server.get_tools() if t["name"] == "query_crew")["inputSchema"]["properties"]["fields"]
+    assert "fatigue_score" in fields_schema["items"]["enum"]
+
+def test_flight_lookups_served_from_cache(server):
+    first = server.execute_tool("get_flight_details", {"flight_number": "UA70161"})["result"]
+    first["details"]["gate"] = "mutated by caller"
+    second = server.execute_tool("get_flight_details", {"flight_number": "UA70161"})["result"]
+
+    stats = server.execute_tool("get_server_status", {})["result"]["query_cache"]
+    assert second["details"]["gate"] != "mutated by caller"
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+def test_writes_invalidate_cached_flights(server):
+    passenger_id = server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": 1})["result"][0]["passenger_id"]
+    count = server.execute_tool("get_passenger_count", {"flight_number": "UA111"})["result"]["passenger_count"]
+    seats = server.execute_tool("get_available_seats", {"flight_number": "UA70161"})["result"]["available_seats"]
+    server.execute_tool("get_flight_details", {"flight_number": "UA111"})
+
+    server.execute_tool("update_passenger_flight", {"passenger_id": passenger_id, "new_flight": "UA5091"})
+    assert server.execute_tool("get_passenger_count", {"flight_number": "UA111"})["result"]["passenger_count"] == count - 1
+
+    other = server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": 1})["result"][0]["passenger_id"]
+    server.execute_tool("bulk_reassign_passengers", {"assignments": [{"passenger_id": other, "new_flight": "UA70161"}]})
+    assert server.execute_tool("get_available_seats", {"flight_number": "UA70161"})["result"]["available_seats"] == seats - 1
+
+    server.execute_tool("update_flight_status", {"flight_number": "UA111", "status": "cancelled"})
+    assert server.execute_tool("get_flight_details", {"flight_number": "UA111"})["result"]["details"]["status"] == "cancelled"
+    assert server.cache.get_stats()["invalidations"] >= 3
+
+def test_update_flight_status_requires_departure_for_repeated_numbers(server):
+    ambiguous = server.execute_tool("update_flight_status", {"flight_number": "UA1853", "status": "delayed"})["result"]
+    missing = server.execute_tool("update_flight_status", {"flight_number": "UA0000", "status": "delayed"})["result"]
+
+    assert not ambiguous["success"] and "Ambiguous" in ambiguous["error"]
+    assert not missing["success"]
+
+def test_query_cache_lru_ttl_and_stale_puts():
+    cache = QueryCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1, ["flight:A"])
+    cache.put("b", 2, ["flight:B"])
+    cache.lookup("a")
+    cache.put("c", 3, ["flight:C"])
+
+    assert cache.lookup("b") == (False, None)
+    assert cache.lookup("a") == (True, 1)
+
+    snapshot = cache.snapshot(["flight:A"])
+    cache.invalidate(["flight:A"])
+    cache.put("a", "stale", ["flight:A"], snapshot)
+    assert cache.lookup("a") == (False, None)
+
+    expired = QueryCache(max_entries=2, ttl_seconds=0)
+    expired.put("x", 1, [])
+    assert expired.lookup("x") == (False, None)
+
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1 and stats["stale_puts_skipped"] == 1 and stats["invalidations"] == 1
+
+def test_log_messages_are_group_committed(server):
+    def worker(index):
+        for line in range(50):
+            server.execute_tool("log_message", {"run_id": "group-commit", "agent_name": f"Agent{index}", "message": f"line {line}"})
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    messages = server.execute_tool("read_messages", {"run_id": "group-commit"})["result"].splitlines()
+    stats = server.execute_tool("get_server_status", {})["result"]["log_writer"]
+
+    assert len(messages) == 200
+    assert stats["rows_written"] == 200
+    assert stats["batches_committed"] < 200
+
+def test_log_writer_flushes_on_close(db_path):
+    server = UnitedAirlinesDatabaseMCPServer(db_path=db_path, log_flush_interval_ms=10000)
+    for line in range(10):
+        server.execute_tool("log_message", {"run_id": "shutdown", "agent_name": "Agent", "message": f"line {line}"})
+    server.close()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM agent_logs WHERE run_id = 'shutdown'").fetchone() == (10,)
+    conn.close()
+
+@pytest.mark.parametrize("durability", ["async", "sync"])
+def test_log_message_inside_transactional_batch(db_path, durability):
+    server = UnitedAirlinesDatabaseMCPServer(db_path=db_path, log_durability=durability)
+    try:
+        started = time.monotonic()
+        batch = server.execute_batch([
+            {"tool": "log_message", "parameters": {"run_id": "r1", "agent_name": "Agent", "message": "in batch"}},
+            {"tool": "read_messages", "parameters": {"run_id": "r1"}}
+        ], transactional=True)
+
+        # Written on the batch's own connection: no wait on the background writer, which cannot take the lock
+        assert batch["committed"] and time.monotonic() - started < 1
+        assert batch["results"][1]["result"].endswith("Agent: in batch")
+
+        # A rolled-back batch takes its log rows with it
+        server.execute_batch([
+            {"tool": "log_message", "parameters": {"run_id": "r2", "agent_name": "Agent", "message": "rolled back"}},
+            {"tool": "no_such_tool", "parameters": {}}
+        ], transactional=True)
+    finally:
+        server.close()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT run_id, COUNT(*) FROM agent_logs WHERE run_id IN ('r1', 'r2') GROUP BY run_id").fetchall() == [("r1", 1)]
+    conn.close()
+
+def test_log_writer_retries_while_database_is_locked(db_path):
+    server = UnitedAirlinesDatabaseMCPServer(db_path=db_path, storage_config=StorageConfig(busy_timeout_ms=20),
+                                             log_flush_interval_ms=0)
+    blocker = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        blocker.execute("BEGIN IMMEDIATE")
+        server.execute_tool("log_message", {"run_id": "locked", "agent_name": "Agent", "message": "waits for the lock"})
+        time.sleep(0.3)
+        blocker.execute("COMMIT")
+
+        assert server.log_writer.flush(timeout=5)
+        stats = server.log_writer.get_stats()
+        assert stats["lock_retries"] > 0 and stats["rows_failed"] == 0
+        assert server.execute_tool("read_messages", {"run_id": "locked"})["result"].endswith("Agent: waits for the lock")
+    finally:
+        blocker.close()
+        server.close()
+
+def test_sync_log_durability_waits_for_commit(db_path):
+    server = UnitedAirlinesDatabaseMCPServer(db_path=db_path, log_durability="sync", log_flush_interval_ms=5)
+    result = server.execute_tool("log_message", {"run_id": "sync", "agent_name": "Agent", "message": "durable"})
+
+    conn = sqlite3.connect(db_path)
+    assert result["result"]["success"]
+    assert conn.execute("SELECT message FROM agent_logs WHERE run_id = 'sync'").fetchone() == ("durable",)
+    conn.close()
+    server.close()
+
+def _asgi_request(app, method, path, body=b"", query=b""):
+    """Drive one request through an ASGI app; returns (status, headers, body chunks)."""
+    import asyncio
+
+    sent = []
+    incoming = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return incoming.pop(0) if incoming else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query, "headers": []}
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    return start["status"], dict(start["headers"]), [message["body"] for message in sent[1:] if message["body"]]
+
+def test_asgi_server_mirrors_flask_routes(server, monkeypatch):
+    import json
+    import database_asgi_server
+
+    monkeypatch.setattr(database_asgi_server, "mcp_server", server)
+    monkeypatch.setattr(database_asgi_server, "executor", None)
+    monkeypatch.setattr(database_asgi_server, "STREAM_CHUNK_ROWS", 10)
+    try:
+        status, _, body = _asgi_request(database_asgi_server.app, "POST", "/execute/get_flight_details",
+                                        json.dumps({"flight_number": "UA111"}).encode())
+        assert status == 200
+        assert json.loads(b"".join(body))["result"] == server.execute_tool("get_flight_details", {"flight_number": "UA111"})["result"]
+
+        status, _, body = _asgi_request(database_asgi_server.app, "GET", "/passengers", query=b"flight_number=UA111&limit=5")
+        assert json.loads(b"".join(body))["result"] == server.execute_tool("query_passengers", {"flight_number": "UA111", "limit": 5})["result"]
+
+        status, headers, chunks = _asgi_request(database_asgi_server.app, "POST", "/stream/query_passengers",
+                                                json.dumps({"flight_number": "UA111"}).encode(), b"page_size=7")
+        rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+        assert headers[b"content-type"] == b"application/x-ndjson"
+        assert len(rows) == len(server.execute_tool("query_passengers", {"flight_number": "UA111"})["result"])
+        assert len(chunks) > 1
+
+        assert _asgi_request(database_asgi_server.app, "POST", "/stream/get_flight_details", b"{}")[0] == 400
+        assert _asgi_request(database_asgi_server.app, "PUT", "/passengers/P1/flight", b"{}")[0] == 400
+        assert _asgi_request(database_asgi_server.app, "GET", "/execute/get_flight_details")[0] == 405
+        assert _asgi_request(database_asgi_server.app, "GET", "/nowhere")[0] == 404
+
+        monkeypatch.setattr(database_asgi_server, "mcp_server", None)
+        status, _, body = _asgi_request(database_asgi_server.app, "GET", "/status")
+        assert status == 500 and json.loads(b"".join(body)) == {"error": "Database MCP server not initialized"}
+    finally:
+        if database_asgi_server.executor is not None:
+            database_asgi_server.executor.shutdown()
+
+def test_asgi_workers_run_without_query_cache(db_path, monkeypatch):
+    import database_asgi_server
+
+    monkeypatch.delenv("DATABASE_CACHE_SIZE", raising=False)
+    database_asgi_server.configure_worker_cache(1)
+    assert "DATABASE_CACHE_SIZE" not in os.environ
+
+    # A write on one worker cannot invalidate another worker's cache, so with several workers there is none
+    monkeypatch.setenv("DATABASE_CACHE_SIZE", "4096")
+    database_asgi_server.configure_worker_cache(4)
+    assert os.environ["DATABASE_CACHE_SIZE"] == "0"
+    worker = UnitedAirlinesDatabaseMCPServer.from_env(db_path=db_path)
+    try:
+        assert not worker.cache.enabled
+    finally:
+        worker.close()
+
+def test_wire_format_negotiation_and_gzip():
+    import gzip
+    import mcp_wire_format
+
+    payload = {"rows": [{"passenger_id": f"P{i}", "seat": None} for i in range(2000)]}
+
+    body, headers = mcp_wire_format.encode_response(payload, "application/json", "gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    assert mcp_wire_format.loads(gzip.decompress(body)) == payload
+
+    body, headers = mcp_wire_format.encode_response({"ok": True}, "*/*", "gzip")
+    assert headers["Content-Type"] == "application/json" and "Content-Encoding" not in headers
+
+    with pytest.raises(ValueError):
+        mcp_wire_format.client_accept_header("xml")
+
+def test_msgpack_falls_back_to_json_when_not_installed(monkeypatch):
+    import mcp_wire_format
+
+    monkeypatch.setattr(mcp_wire_format, "MSGPACK_AVAILABLE", False)
+    assert mcp_wire_format.client_accept_header("msgpack") == "application/json"
+    body, headers = mcp_wire_format.encode_response({"ok": True}, "application/msgpack", None)
+    assert headers["Content-Type"] == "application/json" and mcp_wire_format.loads(body) == {"ok": True}
+
+def test_msgpack_wire_format():
+    pytest.importorskip("msgpack")
+    import mcp_wire_format
+
+    payload = {"rows": [{"passenger_id": f"P{i}", "seat": None} for i in range(2000)]}
+    body, headers = mcp_wire_format.encode_response(payload, mcp_wire_format.client_accept_header("msgpack"), None)
+    assert headers["Content-Type"] == "application/msgpack"
+    assert mcp_wire_format.unpack(body) == payload
+    assert mcp_wire_format.negotiate("application/msgpack;q=0.2, application/json") == "application/json"
+
+def test_http_server_honours_accept_header(server, monkeypatch):
+    import gzip
+    import database_http_server
+    import mcp_wire_format
+
+    monkeypatch.setattr(database_http_server, "mcp_server", server)
+    client = database_http_server.app.test_client()
+    expected = server.execute_tool("query_passengers", {"limit": 100})["result"]
+
+    monkeypatch.setattr(mcp_wire_format, "GZIP_MIN_BYTES", 1024)
+    response = client.post("/execute/query_passengers", json={"limit": 100}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Content-Type"] == "application/json"
+    assert mcp_wire_format.loads(gzip.decompress(response.data))["result"] == expected
+
+def test_http_server_serves_msgpack(server, monkeypatch):
+    pytest.importorskip("msgpack")
+    import database_http_server
+    import mcp_wire_format
+
+    monkeypatch.setattr(database_http_server, "mcp_server", server)
+    client = database_http_server.app.test_client()
+    response = client.post("/execute/query_passengers", json={"limit": 100},
+                           headers={"Accept": mcp_wire_format.client_accept_header("msgpack")})
+    assert response.headers["Content-Type"] == "application/msgpack"
+    assert mcp_wire_format.unpack(response.data)["result"] == server.execute_tool("query_passengers", {"limit": 100})["result"]
+
+def test_async_client_overlaps_calls_against_asgi_app(server, monkeypatch):
+    import asyncio
+    import httpx
+    import database_asgi_server
+    from database_mcp_async_client import AsyncDatabaseMCPClient
+
+    monkeypatch.setattr(database_asgi_server, "mcp_server", server)
+    monkeypatch.setattr(database_asgi_server, "executor", None)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=database_asgi_server.app)
+        async with AsyncDatabaseMCPClient(server_url="http://testserver", transport=transport, max_retries=1) as client:
+            passengers, details, crew = await client.gather(
+                client.query_passengers(flight_number="UA111"),
+                client.get_flight_details("UA111", fields=["flight_number", "status"]),
+                client.query_crew(limit=5, fields=["crew_id"])
+            )
+            streamed = [row async for row in client.stream_tool("query_passengers", {"flight_number": "UA111"}, page_size=7)]
+            with pytest.raises(RuntimeError):
+                await client.execute_tool("no_such_route/extra", {})
+            return passengers, details, crew, streamed
+
+    try:
+        passengers, details, crew, streamed = asyncio.run(scenario())
+    finally:
+        if database_asgi_server.executor is not None:
+            database_asgi_server.executor.shutdown()
+
+    assert passengers == server.execute_tool("query_passengers", {"flight_number": "UA111"})["result"]
+    assert set(details["details"]) == {"flight_number", "status"}
+    assert [set(row) for row in crew] == [{"crew_id"}] * 5
+    assert sorted(row["passenger_id"] for row in streamed) == sorted(row["passenger_id"] for row in passengers)
+
+def test_circuit_breaker_and_retry_budget():
+    import requests
+    from mcp_resilience import RetryPolicy, Backoff, CircuitBreaker, RetryBudget, CircuitOpenError, RetryBudgetExhausted
+
+    backoff = Backoff(base_delay=0.1, max_delay=0.3)
+    assert all(0 <= backoff.delay(attempt) <= min(0.3, 0.1 * 2 ** attempt) for attempt in range(10))
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise requests.exceptions.ConnectionError("connection refused")
+
+    policy = RetryPolicy("Test Client", "http://breaker-test", (requests.exceptions.RequestException,), max_attempts=5,
+                         backoff=Backoff(base_delay=0), breaker=breaker, budget=RetryBudget(reserve=10))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        policy.call(down)
+    assert len(calls) == 2 and breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        policy.call(down)
+    assert len(calls) == 2
+
+    # After reset_timeout one probe goes out; its success closes the circuit
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert policy.call(lambda: "ok") == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    # Client errors are not retried and do not trip the breaker
+    not_found = requests.exceptions.HTTPError(response=type("Response", (), {"status_code": 404})())
+    attempts = []
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(lambda: attempts.append(1) or (_ for _ in ()).throw(not_found))
+    assert len(attempts) == 1 and breaker.state == CircuitBreaker.CLOSED
+
+    starved = RetryPolicy("Test Client", "http://budget-test", (requests.exceptions.RequestException,), max_attempts=5,
+                          backoff=Backoff(base_delay=0), breaker=CircuitBreaker(failure_threshold=100),
+                          budget=RetryBudget(ratio=0.0, reserve=1))
+    calls.clear()
+    with pytest.raises(RetryBudgetExhausted):
+        starved.call(down)
+    assert len(calls) == 2
+
+def test_clients_fail_fast_when_server_down():
+    import socket
+    from database_mcp_client import DatabaseMCPClient
+    from passenger_communications_mcp_client import PassengerCommunicationsMCPClient
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    client = DatabaseMCPClient(server_url=url, retry_delay=0.01, fail_fast=True)
+    assert client.retry_policy.max_attempts == 1
+    with pytest.raises(RuntimeError):
+        client.execute_tool("get_server_status", {})
+    assert not client.is_available()
+
+    comms = PassengerCommunicationsMCPClient(server_url=url, retry_delay=0.01)
+    assert comms.get_all_available_responses() == []
+    # Both clients of this server share one breaker; it has now seen enough failures to open
+    assert comms.retry_policy.breaker is client.retry_policy.breaker
+    assert client.retry_policy.breaker.get_stats()["consecutive_failures"] >= 3
+
+def test_in_process_transport_skips_http(server, monkeypatch):
+    from database_mcp_client import DatabaseMCPClient
+    from passenger_communications_mcp_client import PassengerCommunicationsMCPClient
+    from passenger_communications_mcp_server import PassengerCommunicationsMCP
+
+    client = DatabaseMCPClient(server_url="http://127.0.0.1:9", server=server)
+    assert client.transport == "inprocess" and client.is_available()
+    assert client.get_flight_details("UA111") == server.execute_tool("get_flight_details", {"flight_number": "UA111"})["result"]
+    assert len(list(client.stream_tool("query_crew", page_size=50))) == len(server.execute_tool("query_crew", {})["result"])
+    assert client.execute_batch([{"tool": "get_passenger_count", "parameters": {"flight_number": "UA111"}}])["success"]
+    with pytest.raises(RuntimeError):
+        list(client.stream_tool("get_flight_details"))
+
+    monkeypatch.setenv("MCP_TRANSPORT", "http")
+    assert DatabaseMCPClient().transport == "http"
+    monkeypatch.setenv("DATABASE_MCP_TRANSPORT", "carrier-pigeon")
+    with pytest.raises(ValueError):
+        DatabaseMCPClient()
+
+    mcp = PassengerCommunicationsMCP(response_delay_range=(0, 0))
+    mcp.start()
+    try:
+        comms = PassengerCommunicationsMCPClient(server_url="http://127.0.0.1:9", mcp=mcp)
+        sent = comms.send_rebooking_proposal({"passenger_id": "P1", "original_flight": "UA1", "rebooked_flight": "UA2",
+                                              "arrival_location": "SFO"})
+        response = comms.get_passenger_response(sent["message_id"], timeout=5)
+        assert response["status"] == "completed" and response["passenger_id"] == "P1"
+        assert comms.get_system_status()["stats"]["messages_received"] == 1
+    finally:
+        mcp.stop()
+
+def test_identical_concurrent_reads_share_one_execution(server):
+    tool = server.registry.get("query_flights")
+    original_handler = tool.handler
+    release = threading.Event()
+    executions = []
+
+    def slow_handler(parameters):
+        executions.append(parameters)
+        release.wait(5)
+        return original_handler(parameters)
+
+    tool.handler = slow_handler
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(server.execute_tool("query_flights", {"status": "scheduled", "limit": 5})))
+               for _ in range(6)]
+    for thread in threads:
+        thread.start()
+
+    deadline = time.monotonic() + 5
+    while server.single_flight.get_stats()["suppressed_duplicates"] < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    tool.handler = original_handler
+
+    assert len(executions) == 1
+    assert all(result["result"] == results[0]["result"] for result in results)
+    assert results[0]["result"] is not results[1]["result"]
+    stats = server.execute_tool("get_server_status", {})["result"]["single_flight"]
+    assert stats["suppressed_duplicates"] == 5 and stats["in_flight"] == 0
+
+@pytest.mark.parametrize("tool_name, parameters", [
+    ("query_flights", {"status": "diverted"}),
+    ("get_flight_details", {"flight_number": "UA1018"})
+])
+def test_reads_after_a_commit_do_not_join_an_earlier_read(server, tool_name, parameters):
+    tool = server.registry.get(tool_name)
+    original_handler = tool.handler
+    read_done, release = threading.Event(), threading.Event()
+
+    def slow_handler(params):
+        result = original_handler(params)
+        read_done.set()
+        release.wait(5)
+        return result
+
+    def statuses(result):
+        rows = result["result"] if tool_name == "query_flights" else [result["result"]["details"]]
+        return {row["flight_number"]: row["status"] for row in rows}
+
+    tool.handler = slow_handler
+    results = {}
+    before = server.single_flight.get_stats()
+    leader = threading.Thread(target=lambda: results.update(leader=server.execute_tool(tool_name, parameters)))
+    leader.start()
+    read_done.wait(5)
+
+    # The write commits while the leader's read is still in flight
+    assert server.execute_tool("update_flight_status", {"flight_number": "UA1018", "status": "diverted"})["result"]["success"]
+    follower = threading.Thread(target=lambda: results.update(follower=server.execute_tool(tool_name, parameters)))
+    follower.start()
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        stats = server.single_flight.get_stats()
+        if stats["executions"] + stats["suppressed_duplicates"] - before["executions"] - before["suppressed_duplicates"] == 2:
+            break
+        time.sleep(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+    tool.handler = original_handler
+
+    assert statuses(results["leader"]).get("UA1018") != "diverted"
+    assert statuses(results["follower"])["UA1018"] == "diverted"
+    assert server.single_flight.get_stats()["suppressed_duplicates"] == before["suppressed_duplicates"]